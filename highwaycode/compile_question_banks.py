@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Validate the theory question banks and emit topic/difficulty indexes plus topic shards.
+
+Inputs:
+  - android/app/src/main/assets/theory/theory_pack_v1.json (topics + questions with option ids)
+  - highwaycode/Drivest_QuestionBank_1200_Varied.json (flat bank)
+  - Drivest_1200_Questions.json (flat bank)
+
+Outputs (one <stem>_index/ folder next to each bank; the highwaycode bank is
+mirrored into the iOS bundle):
+  - index.json
+      {"version": 1, "bank": ..., "source": ..., "sourceSha256": ...,
+       "questionCount": N,
+       "topics": [{"id": ..., "title": ..., "count": n, "ordinals": [...],
+                   "shard": "topics/<id>-<sha12>.json", "sha256": ..., "bytes": ...}],
+       "difficulties": {"easy": [...], "medium": [...], "hard": [...]}}
+  - topics/<id>-<sha12>.json
+      {"topic": ..., "ordinals": [...], "questions": [...]}
+  Both are written as compact JSON.
+
+Ordinals index the bank's question array. Topic screens and mock tests can
+read index.json and one or two shards instead of scanning the whole bank.
+Shard questions are the source objects, unchanged. The file name carries
+the content hash, so clients can cache shards by name.
+
+The index folders are committed next to their banks, like the sign pack,
+so app bundles never depend on who last ran the tool. Re-run it and commit
+the output whenever a bank changes.
+
+Validation fails the run on duplicate question ids, answers out of range,
+missing or repeated options, unknown difficulties, and theory-pack topic
+lists that disagree with each question's topicId.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+from pack_writer import encode_json, write_if_changed  # noqa: E402
+
+INDEX_VERSION = 1
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+@dataclass(frozen=True)
+class QuestionBank:
+    name: str
+    source: Path
+    kind: str  # "theory_pack" | "flat"
+    mirrors: Tuple[Path, ...] = ()
+
+    @property
+    def out_dirs(self) -> List[Path]:
+        return [folder / f"{self.source.stem}_index" for folder in (self.source.parent, *self.mirrors)]
+
+
+BANKS = [
+    QuestionBank(
+        "theory_pack",
+        ROOT / "android" / "app" / "src" / "main" / "assets" / "theory" / "theory_pack_v1.json",
+        "theory_pack",
+    ),
+    QuestionBank(
+        "highwaycode_1200",
+        ROOT / "highwaycode" / "Drivest_QuestionBank_1200_Varied.json",
+        "flat",
+        mirrors=(ROOT / "ios" / "DrivestNavigation" / "Resources" / "Data" / "highwaycode",),
+    ),
+    QuestionBank("drivest_1200", ROOT / "Drivest_1200_Questions.json", "flat"),
+]
+
+
+def slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", value.lower()).strip("_") or "general"
+
+
+def check_options(label: str, texts: List[str], problems: List[str]) -> None:
+    if len(texts) < 2:
+        problems.append(f"{label}: fewer than two options")
+    if any(not text.strip() for text in texts):
+        problems.append(f"{label}: blank option")
+    if len(set(texts)) != len(texts):
+        problems.append(f"{label}: repeated option text")
+
+
+def check_ids(questions: List[dict], problems: List[str]) -> None:
+    seen: Dict[object, int] = {}
+    for ordinal, question in enumerate(questions):
+        qid = question.get("id")
+        if qid in seen:
+            problems.append(f"question {ordinal}: id {qid!r} repeats question {seen[qid]}")
+        seen.setdefault(qid, ordinal)
+
+
+def theory_pack_rows(pack: dict, problems: List[str]) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """(topic id, difficulty) per question, plus (topic id, title) in pack order."""
+    questions = pack.get("questions", [])
+    topics = {topic["id"]: topic for topic in pack.get("topics", [])}
+    check_ids(questions, problems)
+    rows: List[Tuple[str, str]] = []
+    members: Dict[str, List[str]] = {topic_id: [] for topic_id in topics}
+    for ordinal, question in enumerate(questions):
+        label = f"question {question.get('id', ordinal)}"
+        topic_id = question.get("topicId", "")
+        if topic_id not in topics:
+            problems.append(f"{label}: unknown topicId {topic_id!r}")
+        else:
+            members[topic_id].append(question.get("id"))
+        option_ids = [option.get("id") for option in question.get("options", [])]
+        check_options(label, [option.get("text", "") for option in question.get("options", [])], problems)
+        if len(set(option_ids)) != len(option_ids):
+            problems.append(f"{label}: repeated option id")
+        if question.get("correctOptionId") not in option_ids:
+            problems.append(f"{label}: correctOptionId {question.get('correctOptionId')!r} is not an option")
+        if not question.get("prompt", "").strip():
+            problems.append(f"{label}: blank prompt")
+        rows.append((topic_id, str(question.get("difficulty", "")).lower()))
+    for topic_id, topic in topics.items():
+        if sorted(topic.get("questionIds", [])) != sorted(members[topic_id]):
+            problems.append(f"topic {topic_id}: questionIds do not match the questions tagged with it")
+    lesson_ids = {lesson.get("id") for lesson in pack.get("lessons", [])}
+    for topic_id, topic in topics.items():
+        missing = [lesson for lesson in topic.get("lessonIds", []) if lesson not in lesson_ids]
+        if missing:
+            problems.append(f"topic {topic_id}: unknown lessonIds {missing}")
+    return rows, [(topic_id, topic.get("title", topic_id)) for topic_id, topic in topics.items()]
+
+
+def flat_bank_rows(questions: List[dict], problems: List[str]) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    check_ids(questions, problems)
+    rows: List[Tuple[str, str]] = []
+    titles: Dict[str, str] = {}
+    for ordinal, question in enumerate(questions):
+        label = f"question {question.get('id', ordinal)}"
+        options = question.get("options", [])
+        check_options(label, options, problems)
+        answer = question.get("correct_answer_index")
+        if not isinstance(answer, int) or not 0 <= answer < len(options):
+            problems.append(f"{label}: correct_answer_index {answer!r} out of range")
+        if not question.get("question", "").strip():
+            problems.append(f"{label}: blank question")
+        title = question.get("topic", "").strip()
+        topic_id = slugify(title)
+        if titles.setdefault(topic_id, title) != title:
+            problems.append(f"{label}: topic {title!r} collides with {titles[topic_id]!r}")
+        rows.append((topic_id, str(question.get("difficulty", "")).lower()))
+    return rows, list(titles.items())
+
+
+def compile_bank(bank: QuestionBank, raw: bytes) -> Tuple[dict, Dict[str, bytes], List[str]]:
+    """Return (index payload, {shard path: bytes}, problems)."""
+    payload = json.loads(raw)
+    problems: List[str] = []
+    if bank.kind == "theory_pack":
+        questions = payload.get("questions", [])
+        rows, topic_titles = theory_pack_rows(payload, problems)
+    else:
+        questions = payload
+        rows, topic_titles = flat_bank_rows(questions, problems)
+
+    difficulties: Dict[str, List[int]] = {name: [] for name in DIFFICULTIES}
+    by_topic: Dict[str, List[int]] = {topic_id: [] for topic_id, _ in topic_titles}
+    for ordinal, (topic_id, difficulty) in enumerate(rows):
+        if difficulty not in difficulties:
+            problems.append(f"question {questions[ordinal].get('id', ordinal)}: unknown difficulty {difficulty!r}")
+        else:
+            difficulties[difficulty].append(ordinal)
+        if topic_id in by_topic:
+            by_topic[topic_id].append(ordinal)
+
+    shards: Dict[str, bytes] = {}
+    topics = []
+    for topic_id, title in topic_titles:
+        ordinals = by_topic[topic_id]
+        data = encode_json(
+            {"topic": topic_id, "ordinals": ordinals, "questions": [questions[i] for i in ordinals]}, indent=None
+        )
+        digest = hashlib.sha256(data).hexdigest()
+        shard = f"topics/{topic_id}-{digest[:12]}.json"
+        shards[shard] = data
+        topics.append(
+            {
+                "id": topic_id,
+                "title": title,
+                "count": len(ordinals),
+                "ordinals": ordinals,
+                "shard": shard,
+                "sha256": digest,
+                "bytes": len(data),
+            }
+        )
+
+    index = {
+        "version": INDEX_VERSION,
+        "bank": bank.name,
+        "source": bank.source.relative_to(ROOT).as_posix(),
+        "sourceSha256": hashlib.sha256(raw).hexdigest(),
+        "questionCount": len(questions),
+        "topics": topics,
+        "difficulties": difficulties,
+    }
+    return index, shards, problems
+
+
+def prune_shards(out_dir: Path, keep: List[str]) -> int:
+    removed = 0
+    for path in sorted((out_dir / "topics").glob("*.json")):
+        if path.relative_to(out_dir).as_posix() not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Validate question banks and emit topic/difficulty indexes.")
+    parser.add_argument("--bank", choices=[bank.name for bank in BANKS], action="append", help="Only these banks.")
+    parser.add_argument("--check", action="store_true", help="Validate only; write nothing.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    failed = 0
+    for bank in BANKS:
+        if args.bank and bank.name not in args.bank:
+            continue
+        index, shards, problems = compile_bank(bank, bank.source.read_bytes())
+        for problem in problems[:50]:
+            print(f"[Drivest]   {bank.name}: {problem}")
+        if problems:
+            failed += 1
+            print(f"[Drivest] {bank.name}: {len(problems)} problem(s); nothing written")
+            continue
+        written = removed = 0
+        if not args.check:
+            for out_dir in bank.out_dirs:
+                for shard, data in shards.items():
+                    written += write_if_changed(out_dir / shard, data)
+                written += write_if_changed(out_dir / "index.json", encode_json(index, indent=None))
+                removed += prune_shards(out_dir, list(shards))
+        counts = ", ".join(f"{name}={len(ordinals)}" for name, ordinals in index["difficulties"].items())
+        print(
+            f"[Drivest] {bank.name}: {index['questionCount']} questions, {len(index['topics'])} topics ({counts}); "
+            f"files written: {written}, stale shards removed: {removed}"
+        )
+    if failed:
+        raise SystemExit(f"[Drivest] Question bank validation failed for {failed} bank(s)")
+    print("[Drivest] Question bank compile complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# The tools are flat scripts that import each other by module name, as when run from their folders.
+for folder in ("tools", "trafficsigns", "highwaycode"):
+    sys.path.insert(0, str(ROOT / folder))
+
+import build_traffic_signs_pack as pack_builder  # noqa: E402
+from sign_sheet import SignMeta  # noqa: E402
+
+
+@pytest.fixture
+def synthetic_sign_build(tmp_path, monkeypatch):
+    """Point build_traffic_signs_pack at a two-sign catalogue under tmp_path; returns (asset root, rows)."""
+    source_root = tmp_path / "roadsign"
+    for folder, name, colour in (("warning-signs-jpg", "501.jpg", "red"), ("regulatory-signs-jpg", "601.jpg", "blue")):
+        (source_root / folder).mkdir(parents=True)
+        Image.new("RGB", (24, 24), colour).save(source_root / folder / name, "JPEG")
+    source_xls = source_root / "catalogue.xls"
+    source_xls.write_bytes(b"")
+    rows = [
+        SignMeta("Warning signs", "Bend ahead", "Bend", "501", "501.jpg"),
+        SignMeta("Regulatory signs", "Stop", "Stop", "601", "601.jpg"),
+    ]
+    asset_root = tmp_path / "assets" / "traffic_signs"
+    cache_root = tmp_path / "cache"
+    for name, value in {
+        "ROOT": tmp_path,
+        "SOURCE_ROOT": source_root,
+        "SOURCE_XLS": source_xls,
+        "ASSET_ROOT": asset_root,
+        "ASSET_IMAGES_ROOT": asset_root / "images",
+        "OUTPUT_JSON": asset_root / pack_builder.OUTPUT_JSON.name,
+        "OUTPUT_MIN_JSON": asset_root / pack_builder.OUTPUT_MIN_JSON.name,
+        "OUTPUT_INDEX": asset_root / pack_builder.OUTPUT_INDEX.name,
+        "OUTPUT_SEARCH": asset_root / pack_builder.OUTPUT_SEARCH.name,
+        "BUILD_CACHE_ROOT": cache_root,
+        "BUILD_MANIFEST": cache_root / pack_builder.BUILD_MANIFEST.name,
+        "IMAGE_METADATA_CACHE": cache_root / pack_builder.IMAGE_METADATA_CACHE.name,
+        "OPTIMIZE_REPORT": cache_root / pack_builder.OPTIMIZE_REPORT.name,
+        "DUPLICATE_REPORT": cache_root / pack_builder.DUPLICATE_REPORT.name,
+        "FINGERPRINT_CACHE": cache_root / pack_builder.FINGERPRINT_CACHE.name,
+        "VERSIONS_ROOT": cache_root / pack_builder.VERSIONS_ROOT.name,
+        "DELTAS_ROOT": cache_root / pack_builder.DELTAS_ROOT.name,
+    }.items():
+        monkeypatch.setattr(pack_builder, name, value)
+    monkeypatch.setattr(pack_builder, "iter_sign_rows", lambda path, cache_root=None: iter(rows))
+    return asset_root, rows
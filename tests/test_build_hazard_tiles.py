@@ -0,0 +1,97 @@
+import json
+import random
+
+import pytest
+
+from build_hazard_tiles import (
+    HazardTileError,
+    compile_hazard_tiles,
+    expand_tile,
+    quadkey,
+    tile_xy,
+    verify_tiles,
+    write_tiles,
+)
+
+
+def hazard(n: int, lat: float, lon: float, **tags) -> dict:
+    confidence = round(0.5 + n % 5 / 10, 2)
+    return {
+        "id": f"h{n}",
+        "type": ["speed_camera", "school", "crossing"][n % 3],
+        "lat": lat,
+        "lon": lon,
+        "tags": tags,
+        "source": ["osm", "manual"][n % 2],
+        "confidence": confidence,
+        "confidenceHint": confidence,
+        "confidenceScore": confidence,
+        "confidenceLevel": ["low", "medium", "high"][n % 3],
+        "voiceEligible": n % 2 == 0,
+    }
+
+
+def sample_pack(count: int = 300) -> dict:
+    rng = random.Random(0)
+    hazards = [
+        hazard(n, 51.7 + rng.uniform(-0.05, 0.05), 0.47 + rng.uniform(-0.08, 0.08), highway="crossing", ref=str(n % 7))
+        for n in range(count)
+    ]
+    hazards.append(hazard(count, 51.7, 0.47))  # no tags
+    return {"centreId": "test", "metadata": {"generatedAt": "2026-01-01"}, "hazards": hazards}
+
+
+def test_quadkey_of_known_tiles():
+    assert quadkey(*tile_xy(0.0, 0.0, 1), 1) == "3"
+    assert quadkey(3, 5, 3) == "213"
+    assert quadkey(0, 0, 0) == ""
+
+
+def test_tiles_expand_back_to_the_source_hazards_in_key_order():
+    pack = sample_pack()
+    index, tiles = compile_hazard_tiles(pack, zoom=14)
+
+    assert len(tiles) > 1
+    assert sum(tile["count"] for tile in tiles.values()) == index["hazardCount"] == len(pack["hazards"])
+    expanded = {h["id"]: h for tile in tiles.values() for h in expand_tile(tile, index)}
+    for source in pack["hazards"]:
+        assert expanded[source["id"]] == source
+        assert list(expanded[source["id"]]) == list(source)
+
+
+def test_empty_pack():
+    index, tiles = compile_hazard_tiles({"hazards": []})
+
+    assert tiles == {} and index["tiles"] == [] and index["hazardCount"] == 0
+
+
+def test_written_tiles_verify_and_stale_tiles_are_removed(tmp_path):
+    pack = sample_pack(120)
+    (tmp_path / "0000.json").write_text("{}", encoding="utf-8")
+
+    index, tiles = compile_hazard_tiles(pack)
+    written, removed = write_tiles(tmp_path, index, tiles)
+
+    assert written == len(tiles) + 1 and removed == ["0000.json"]
+    assert verify_tiles(pack, tmp_path) == []
+    assert write_tiles(tmp_path, *compile_hazard_tiles(pack)) == (0, [])
+
+
+def test_tampered_tile_fails_verification(tmp_path):
+    pack = sample_pack(50)
+    index, tiles = compile_hazard_tiles(pack)
+    write_tiles(tmp_path, index, tiles)
+    first = tmp_path / index["tiles"][0]["file"]
+    first.write_text(json.dumps({**json.loads(first.read_text(encoding="utf-8")), "count": 0}), encoding="utf-8")
+
+    assert "sha256 does not match" in verify_tiles(pack, tmp_path)[0]
+
+
+def test_hazards_with_unexpected_shape_are_rejected():
+    extra = {**hazard(1, 51.7, 0.47), "note": "x"}
+    with pytest.raises(HazardTileError, match="keys"):
+        compile_hazard_tiles({"hazards": [extra]})
+
+    mismatched = {**hazard(1, 51.7, 0.47), "confidenceHint": 0.1}
+    with pytest.raises(HazardTileError, match="confidence fields differ"):
+        compile_hazard_tiles({"hazards": [mismatched]})
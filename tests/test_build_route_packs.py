@@ -0,0 +1,122 @@
+import json
+
+import numpy as np
+import pytest
+
+import build_route_packs
+from build_route_packs import (
+    check_route_pack,
+    compile_route_pack,
+    decode_polyline,
+    encode_polyline,
+    local_metres,
+    main,
+    simplify,
+)
+
+
+def test_encode_matches_the_reference_polyline_at_precision_5():
+    points = np.array([[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]])
+
+    assert encode_polyline(points, precision=5) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@", precision=5) == [
+        (38.5, -120.2),
+        (40.7, -120.95),
+        (43.252, -126.453),
+    ]
+
+
+def test_polyline_round_trip_at_default_precision():
+    rng = np.random.default_rng(0)
+    points = np.column_stack((51.5 + rng.normal(0, 0.5, 500), -0.1 + rng.normal(0, 0.5, 500)))
+    points[[0, 1]] = [[-89.999999, -179.999999], [89.999999, 179.999999]]
+
+    decoded = np.array(decode_polyline(encode_polyline(points)))
+
+    assert np.array_equal(np.rint(decoded * 1e6), np.rint(points * 1e6))
+
+
+def test_empty_polyline():
+    assert encode_polyline(np.zeros((0, 2))) == ""
+    assert decode_polyline("") == []
+
+
+def straight_line(count: int) -> np.ndarray:
+    return np.column_stack((np.linspace(51.0, 51.01, count), np.full(count, -0.1)))
+
+
+def test_simplify_drops_collinear_points_and_keeps_corners():
+    line = straight_line(11)
+    assert simplify(line, 1.0).tolist() == [True] + [False] * 9 + [True]
+
+    # North for about 1.1 km, then east: only the corner is kept.
+    corner = np.vstack((line[:6], np.column_stack((np.full(5, line[5, 0]), -0.1 + 0.002 * np.arange(1, 6)))))
+    assert np.flatnonzero(simplify(corner, 25.0)).tolist() == [0, 5, 10]
+
+
+@pytest.mark.parametrize("points", [straight_line(2), straight_line(1)])
+def test_simplify_keeps_short_lines(points):
+    assert simplify(points, 25.0).all()
+
+
+def test_simplify_zero_tolerance_keeps_everything():
+    assert simplify(straight_line(10), 0.0).all()
+
+
+def test_simplify_closed_loop_keeps_the_far_side():
+    angles = np.linspace(0, 2 * np.pi, 13)
+    loop = np.column_stack((51.0 + 0.001 * np.sin(angles), -0.1 + 0.0016 * np.cos(angles)))
+
+    keep = simplify(loop, 5.0)
+
+    assert keep[0] and keep[-1] and keep.sum() > 2
+
+
+def test_simplify_stays_within_tolerance():
+    rng = np.random.default_rng(1)
+    points = np.cumsum(rng.normal(0, 0.0002, (400, 2)), axis=0) + [51.5, -0.1]
+    tolerance = 10.0
+
+    keep = np.flatnonzero(simplify(points, tolerance))
+    xy = local_metres(points)
+    for first, last in zip(keep, keep[1:]):
+        start, segment = xy[first], xy[last] - xy[first]
+        inner = xy[first + 1 : last] - start
+        t = np.clip(inner @ segment / max(segment @ segment, 1e-12), 0.0, 1.0)
+        assert np.all(np.hypot(*(inner - t[:, None] * segment).T) <= tolerance + 1e-6)
+
+
+def test_compiled_pack_passes_its_own_check():
+    geometry = [{"lat": lat, "lon": lon} for lat, lon in straight_line(20).tolist()]
+    pack = {"centreId": "test", "routes": [{"id": "r1", "distanceM": 1112, "geometry": geometry}]}
+
+    compiled = compile_route_pack(pack, (0.0, 25.0))
+
+    assert [level["pointCount"] for level in compiled["routes"][0]["levels"]] == [20, 2]
+    assert check_route_pack(pack, compiled, 0.05) == ([], [])
+
+
+def test_levels_that_keep_the_same_points_are_dropped():
+    geometry = [{"lat": lat, "lon": lon} for lat, lon in straight_line(4).tolist()]
+    pack = {"centreId": "test", "routes": [{"id": "r1", "distanceM": 1112, "geometry": geometry}]}
+
+    levels = compile_route_pack(pack, (0.0, 0.5, 5.0, 25.0))["routes"][0]["levels"]
+
+    assert [(level["toleranceM"], level["pointCount"]) for level in levels] == [(0.0, 4), (0.5, 2)]
+
+
+def test_failed_check_writes_nothing(tmp_path, monkeypatch):
+    source = tmp_path / "routes"
+    out = tmp_path / "compiled"
+    source.mkdir()
+    monkeypatch.setattr(build_route_packs, "ROUTES_ROOT", source)
+    geometry = [{"lat": lat, "lon": lon} for lat, lon in straight_line(4).tolist()]
+    good = {"centreId": "good", "routes": [{"id": "r1", "distanceM": 1112, "geometry": geometry}]}
+    bad = {"centreId": "bad", "routes": [{"id": "r1", "distanceM": 9999, "geometry": geometry}]}
+    (source / "good.json").write_text(json.dumps(good), encoding="utf-8")
+    (source / "bad.json").write_text(json.dumps(bad), encoding="utf-8")
+
+    with pytest.raises(SystemExit, match="check failed"):
+        main(["--out", str(out), "--strict"])
+
+    assert not out.exists()
@@ -0,0 +1,256 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import build_traffic_signs_pack as pack_builder
+from build_traffic_signs_pack import (
+    ImageJob,
+    ingest_images,
+    load_build_manifest,
+    read_build_manifest,
+    remove_orphan_images,
+    save_build_manifest,
+    sync_image,
+)
+from sign_pack_delta import encode_pack
+from sign_sheet import SignMeta
+
+
+def image_job(tmp_path: Path, name: str, previous: dict | None = None) -> ImageJob:
+    return ImageJob(
+        asset_key=f"images/warning-signs-jpg/{name}",
+        source=tmp_path / "roadsign" / "warning-signs-jpg" / name,
+        target=tmp_path / "assets" / "images" / "warning-signs-jpg" / name,
+        source_rel=f"warning-signs-jpg/{name}",
+        previous=previous,
+    )
+
+
+def write_source(job: ImageJob, data: bytes) -> None:
+    job.source.parent.mkdir(parents=True, exist_ok=True)
+    job.source.write_bytes(data)
+
+
+def test_new_image_is_copied_and_recorded(tmp_path):
+    job = image_job(tmp_path, "501.jpg")
+    write_source(job, b"sign 501")
+
+    entry, written = sync_image(job)
+
+    assert written and job.target.read_bytes() == b"sign 501"
+    assert entry["source"] == "warning-signs-jpg/501.jpg"
+    assert entry["size"] == entry["outputSize"] == 8
+    assert entry["encoding"] == "copy" and len(entry["sha256"]) == 64
+
+
+def test_unchanged_image_is_skipped_without_hashing(tmp_path, monkeypatch):
+    job = image_job(tmp_path, "501.jpg")
+    write_source(job, b"sign 501")
+    entry, _ = sync_image(job)
+    os.utime(job.target, ns=(1, 1))
+
+    def no_hashing(path):
+        raise AssertionError(f"{path} was hashed although size and mtime match the manifest")
+
+    monkeypatch.setattr(pack_builder, "file_sha256", no_hashing)
+    again, written = sync_image(image_job(tmp_path, "501.jpg", previous=entry))
+
+    assert not written and again == entry
+    assert job.target.stat().st_mtime_ns == 1
+
+
+def test_touched_but_identical_image_is_not_recopied(tmp_path):
+    job = image_job(tmp_path, "501.jpg")
+    write_source(job, b"sign 501")
+    entry, _ = sync_image(job)
+    os.utime(job.source, ns=(10**18, 10**18))
+    os.utime(job.target, ns=(1, 1))
+
+    again, written = sync_image(image_job(tmp_path, "501.jpg", previous=entry))
+
+    assert not written and job.target.stat().st_mtime_ns == 1
+    assert again["mtimeNs"] == 10**18 and again["sha256"] == entry["sha256"]
+
+
+def test_changed_image_is_recopied(tmp_path):
+    job = image_job(tmp_path, "501.jpg")
+    write_source(job, b"sign 501")
+    entry, _ = sync_image(job)
+    write_source(job, b"sign 501, redrawn")
+
+    again, written = sync_image(image_job(tmp_path, "501.jpg", previous=entry))
+
+    assert written and job.target.read_bytes() == b"sign 501, redrawn"
+    assert again["sha256"] != entry["sha256"]
+
+
+def test_missing_target_is_restored(tmp_path):
+    job = image_job(tmp_path, "501.jpg")
+    write_source(job, b"sign 501")
+    entry, _ = sync_image(job)
+    job.target.unlink()
+
+    _, written = sync_image(image_job(tmp_path, "501.jpg", previous=entry))
+
+    assert written and job.target.read_bytes() == b"sign 501"
+
+
+def test_identical_target_without_manifest_entry_is_adopted(tmp_path):
+    job = image_job(tmp_path, "501.jpg")
+    write_source(job, b"sign 501")
+    job.target.parent.mkdir(parents=True)
+    job.target.write_bytes(b"sign 501")
+    os.utime(job.target, ns=(1, 1))
+
+    entry, written = sync_image(job)
+
+    assert not written and entry["outputSize"] == 8 and job.target.stat().st_mtime_ns == 1
+
+
+def test_ingest_reports_only_written_images(tmp_path):
+    jobs = [image_job(tmp_path, name) for name in ("501.jpg", "502.jpg")]
+    for job in jobs:
+        write_source(job, job.source.name.encode("utf-8"))
+    manifest, written = ingest_images(jobs, None, workers=1)
+    jobs[1].source.write_bytes(b"changed")
+
+    again, rewritten = ingest_images(
+        [image_job(tmp_path, job.source.name, manifest[job.asset_key]) for job in jobs], None, workers=1
+    )
+
+    assert written == set(manifest) and rewritten == {jobs[1].asset_key}
+    assert again[jobs[0].asset_key] == manifest[jobs[0].asset_key]
+
+
+def test_orphans_and_empty_folders_are_removed(tmp_path):
+    images = tmp_path / "assets" / "images"
+    for rel in ("warning-signs-jpg/501.jpg", "warning-signs-jpg/old.jpg", "tram-signs-jpg/old.jpg"):
+        (images / rel).parent.mkdir(parents=True, exist_ok=True)
+        (images / rel).write_bytes(b"x")
+    (images / "empty-jpg").mkdir()
+
+    removed = remove_orphan_images(images, {"images/warning-signs-jpg/501.jpg"})
+
+    assert removed == ["images/tram-signs-jpg/old.jpg", "images/warning-signs-jpg/old.jpg"]
+    assert sorted(p.relative_to(images).as_posix() for p in images.rglob("*")) == [
+        "warning-signs-jpg",
+        "warning-signs-jpg/501.jpg",
+    ]
+    assert remove_orphan_images(tmp_path / "missing", set()) == []
+
+
+def test_build_manifest_round_trip(tmp_path):
+    path = tmp_path / "manifest.json"
+    images = {"images/b.jpg": {"size": 2, "sha256": "bb"}, "images/a.jpg": {"size": 1, "sha256": "aa"}}
+
+    save_build_manifest(path, images)
+
+    assert load_build_manifest(path) == images
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    assert path.read_text(encoding="utf-8") == json.dumps({**payload, "images": dict(sorted(images.items()))}, indent=2) + "\n"
+    save_build_manifest(path, {})
+    assert load_build_manifest(path) == {}
+
+
+def test_unreadable_or_old_manifests_start_fresh(tmp_path):
+    path = tmp_path / "manifest.json"
+    assert load_build_manifest(path) == {}
+    path.write_text("{not json", encoding="utf-8")
+    assert load_build_manifest(path) == {}
+    path.write_text(json.dumps({"version": 0, "images": {"a": {}}}), encoding="utf-8")
+    assert load_build_manifest(path) == {}
+
+
+def test_build_manifest_fields_are_written_before_images(tmp_path):
+    path = tmp_path / "manifest.json"
+    images = {"images/a.jpg": {"size": 1}}
+
+    save_build_manifest(path, images, {"sidecars": ["shards/", "traffic_signs_index_v1.bin"]})
+
+    payload = read_build_manifest(path)
+    assert list(payload) == ["version", "sidecars", "images"]
+    assert payload["sidecars"] == ["shards/", "traffic_signs_index_v1.bin"]
+    assert path.read_text(encoding="utf-8") == json.dumps(payload, indent=2) + "\n"
+    assert load_build_manifest(path) == images
+
+
+def test_incremental_build_removes_sidecars_whose_flag_is_off(synthetic_sign_build, capsys):
+    asset_root, _ = synthetic_sign_build
+    sidecar_flags = ["--binary-index", "--search-index", "--minified-json", "--sharded", "--thumbnails"]
+    pack_builder.main(["--incremental", "--workers", "1", *sidecar_flags])
+    for rel in ("traffic_signs_index_v1.bin", "traffic_signs_search_v1.bin", "traffic_signs_pack_v1.min.json",
+                "traffic_signs_shards_v1.json", "shards", "thumbnails"):
+        assert (asset_root / rel).exists(), rel
+    assert read_build_manifest(pack_builder.BUILD_MANIFEST)["sidecars"] == [
+        "traffic_signs_index_v1.bin",
+        "traffic_signs_search_v1.bin",
+        "traffic_signs_pack_v1.min.json",
+        "traffic_signs_shards_v1.json",
+        "shards/",
+        "thumbnails/",
+    ]
+
+    pack_builder.main(["--incremental", "--workers", "1", "--search-index"])
+
+    assert sorted(p.relative_to(asset_root).as_posix() for p in asset_root.rglob("*") if p.is_file()) == [
+        "images/regulatory-signs-jpg/601.jpg",
+        "images/warning-signs-jpg/501.jpg",
+        "traffic_signs_pack_v1.json",
+        "traffic_signs_search_v1.bin",
+    ]
+    assert read_build_manifest(pack_builder.BUILD_MANIFEST)["sidecars"] == ["traffic_signs_search_v1.bin"]
+    assert "Removed stale sidecars: shards/, thumbnails/, traffic_signs_index_v1.bin" in capsys.readouterr().out
+
+    # A sidecar left by a build that predates the manifest field is removed too.
+    (asset_root / "traffic_signs_index_v1.bin").write_bytes(b"stale")
+    save_build_manifest(pack_builder.BUILD_MANIFEST, load_build_manifest(pack_builder.BUILD_MANIFEST))
+    pack_builder.main(["--incremental", "--workers", "1", "--stream"])
+    assert not (asset_root / "traffic_signs_index_v1.bin").exists()
+    assert not (asset_root / "traffic_signs_search_v1.bin").exists()
+
+
+@pytest.mark.parametrize("with_signs", [True, False])
+def test_streamed_pack_matches_the_batch_pack(synthetic_sign_build, monkeypatch, with_signs):
+    asset_root, rows = synthetic_sign_build
+    extra = [
+        SignMeta("Warning signs", "Bend ahead", "Bend, again", "501a", "501.jpg", shape="Triangle"),
+        SignMeta("Warning signs", "No image", "", "999", "999.jpg"),
+        SignMeta("Regulatory signs, Warning signs", "Stop – été", "", "601", "601.jpg"),
+        SignMeta("Regulatory signs", "Also missing", "", "998", "998.jpg"),
+        SignMeta("Regulatory signs", "Missing twice", "", "999", "999.jpg"),
+    ]
+    rows[:] = rows + extra if with_signs else [meta for meta in extra if meta.jpg.startswith("99")]
+    monkeypatch.setattr(pack_builder, "STREAM_BATCH_SIZE", 2)
+    image_index = pack_builder.build_image_index(pack_builder.SOURCE_ROOT)
+    signs, missing, _, counts = pack_builder.select_signs(rows, image_index, {})
+    expected = encode_pack(pack_builder.build_pack(signs, missing, counts))
+
+    pack_builder.main(["--workers", "1", "--stream"])
+
+    assert pack_builder.OUTPUT_JSON.read_bytes() == expected
+    pack_builder.main(["--incremental", "--workers", "1"])
+    assert pack_builder.OUTPUT_JSON.read_bytes() == expected
+
+
+@pytest.mark.parametrize(
+    "flag",
+    ["--binary-index", "--image-metadata", "--search-index", "--minified-json", "--dedupe", "--deltas", "--sharded", "--thumbnails"],
+)
+def test_stream_rejects_whole_pack_flags(flag, capsys):
+    with pytest.raises(SystemExit):
+        pack_builder.parse_args(["--stream", flag])
+    assert f"--stream cannot be combined with {flag}" in capsys.readouterr().err
+
+
+def test_stream_accepts_per_image_flags():
+    args = pack_builder.parse_args(["--stream", "--incremental", "--optimize", "--workers", "2"])
+    assert args.stream and args.optimize
+
+
+def test_perceptual_distance_needs_dedupe(capsys):
+    with pytest.raises(SystemExit):
+        pack_builder.parse_args(["--perceptual-distance", "12"])
+    assert "--perceptual-distance only applies with --dedupe" in capsys.readouterr().err
+    assert pack_builder.parse_args(["--dedupe", "--perceptual-distance", "12"]).perceptual_distance == 12
@@ -0,0 +1,116 @@
+import json
+
+from compile_question_banks import ROOT, QuestionBank, compile_bank
+
+FLAT = QuestionBank("flat_test", ROOT / "flat_test.json", "flat")
+THEORY = QuestionBank("theory_test", ROOT / "theory_test.json", "theory_pack")
+
+
+def flat_question(qid: int, topic: str = "Road Signs", difficulty: str = "Easy", **overrides) -> dict:
+    return {
+        "id": qid,
+        "topic": topic,
+        "difficulty": difficulty,
+        "question": f"Question {qid}?",
+        "options": ["A", "B", "C"],
+        "correct_answer_index": 1,
+        **overrides,
+    }
+
+
+def theory_pack(**question_overrides) -> dict:
+    question = {
+        "id": "q1",
+        "topicId": "signs",
+        "difficulty": "Hard",
+        "prompt": "What does this sign mean?",
+        "options": [{"id": "a", "text": "Stop"}, {"id": "b", "text": "Go"}],
+        "correctOptionId": "a",
+        **question_overrides,
+    }
+    return {
+        "topics": [{"id": "signs", "title": "Signs", "questionIds": ["q1"], "lessonIds": ["l1"]}],
+        "lessons": [{"id": "l1"}],
+        "questions": [question],
+    }
+
+
+def compile_json(bank: QuestionBank, payload) -> tuple[dict, dict, list]:
+    return compile_bank(bank, json.dumps(payload).encode("utf-8"))
+
+
+def test_flat_bank_index_and_shards():
+    questions = [
+        flat_question(1),
+        flat_question(2, topic="Speed Limits", difficulty="Hard"),
+        flat_question(3, difficulty="medium"),
+    ]
+
+    index, shards, problems = compile_json(FLAT, questions)
+
+    assert problems == []
+    assert index["questionCount"] == 3
+    assert index["difficulties"] == {"easy": [0], "medium": [2], "hard": [1]}
+    topics = {topic["id"]: topic for topic in index["topics"]}
+    assert topics["road_signs"]["ordinals"] == [0, 2]
+    assert topics["speed_limits"]["title"] == "Speed Limits"
+    shard = json.loads(shards[topics["road_signs"]["shard"]])
+    assert shard["questions"] == [questions[0], questions[2]]
+    assert topics["road_signs"]["bytes"] == len(shards[topics["road_signs"]["shard"]])
+
+
+def test_shard_names_change_with_their_content():
+    first, _, _ = compile_json(FLAT, [flat_question(1)])
+    second, _, _ = compile_json(FLAT, [flat_question(1, question="Edited?")])
+
+    assert first["topics"][0]["shard"] != second["topics"][0]["shard"]
+
+
+def test_flat_bank_problems():
+    questions = [
+        flat_question(1),
+        flat_question(1, options=["A", "A"]),
+        flat_question(2, correct_answer_index=3),
+        flat_question(3, options=["Only"], question=" "),
+        flat_question(4, difficulty="Expert"),
+        flat_question(5, topic="Road signs!"),
+        flat_question(6, options=["A", ""]),
+    ]
+
+    _, _, problems = compile_json(FLAT, questions)
+
+    assert problems == [
+        "question 1: id 1 repeats question 0",
+        "question 1: repeated option text",
+        "question 2: correct_answer_index 3 out of range",
+        "question 3: fewer than two options",
+        "question 3: correct_answer_index 1 out of range",
+        "question 3: blank question",
+        "question 5: topic 'Road signs!' collides with 'Road Signs'",
+        "question 6: blank option",
+        "question 4: unknown difficulty 'expert'",
+    ]
+
+
+def test_theory_pack_index():
+    index, shards, problems = compile_json(THEORY, theory_pack())
+
+    assert problems == []
+    assert index["difficulties"]["hard"] == [0]
+    assert [topic["id"] for topic in index["topics"]] == ["signs"]
+    assert len(shards) == 1
+
+
+def test_theory_pack_problems():
+    pack = theory_pack(topicId="nowhere", correctOptionId="z", prompt="")
+    pack["topics"][0]["lessonIds"].append("missing")
+
+    _, _, problems = compile_json(THEORY, pack)
+
+    assert problems == [
+        "question q1: unknown topicId 'nowhere'",
+        "question q1: correctOptionId 'z' is not an option",
+        "question q1: blank prompt",
+        "topic signs: questionIds do not match the questions tagged with it",
+        "topic signs: unknown lessonIds ['missing']",
+    ]
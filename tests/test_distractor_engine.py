@@ -0,0 +1,32 @@
+from distractor_engine import DistractorEngine
+from enrich_knowyoursigns_from_dft import FILLER_DISTRACTORS, semantic_distractors
+
+
+def test_allows_applies_the_neighbour_masks():
+    engine = DistractorEngine(["Bend to the left", "Bend to the right", "No entry", "No entry for vehicles"])
+
+    assert not engine.allows("Bend to the left", "Bend to the left")
+    assert not engine.allows("Bend to the left", "Bend to the right")
+    assert not engine.allows("Bend to the left", "Bend to the offside")
+    assert engine.allows("Bend to the left", "No entry")
+    assert engine.allows("Bend to the left", "Not in the pool")
+    strict = DistractorEngine(["No entry", "No entry for vehicles"], max_similarity=0.3)
+    assert not strict.allows("No entry", "No entry for vehicles")
+
+
+def test_top_up_skips_mirror_variants_of_the_answer():
+    engine = DistractorEngine(["Bend to the left", "Bend to the right", "Stop"])
+    assert engine.pick("Bend to the left") == ["Stop"]
+
+    picks = semantic_distractors(engine, "Bend to the left", ["Bend to the right", "Stop", "Bend to the left"])
+
+    assert picks == ["Stop", FILLER_DISTRACTORS[0], FILLER_DISTRACTORS[1]]
+
+
+def test_top_up_keeps_full_engine_picks():
+    descriptions = ["Stop", "Give way", "No entry", "No waiting", "Roadworks"]
+    engine = DistractorEngine(descriptions)
+    picks = engine.pick("Stop")
+    assert len(picks) == 3
+
+    assert semantic_distractors(engine, "Stop", ["Roadworks"]) == picks
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from enrich_knowyoursigns_from_dft import (
+    FALLBACK_DISTRACTORS,
+    FILLER_DISTRACTORS,
+    DistractorPools,
+    OrderedPool,
+    pick_distractors,
+    stable_index,
+)
+
+# A fixed pool set: a full category, a category too small once its own description is removed,
+# one whose only description repeats, and one that shares descriptions with the others.
+POOL_SET = {
+    "Warning signs": ["Bend ahead", "Crossroads", "Deer", "Falling rocks", "Roadworks", "Slippery road", "Bend ahead"],
+    "Regulatory signs": ["Stop", "Give way", "Stop"],
+    "Tram signs": ["Trams crossing"],
+    "Motorway signs": ["", "Start of motorway", "Crossroads", "End of motorway", "Give way"],
+}
+
+
+def list_pools(pool_set: dict[str, list[str]]) -> tuple[dict[str, list[str]], list[str]]:
+    """The pre-OrderedPool lists: per-category, then global, each deduplicated in insertion order."""
+    by_category: dict[str, list[str]] = {}
+    for category, descriptions in pool_set.items():
+        by_category.setdefault(category, [])
+        for description in descriptions:
+            if description and description not in by_category[category]:
+                by_category[category].append(description)
+    all_descriptions: list[str] = []
+    for values in by_category.values():
+        for value in values:
+            if value not in all_descriptions:
+                all_descriptions.append(value)
+    return by_category, all_descriptions
+
+
+def list_pick_distractors(sign_id, description, category, by_category, all_descriptions) -> list[str]:
+    """pick_distractors as it was before OrderedPool, filtering a copied list per sign."""
+    category_pool = [d for d in by_category.get(category, []) if d != description]
+    pool = category_pool if len(category_pool) >= 3 else [d for d in all_descriptions if d != description]
+    if not pool:
+        return list(FALLBACK_DISTRACTORS)
+    out: list[str] = []
+    idx = stable_index(sign_id, len(pool))
+    for _ in range(min(3, len(pool))):
+        candidate = pool[idx % len(pool)]
+        if candidate not in out:
+            out.append(candidate)
+        idx += 7
+    while len(out) < 3:
+        out.append(FILLER_DISTRACTORS[len(out)])
+    return out
+
+
+def ordered_pools(pool_set: dict[str, list[str]]) -> DistractorPools:
+    pools = DistractorPools()
+    for category, descriptions in pool_set.items():
+        for description in descriptions:
+            pools.add(category, description)
+    return pools.finalize()
+
+
+def test_pools_match_the_list_implementation():
+    pools = ordered_pools(POOL_SET)
+    by_category, all_descriptions = list_pools(POOL_SET)
+
+    assert {category: pool.items for category, pool in pools.by_category.items()} == by_category
+    assert pools.all.items == all_descriptions
+
+
+@pytest.mark.parametrize("category", [*POOL_SET, "Unknown signs"])
+def test_picks_match_the_list_implementation(category):
+    pools = ordered_pools(POOL_SET)
+    by_category, all_descriptions = list_pools(POOL_SET)
+    # Every description in the set (removed from its own pool at every position), plus one in no pool.
+    descriptions = [*all_descriptions, "Not in any pool", ""]
+
+    for description in descriptions:
+        for n in range(40):
+            sign_id = f"sign-{n}"
+            expected = list_pick_distractors(sign_id, description, category, by_category, all_descriptions)
+            assert pick_distractors(sign_id, description, category, pools) == expected, (sign_id, description)
+
+
+def test_item_without_matches_a_filtered_list():
+    pool = OrderedPool()
+    for value in ["a", "b", "c", "d", "b"]:
+        pool.add(value)
+
+    for excluded in ["a", "b", "d", "z"]:
+        filtered = [value for value in pool.items if value != excluded]
+        assert pool.size_without(excluded) == len(filtered)
+        assert [pool.item_without(i, excluded) for i in range(len(filtered))] == filtered
+        for seed in ["sign-1", "sign-22", "x"]:
+            size = pool.size_without(excluded)
+            assert pool.item_without(stable_index(seed, size), excluded) == filtered[stable_index(seed, len(filtered))]
+
+
+def test_randomised_pools_match_the_list_implementation():
+    rng = random.Random(8)
+    words = [f"meaning {n}" for n in range(12)]
+    for _ in range(200):
+        pool_set = {
+            f"category {c}": [rng.choice(words + [""]) for _ in range(rng.randrange(0, 6))]
+            for c in range(rng.randrange(1, 4))
+        }
+        pools = ordered_pools(pool_set)
+        by_category, all_descriptions = list_pools(pool_set)
+        category = rng.choice([*pool_set, "missing"])
+        description = rng.choice(words)
+        sign_id = f"sign-{rng.randrange(1000)}"
+        assert pick_distractors(sign_id, description, category, pools) == list_pick_distractors(
+            sign_id, description, category, by_category, all_descriptions
+        )
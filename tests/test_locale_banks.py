@@ -0,0 +1,137 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import enrich_knowyoursigns_from_dft as enrich
+from locale_banks import (
+    Translator,
+    build_locale_banks,
+    catalogue_template,
+    load_catalogue,
+    load_catalogues,
+    localize_questions,
+)
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "locales"
+HINT = "Warning signs usually prepare you for hazards ahead: ease speed early."
+
+
+def sign(sign_id: str, title: str) -> dict:
+    return {
+        "sign_id": sign_id,
+        "title": title,
+        "meaning": f"This sign means: {title}.",
+        "category": "Warning signs",
+        "driver_action": "Slow down and prepare for the hazard ahead.",
+        "memory_hint": HINT,
+    }
+
+
+THEORY = {
+    "chapters": [
+        {
+            "title": "Warning signs",
+            "sections": [
+                {"title": "Road layout", "signs": [sign("516", "Road narrows on both sides"), sign("504.1", "Crossroads")]}
+            ],
+        }
+    ]
+}
+QUESTIONS = [
+    {
+        "id": 1,
+        "sign_id": "516",
+        "topic": "Warning signs",
+        "question": "You see this sign (Warning signs). What does it mean?",
+        "options": ["Crossroads", "Road narrows on both sides", "Humps in the road"],
+        "correct_answer_index": 1,
+        "explanation": "This sign means: Road narrows on both sides.",
+    }
+]
+
+
+@pytest.fixture
+def catalogue() -> dict:
+    return load_catalogue(FIXTURES / "fr.json")
+
+
+def test_untranslated_keys_fall_back_to_english(catalogue):
+    translator = Translator(catalogue)
+
+    assert translator.meaning("Crossroads") == "Intersection"
+    assert translator.meaning("Crossroads.") == "Intersection"
+    assert translator.meaning("Humps in the road") == "Humps in the road"
+    assert translator.lookup("hints", HINT) == HINT
+    assert translator.missing["meanings"] == {"Humps in the road"}
+    assert translator.missing["hints"] == {HINT}
+
+
+def test_localize_questions_fills_the_templates_and_keeps_answer_order(catalogue):
+    actions = {"516": "Slow down and prepare for the hazard ahead."}
+
+    (local,), duplicates = localize_questions(QUESTIONS, actions, Translator(catalogue))
+
+    assert duplicates == 0
+    assert local["options"] == ["Intersection", "Chaussée rétrécie des deux côtés", "Humps in the road"]
+    assert local["correct_answer_index"] == 1
+    assert local["topic"] == "Panneaux de danger"
+    assert local["question"] == "Vous voyez ce panneau (Panneaux de danger). Que signifie-t-il ?"
+    assert local["explanation"] == (
+        "Ce panneau signifie : Chaussée rétrécie des deux côtés. Réaction : Ralentissez et préparez-vous au danger."
+    )
+
+
+def test_catalogue_without_templates_is_rejected(tmp_path):
+    path = tmp_path / "xx.json"
+    path.write_text(json.dumps({"templates": {"question": "?"}}), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="meaning, explanation"):
+        load_catalogue(path)
+
+
+def test_process_pool_matches_serial_build(catalogue):
+    german = {**catalogue, "locale": "de", "meanings": {}, "categories": {}, "actions": {}}
+    catalogues = [catalogue, german]
+
+    serial = build_locale_banks(catalogues, THEORY, QUESTIONS, workers=1, minified=True, compact=True)
+    pooled = build_locale_banks(catalogues, THEORY, QUESTIONS, workers=2, minified=True, compact=True)
+
+    assert [bank.locale for bank in pooled] == ["fr", "de"]
+    assert pooled == serial
+    french, _ = serial
+    assert french.missing == {"categories": 0, "meanings": 1, "actions": 0, "hints": 1}
+    assert french.total == {"categories": 1, "meanings": 3, "actions": 1, "hints": 1}
+
+
+def test_locale_banks_are_written_as_named_variants(tmp_path, monkeypatch):
+    monkeypatch.setattr(enrich, "THEORY_PATHS", [tmp_path / "Drivest_KnowYourSigns_Theory.json"])
+    monkeypatch.setattr(enrich, "QUESTION_PATHS", [tmp_path / "Drivest_KnowYourSigns_Questions.json"])
+
+    banks, result = enrich.write_locale_banks(
+        load_catalogues(FIXTURES), THEORY, QUESTIONS, minified=True, gzipped=True, compact=True
+    )
+
+    assert [bank.locale for bank in banks] == ["fr"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "Drivest_KnowYourSigns_Questions.fr.compact.json",
+        "Drivest_KnowYourSigns_Questions.fr.json",
+        "Drivest_KnowYourSigns_Questions.fr.json.gz",
+        "Drivest_KnowYourSigns_Questions.fr.min.json",
+        "Drivest_KnowYourSigns_Theory.fr.json",
+        "Drivest_KnowYourSigns_Theory.fr.json.gz",
+        "Drivest_KnowYourSigns_Theory.fr.min.json",
+    ]
+    theory = json.loads((tmp_path / "Drivest_KnowYourSigns_Theory.fr.json").read_text(encoding="utf-8"))
+    narrows = theory["chapters"][0]["sections"][0]["signs"][0]
+    assert narrows["meaning"] == "Ce panneau signifie : Chaussée rétrécie des deux côtés."
+    assert narrows["memory_hint"] == HINT
+
+
+def test_template_lists_every_english_string():
+    template = catalogue_template(THEORY, QUESTIONS, "fr")
+
+    assert template["templates"] == {"question": "", "meaning": "", "explanation": ""}
+    assert sorted(template["meanings"]) == ["Crossroads", "Humps in the road", "Road narrows on both sides"]
+    assert set(template["meanings"].values()) == {""}
+    assert list(template["hints"]) == [HINT]
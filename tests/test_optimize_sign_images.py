@@ -0,0 +1,63 @@
+import io
+
+from PIL import Image
+
+from optimize_sign_images import OptimizeSettings, optimize_image, strip_jpeg_metadata
+
+
+def jpeg_with_metadata(size: tuple[int, int], quality: int) -> bytes:
+    image = Image.new("RGB", size)
+    image.putdata([((x * 37) % 256, (y * 59) % 256, (x * y) % 256) for y in range(size[1]) for x in range(size[0])])
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=quality, exif=exif, icc_profile=b"\0" * 2048, comment=b"exported by an editor")
+    return buffer.getvalue()
+
+
+def assert_no_metadata(data: bytes) -> None:
+    with Image.open(io.BytesIO(data)) as image:
+        assert not image.getexif()
+        assert "icc_profile" not in image.info and "comment" not in image.info
+
+
+def pixels(data: bytes) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        return image.tobytes()
+
+
+def test_kept_image_ships_original_data_without_metadata(tmp_path):
+    source = tmp_path / "501.jpg"
+    # Low quality, so re-encoding at the default quality 85 only grows it.
+    source.write_bytes(jpeg_with_metadata((40, 30), quality=20))
+    target = tmp_path / "out" / "501.jpg"
+
+    result = optimize_image(source, target, OptimizeSettings())
+
+    assert result.action == "kept"
+    data = target.read_bytes()
+    assert result.output_bytes == len(data) < result.source_bytes == source.stat().st_size
+    assert_no_metadata(data)
+    assert pixels(data) == pixels(source.read_bytes())
+
+
+def test_reencoded_image_has_no_metadata(tmp_path):
+    source = tmp_path / "501.jpg"
+    source.write_bytes(jpeg_with_metadata((1200, 60), quality=98))
+    target = tmp_path / "out" / "501.jpg"
+
+    result = optimize_image(source, target, OptimizeSettings(max_edge=600))
+
+    assert result.action == "resized" and result.output_dimensions == (600, 30)
+    assert_no_metadata(target.read_bytes())
+
+
+def test_strip_keeps_jfif_and_leaves_non_jpeg_data_alone():
+    data = jpeg_with_metadata((8, 8), quality=90)
+    stripped = strip_jpeg_metadata(data)
+
+    assert stripped[:4] == b"\xff\xd8\xff\xe0"
+    assert stripped.endswith(data[data.index(b"\xff\xda") :])
+    assert strip_jpeg_metadata(stripped) == stripped
+    assert strip_jpeg_metadata(b"\x89PNG\r\n") == b"\x89PNG\r\n"
+    assert strip_jpeg_metadata(data[:40]) == data[:40]
@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from question_bank_compact import compact_questions, expand_questions, infer_fields
+
+ROOT = Path(__file__).resolve().parents[1]
+KYS_QUESTIONS = ROOT / "trafficsigns" / "Drivest_KnowYourSigns_Questions_Expanded.json"
+
+
+def round_trip(questions: list[dict]) -> list[dict]:
+    # Through JSON, as the .compact.json files are read back.
+    return expand_questions(json.loads(json.dumps(compact_questions(questions))))
+
+
+def test_kys_bank_round_trips_with_key_order():
+    questions = json.loads(KYS_QUESTIONS.read_text(encoding="utf-8"))
+
+    expanded = round_trip(questions)
+
+    assert expanded == questions
+    assert [list(q) for q in expanded] == [list(q) for q in questions]
+
+
+def test_strings_are_interned_most_used_first():
+    questions = [
+        {"id": 1, "topic": "Signs", "options": ["Stop", "Give way"]},
+        {"id": 2, "topic": "Signs", "options": ["Give way", "No entry"]},
+    ]
+
+    payload = compact_questions(questions)
+
+    assert payload["fields"] == [["id", "int"], ["topic", "str"], ["options", "str[]"]]
+    assert payload["strings"] == ["Signs", "Give way", "Stop", "No entry"]
+    assert payload["questions"] == [[1, 0, [2, 1]], [2, 0, [1, 3]]]
+
+
+def test_nulls_round_trip_in_every_kind():
+    questions = [
+        {"id": None, "hint": "Look left", "options": ["A"], "note": None},
+        {"id": 7, "hint": None, "options": None, "note": None},
+    ]
+
+    assert infer_fields(questions) == [["id", "int"], ["hint", "str"], ["options", "str[]"], ["note", "str"]]
+    assert round_trip(questions) == questions
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["text", 3],
+        [["a", "b"], "a"],
+        [1, ["a"]],
+        [True, 1],
+        [1, False],
+        [[1, 2]],
+        [{"nested": "dict"}],
+        [1.5],
+    ],
+)
+def test_fields_that_cannot_be_stored_compactly_are_rejected(values):
+    questions = [{"id": n, "value": value} for n, value in enumerate(values)]
+
+    with pytest.raises(ValueError, match="field 'value' cannot be stored compactly"):
+        compact_questions(questions)
+
+
+def test_questions_must_share_keys_and_order():
+    with pytest.raises(ValueError, match="Question 1 has keys"):
+        infer_fields([{"id": 1, "topic": "a"}, {"topic": "b", "id": 2}])
+
+
+def test_expand_rejects_other_formats():
+    payload = compact_questions([{"id": 1}])
+
+    with pytest.raises(ValueError, match="Not a compact question bank"):
+        expand_questions({**payload, "format": "other"})
+    with pytest.raises(ValueError, match="Unsupported compact question bank version"):
+        expand_questions({**payload, "version": 99})
+    with pytest.raises(ValueError, match="Unknown field kind"):
+        expand_questions({**payload, "fields": [["id", "float"]]})
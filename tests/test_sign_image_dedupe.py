@@ -0,0 +1,64 @@
+import json
+import os
+
+from PIL import Image
+
+import sign_image_dedupe
+from sign_image_dedupe import find_duplicates, fingerprint_images
+
+
+def write_image(path, colour, size=(32, 32)):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, colour).save(path, "JPEG")
+
+
+def jobs_for(root, perceptual=True):
+    return [(path.relative_to(root).as_posix(), path, None, perceptual) for path in sorted(root.rglob("*.jpg"))]
+
+
+def test_byte_identical_images_alias_the_most_referenced(tmp_path):
+    write_image(tmp_path / "a" / "501.jpg", "red")
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "501.jpg").write_bytes((tmp_path / "a" / "501.jpg").read_bytes())
+    write_image(tmp_path / "c" / "601.jpg", "blue")
+
+    aliases, groups = find_duplicates(fingerprint_images(jobs_for(tmp_path, False)), {"b/501.jpg": 3, "a/501.jpg": 1})
+
+    assert aliases == {"a/501.jpg": "b/501.jpg"}
+    assert [group["canonical"] for group in groups] == ["b/501.jpg"]
+
+
+def test_cached_fingerprints_skip_unchanged_sources(tmp_path, monkeypatch):
+    root, cache = tmp_path / "images", tmp_path / "cache" / "fingerprints.json"
+    write_image(root / "501.jpg", "red")
+    write_image(root / "601.jpg", "blue")
+    first = fingerprint_images(jobs_for(root), cache_path=cache)
+    assert sorted(json.loads(cache.read_text(encoding="utf-8"))["images"]) == sorted(str(p) for p in root.glob("*.jpg"))
+
+    def no_decoding(job):
+        raise AssertionError(f"{job[1]} was fingerprinted again")
+
+    monkeypatch.setattr(sign_image_dedupe, "fingerprint", no_decoding)
+    assert fingerprint_images(jobs_for(root), cache_path=cache) == first
+    monkeypatch.undo()
+
+    write_image(root / "601.jpg", "green", size=(40, 40))
+    os.utime(root / "601.jpg", ns=(1, 1))
+    (root / "501.jpg").unlink()
+    again = fingerprint_images(jobs_for(root), cache_path=cache)
+
+    assert again == fingerprint_images(jobs_for(root))
+    assert again[0].sha256 != first[1].sha256
+    assert list(json.loads(cache.read_text(encoding="utf-8"))["images"]) == [str(root / "601.jpg")]
+
+
+def test_sha_only_cache_entries_are_refreshed_for_perceptual_runs(tmp_path, monkeypatch):
+    root, cache = tmp_path / "images", tmp_path / "fingerprints.json"
+    write_image(root / "501.jpg", "red")
+    fingerprint_images(jobs_for(root, perceptual=False), cache_path=cache)
+
+    (item,) = fingerprint_images(jobs_for(root), cache_path=cache)
+
+    assert item.dhash is not None and item.thumbnail
+    assert "dhash" in json.loads(cache.read_text(encoding="utf-8"))["images"][str(root / "501.jpg")]
+
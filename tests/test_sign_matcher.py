@@ -0,0 +1,66 @@
+import pytest
+
+from enrich_knowyoursigns_from_dft import SignMatcher
+from sign_sheet import SignMeta
+
+
+def meta(jpg: str, dgno: str = "") -> SignMeta:
+    return SignMeta(
+        category="Warning signs",
+        description=f"Row {jpg}",
+        caption="",
+        dgno=dgno or jpg.rsplit(".", 1)[0],
+        jpg=jpg,
+        shape="",
+        bg_colour="",
+        bd_colour="",
+        text="",
+        symbol1="",
+        symbol2="",
+    )
+
+
+ROWS = [
+    meta("501.jpg"),
+    meta("530.jpg"),
+    meta("507.1.jpg"),
+    meta("506.1RL.jpg", dgno="507.1"),
+    meta("506.1RLL.jpg", dgno="507.1"),
+    meta("610-1.jpg", dgno="610.1"),
+]
+
+
+@pytest.fixture(scope="module")
+def matcher() -> SignMatcher:
+    return SignMatcher({row.jpg.lower(): row for row in ROWS})
+
+
+@pytest.mark.parametrize(
+    "filename, jpg, how",
+    [
+        ("501.jpg", "501.jpg", "exact"),
+        ("501.JPG", "501.jpg", "exact"),
+        ("501.png", "501.jpg", "stem"),
+        ("530A.jpg", "530.jpg", "prefix"),
+        ("507.1LRR.jpg", "507.1.jpg", "prefix"),
+        ("610_1.jpg", "610-1.jpg", "normalized"),
+        ("506.1RLLX.jpg", "506.1RLL.jpg", "variant"),
+        ("507.RLL.jpg", "506.1RLL.jpg", "diagram"),
+    ],
+)
+def test_lookup_tiers(matcher, filename, jpg, how):
+    found, matched_by = matcher.match(filename)
+
+    assert (found.jpg if found else None, matched_by) == (jpg, how)
+
+
+@pytest.mark.parametrize("filename", ["999.jpg", "507.LLL.jpg", "unknown.jpg", ".jpg"])
+def test_unmatched(matcher, filename):
+    assert matcher.match(filename) == (None, "unmatched")
+
+
+def test_first_row_wins_for_colliding_normalized_stems():
+    first, second = meta("610-1.jpg"), meta("610_1.jpg")
+    matcher = SignMatcher({row.jpg.lower(): row for row in (first, second)})
+
+    assert matcher.match("6101.jpg") == (first, "normalized")
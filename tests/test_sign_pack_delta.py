@@ -0,0 +1,165 @@
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from sign_pack_delta import (
+    DELTA_VERSION,
+    PACK_NAME,
+    DeltaError,
+    apply_delta,
+    build_delta,
+    encode_delta_zip,
+    encode_pack,
+    image_hashes,
+    sign_keys,
+    verify_delta,
+    version_manifest,
+)
+
+
+def make_sign(n: int, code: str, image: str, **extra) -> dict:
+    return {"id": f"sign-{n}", "code": code, "caption": f"Sign {code}", "imageAssetPath": f"images/{image}", **extra}
+
+
+def write_root(root: Path, codes: list[str], images: dict[str, bytes] | None = None, **extra) -> dict:
+    """Write a pack (one sign per code, numbered like the builder) and its images; return its manifest."""
+    signs = [make_sign(n, code, f"{code}.jpg", **extra.get(code, {})) for n, code in enumerate(codes, start=1)]
+    pack = {"version": 1, "categories": ["Warning"], "signs": signs}
+    for sign in signs:
+        path = root / sign["imageAssetPath"]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes((images or {}).get(sign["code"], sign["code"].encode("utf-8")))
+    pack_bytes = encode_pack(pack)
+    (root / PACK_NAME).write_bytes(pack_bytes)
+    return version_manifest(pack_bytes, pack, image_hashes(root, pack))
+
+
+def make_delta(tmp_path: Path, base: dict, target: dict) -> tuple[dict, Path]:
+    target_root = tmp_path / "target"
+    pack = json.loads((target_root / PACK_NAME).read_text(encoding="utf-8"))
+    delta = build_delta(base, target, pack)
+    delta_zip = tmp_path / "delta.zip"
+    delta_zip.write_bytes(encode_delta_zip(delta, target_root))
+    return delta, delta_zip
+
+
+def test_inserted_row_is_one_addition_not_a_renumbered_tail(tmp_path):
+    codes = [f"{500 + n}" for n in range(20)]
+    base = write_root(tmp_path / "base", codes)
+    target = write_root(tmp_path / "target", codes[:5] + ["999"] + codes[5:])
+
+    delta, delta_zip = make_delta(tmp_path, base, target)
+
+    assert list(delta["added"]) == ["999|images/999.jpg"]
+    assert delta["changed"] == {}
+    assert delta["removed"] == []
+    assert delta["order"] == [[0, 5], ["999|images/999.jpg"], [5, 20]]
+    assert list(delta["images"]) == ["images/999.jpg"]
+    assert verify_delta(tmp_path / "base", delta_zip, tmp_path / "target") == []
+
+
+def test_changed_removed_and_reordered_signs_round_trip(tmp_path):
+    base = write_root(tmp_path / "base", ["501", "502", "503", "504"])
+    target = write_root(
+        tmp_path / "target",
+        ["504", "501", "503", "505"],
+        images={"503": b"redrawn"},
+        **{"501": {"caption": "Renamed"}},
+    )
+
+    delta, delta_zip = make_delta(tmp_path, base, target)
+
+    assert sorted(delta["changed"]) == ["501|images/501.jpg"]
+    assert delta["removed"] == ["502|images/502.jpg"]
+    assert delta["removedImages"] == ["images/502.jpg"]
+    assert sorted(delta["images"]) == ["images/503.jpg", "images/505.jpg"]
+
+    out = tmp_path / "out"
+    apply_delta(tmp_path / "base", delta_zip, out)
+    assert (out / PACK_NAME).read_bytes() == (tmp_path / "target" / PACK_NAME).read_bytes()
+    assert (out / "images" / "503.jpg").read_bytes() == b"redrawn"
+    assert not (out / "images" / "502.jpg").exists()
+
+
+def test_apply_in_place(tmp_path):
+    base = write_root(tmp_path / "base", ["501", "502"])
+    target = write_root(tmp_path / "target", ["501", "503"])
+    _, delta_zip = make_delta(tmp_path, base, target)
+
+    apply_delta(tmp_path / "base", delta_zip, tmp_path / "base")
+
+    assert (tmp_path / "base" / PACK_NAME).read_bytes() == (tmp_path / "target" / PACK_NAME).read_bytes()
+    assert sorted(p.name for p in (tmp_path / "base" / "images").iterdir()) == ["501.jpg", "503.jpg"]
+
+
+def test_bad_image_hash_leaves_an_in_place_pack_untouched(tmp_path):
+    base = write_root(tmp_path / "base", ["501", "502"])
+    target = write_root(tmp_path / "target", ["501", "503"])
+    _, delta_zip = make_delta(tmp_path, base, target)
+    with zipfile.ZipFile(delta_zip) as archive:
+        entries = {name: archive.read(name) for name in archive.namelist()}
+    with zipfile.ZipFile(delta_zip, "w") as archive:
+        for name, data in entries.items():
+            archive.writestr(name, b"corrupt" if name == "images/503.jpg" else data)
+    before = {p.relative_to(tmp_path).as_posix(): p.read_bytes() for p in (tmp_path / "base").rglob("*") if p.is_file()}
+
+    with pytest.raises(DeltaError, match="Image hash mismatch"):
+        apply_delta(tmp_path / "base", delta_zip, tmp_path / "base")
+
+    after = {p.relative_to(tmp_path).as_posix(): p.read_bytes() for p in (tmp_path / "base").rglob("*") if p.is_file()}
+    assert after == before
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["base", "delta.zip", "target"]
+
+
+def test_apply_replaces_an_existing_pack_but_not_other_folders(tmp_path):
+    base = write_root(tmp_path / "base", ["501"])
+    target = write_root(tmp_path / "target", ["501", "502"])
+    _, delta_zip = make_delta(tmp_path, base, target)
+    write_root(tmp_path / "out", ["900"])
+
+    apply_delta(tmp_path / "base", delta_zip, tmp_path / "out")
+
+    assert sorted(p.name for p in (tmp_path / "out" / "images").iterdir()) == ["501.jpg", "502.jpg"]
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "todo.txt").write_text("keep me", encoding="utf-8")
+    with pytest.raises(DeltaError, match="not a sign asset pack"):
+        apply_delta(tmp_path / "base", delta_zip, tmp_path / "notes")
+    assert (tmp_path / "notes" / "todo.txt").read_text(encoding="utf-8") == "keep me"
+
+
+@pytest.mark.parametrize("out", ["base/nested", "."])
+def test_apply_refuses_overlapping_roots(tmp_path, out):
+    base = write_root(tmp_path / "base", ["501"])
+    target = write_root(tmp_path / "target", ["501", "502"])
+    _, delta_zip = make_delta(tmp_path, base, target)
+
+    with pytest.raises(DeltaError, match="overlaps"):
+        apply_delta(tmp_path / "base", delta_zip, tmp_path / out)
+    assert (tmp_path / "base" / "images" / "501.jpg").exists()
+
+
+def test_apply_rejects_a_different_base(tmp_path):
+    base = write_root(tmp_path / "base", ["501"])
+    target = write_root(tmp_path / "target", ["501", "502"])
+    _, delta_zip = make_delta(tmp_path, base, target)
+    write_root(tmp_path / "base", ["501"], **{"501": {"caption": "Edited"}})
+
+    with pytest.raises(DeltaError, match="Base pack does not match"):
+        apply_delta(tmp_path / "base", delta_zip, tmp_path / "out")
+
+
+def test_build_delta_rejects_positional_base_manifests(tmp_path):
+    base = write_root(tmp_path / "base", ["501"])
+    target = write_root(tmp_path / "target", ["501", "502"])
+    base.pop("deltaVersion")
+
+    with pytest.raises(DeltaError, match=f"delta format {DELTA_VERSION}"):
+        make_delta(tmp_path, base, target)
+
+
+def test_sign_keys_number_repeats():
+    signs = [make_sign(1, "501", "a.jpg"), make_sign(2, "501", "a.jpg"), make_sign(3, "501", "b.jpg")]
+
+    assert sign_keys(signs) == ["501|images/a.jpg", "501|images/a.jpg#2", "501|images/b.jpg"]
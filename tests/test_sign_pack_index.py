@@ -0,0 +1,58 @@
+import pytest
+
+from sign_pack_index import HEADER, IndexFormatError, SignIndex, code_path_map, decode_index, encode_index, lookup
+
+SIGNS = [
+    {"code": "501", "imageAssetPath": "images/a/501.jpg", "caption": "Stop", "description": "Stop and give way"},
+    {"code": "610.1L", "imageAssetPath": "images/b/610.1L.jpg", "caption": "Keep left", "description": "Keep left"},
+    {"code": " 954.3 ", "imageAssetPath": "images/b/954.jpg", "caption": "Bus lane", "description": "Bus lane ahead"},
+    {"code": "", "imageAssetPath": "images/none.jpg", "caption": "Uncoded", "description": "Speed camera"},
+    {"code": "501", "imageAssetPath": "images/a/501b.jpg", "caption": "Stop", "description": "Stop (alternative)"},
+    {"code": "670", "imageAssetPath": "images/c/670.jpg", "caption": "Speed limit 30", "description": "Maximum speed"},
+    {"code": "6700", "imageAssetPath": "images/c/ü.jpg", "caption": "Geschwindigkeit", "description": "Umlaut path"},
+]
+
+
+def test_code_path_map_trims_skips_blanks_and_keeps_the_last_sign():
+    assert code_path_map(SIGNS) == {
+        "501": "images/a/501b.jpg",
+        "610.1L": "images/b/610.1L.jpg",
+        "954.3": "images/b/954.jpg",
+        "670": "images/c/670.jpg",
+        "6700": "images/c/ü.jpg",
+    }
+
+
+def test_binary_index_round_trip_and_lookup():
+    mapping = code_path_map(SIGNS)
+    data = encode_index(mapping)
+    index = SignIndex(data)
+
+    assert decode_index(data) == mapping == index.items()
+    for code, path in mapping.items():
+        assert index.lookup(code) == path == lookup(data, code)
+    for missing in ("", "50", "5010", "671", "zzz"):
+        assert index.lookup(missing) is None
+        assert lookup(data, missing) is None
+
+
+def test_empty_binary_index():
+    data = encode_index({})
+
+    assert decode_index(data) == {}
+    assert lookup(data, "501") is None
+
+
+def test_binary_index_rejects_corruption():
+    data = encode_index(code_path_map(SIGNS))
+    flipped = bytearray(data)
+    flipped[-1] ^= 0xFF
+
+    with pytest.raises(IndexFormatError, match="checksum"):
+        SignIndex(bytes(flipped))
+    with pytest.raises(IndexFormatError, match="sizes"):
+        SignIndex(data[:-1])
+    with pytest.raises(IndexFormatError, match="magic"):
+        SignIndex(b"XXXX" + data[4:])
+    with pytest.raises(IndexFormatError, match="shorter"):
+        lookup(data[: HEADER.size - 1], "501")
@@ -0,0 +1,63 @@
+import pytest
+
+from sign_rules import RuleSet, load_ruleset
+
+RULES = [
+    {"id": "late", "priority": 30, "all": [{"text": ["speed"]}], "result": "speed"},
+    {"id": "stop", "priority": 10, "all": [{"text": ["stop"]}], "none": [{"text": ["bus stop"]}], "result": "stop"},
+    {
+        "id": "warning_bend",
+        "priority": 20,
+        "all": [{"category": ["warning"]}, {"text": ["bend", "curve"]}],
+        "result": "bend",
+    },
+    {"id": "tie_first", "priority": 40, "all": [{"text": ["lane"]}], "result": "first"},
+    {"id": "tie_second", "priority": 40, "all": [{"text": ["lane"]}], "result": "second"},
+]
+
+
+def test_rules_apply_in_priority_order_with_file_order_for_ties():
+    rules = RuleSet(RULES)
+
+    assert rules.classify("STOP and speed check", "", "none") == "stop"
+    assert rules.classify("Bus stop speed limit", "", "none") == "speed"
+    assert rules.classify("Bus lane", "", "none") == "first"
+    assert rules.classify("Zebra crossing", "", "none") == "none"
+
+
+def test_every_all_clause_must_match_and_fields_are_separate():
+    rules = RuleSet(RULES)
+
+    assert rules.classify("Double bend ahead", "Warning signs", "none") == "bend"
+    assert rules.classify("Double bend ahead", "Regulatory signs", "none") == "none"
+    assert rules.classify("Warning", "bend", "none") == "none"
+
+
+def test_match_explains_the_rule_and_terms():
+    match = RuleSet(RULES).match("Sharp curve and bend", "Warning", "none")
+
+    assert match.rule_id == "warning_bend"
+    assert match.terms == ("warning", "bend", "curve")
+    assert RuleSet(RULES).match("Zebra", "", "none").rule_id is None
+
+
+@pytest.mark.parametrize("rule_id", ["x\nimport os", "Upper", "with space", "", 7])
+def test_invalid_rule_ids_never_reach_the_generated_source(rule_id):
+    with pytest.raises(ValueError, match="Invalid rule id"):
+        RuleSet([{"id": rule_id, "all": [{"text": ["stop"]}], "result": "stop"}])
+
+
+def test_terms_are_quoted_not_spliced_into_the_source():
+    rules = RuleSet([{"id": "quote", "all": [{"text": ["it's \"odd\"\n"]}], "result": "odd"}])
+
+    assert rules.classify("it's \"odd\"\n sign", "", "none") == "odd"
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError, match="Unknown rule field"):
+        RuleSet([{"id": "bad", "all": [{"caption": ["stop"]}], "result": "stop"}])
+
+
+def test_shipped_rule_sets_compile():
+    assert load_ruleset("driver_action").classify("No entry for vehicular traffic", "", "none") != "none"
+    assert load_ruleset("family").rules
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from sign_search_index import SearchIndex, SearchIndexError, brute_force_search, encode_search_index
+
+SIGNS = [
+    {"code": "501", "imageAssetPath": "images/a/501.jpg", "caption": "Stop", "description": "Stop and give way"},
+    {"code": "610.1L", "imageAssetPath": "images/b/610.1L.jpg", "caption": "Keep left", "description": "Keep left"},
+    {"code": " 954.3 ", "imageAssetPath": "images/b/954.jpg", "caption": "Bus lane", "description": "Bus lane ahead"},
+    {"code": "", "imageAssetPath": "images/none.jpg", "caption": "Uncoded", "description": "Speed camera"},
+    {"code": "501", "imageAssetPath": "images/a/501b.jpg", "caption": "Stop", "description": "Stop (alternative)"},
+    {"code": "670", "imageAssetPath": "images/c/670.jpg", "caption": "Speed limit 30", "description": "Maximum speed"},
+    {"code": "6700", "imageAssetPath": "images/c/ü.jpg", "caption": "Geschwindigkeit", "description": "Umlaut path"},
+]
+
+
+@pytest.mark.parametrize("query", ["stop", "st", "keep le", "610", "610.1", "954.3", "speed", "speed 30", "bus x", "", "ü"])
+def test_search_index_matches_brute_force(query):
+    index = SearchIndex(encode_search_index(SIGNS, max_prefix=3))
+
+    assert index.search(query) == brute_force_search(SIGNS, query)
+
+
+def test_search_index_matches_brute_force_on_random_queries():
+    rng = random.Random(0)
+    words = [f"{rng.choice('abcs')}{rng.choice('aeiou')}{rng.choice('nrst')}{rng.choice(['', 'e', 'ing'])}" for _ in range(40)]
+    signs = [{"code": str(500 + n), "caption": " ".join(rng.sample(words, 3))} for n in range(200)]
+    index = SearchIndex(encode_search_index(signs, max_prefix=2))
+
+    for _ in range(200):
+        query = " ".join(word[: rng.randint(1, len(word))] for word in rng.sample(words, rng.randint(1, 2)))
+        assert index.search(query) == brute_force_search(signs, query)
+
+
+def test_search_index_rejects_corruption():
+    data = bytearray(encode_search_index(SIGNS))
+    data[-1] ^= 0xFF
+
+    with pytest.raises(SearchIndexError, match="checksum"):
+        SearchIndex(bytes(data))
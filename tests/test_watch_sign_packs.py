@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from PIL import Image
+
+import build_traffic_signs_pack as pack_builder
+import watch_sign_packs
+from build_traffic_signs_pack import read_build_manifest, save_build_manifest
+
+
+def asset_files(asset_root):
+    return {p.relative_to(asset_root).as_posix(): p.read_bytes() for p in sorted(asset_root.rglob("*")) if p.is_file()}
+
+
+def test_warm_rebuild_reproduces_the_recorded_build_flags(synthetic_sign_build):
+    asset_root, rows = synthetic_sign_build
+    pack_builder.main(
+        ["--incremental", "--workers", "1", "--optimize", "--image-metadata", "--search-index", "--binary-index", "--dedupe"]
+    )
+    built = asset_files(asset_root)
+    manifest = read_build_manifest(pack_builder.BUILD_MANIFEST)
+    assert manifest["options"]["optimize"] and manifest["options"]["image_metadata"]
+
+    pack = watch_sign_packs.WarmSignPack(rows)
+
+    assert asset_files(asset_root) == built
+    assert read_build_manifest(pack_builder.BUILD_MANIFEST) == manifest
+    assert all("imageWidth" in sign for sign in json.loads(built["traffic_signs_pack_v1.json"])["signs"])
+    assert pack.summary.endswith("unchanged, 0/2 sidecar files written")
+
+    source = pack_builder.SOURCE_ROOT / "warning-signs-jpg" / "501.jpg"
+    Image.new("RGB", (40, 20), "green").save(source, "JPEG")
+    pack.rebuild(rows, {str(source)})
+
+    entry = read_build_manifest(pack_builder.BUILD_MANIFEST)["images"]["images/warning-signs-jpg/501.jpg"]
+    assert entry["encoding"] != "copy" and entry["outputDimensions"] == [40, 20]
+    sign = json.loads(pack_builder.OUTPUT_JSON.read_bytes())["signs"][0]
+    assert (sign["imageWidth"], sign["imageHeight"]) == (40, 20)
+
+
+def test_watcher_refuses_builds_it_cannot_reproduce(synthetic_sign_build):
+    _, rows = synthetic_sign_build
+    options = pack_builder.build_options(pack_builder.parse_args(["--deltas"]))
+    save_build_manifest(pack_builder.BUILD_MANIFEST, {}, {"options": options, "sidecars": []})
+    with pytest.raises(SystemExit, match="--deltas"):
+        watch_sign_packs.WarmSignPack(rows)
+
+    save_build_manifest(pack_builder.BUILD_MANIFEST, {"images/a.jpg": {"size": 1}})
+    with pytest.raises(SystemExit, match="does not record its build flags"):
+        watch_sign_packs.WarmSignPack(rows)
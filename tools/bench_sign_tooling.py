@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Benchmark the traffic sign tooling on synthetic DfT-style catalogues.
+
+For every scale (default 1k/10k/100k signs) a deterministic catalogue is
+generated once under --workdir: spreadsheet rows (plus a real .xls when
+xlwt is installed), an image tree with cross-folder duplicates and KYS
+theory/question JSON. Each stage then runs in a fresh subprocess so its
+wall time and peak RSS are measured in isolation. Loading the synthetic
+inputs dominates the process peak, so the reported and compared memory
+figure is stageRssKb: how far the stage raised the peak above the one left
+by its setup (peakRssKb - setupPeakRssKb):
+
+  sheet_load                   sign_sheet.iter_sign_rows (needs xlwt)
+  build_image_index            build_traffic_signs_pack.build_image_index
+  choose_candidate             candidate selection for every sheet row
+  pick_meta                    SignMatcher build + one match per theory sign
+  enrich_theory_and_questions  full enrichment incl. distractors
+  json_writers                 pack JSON encode + multi-target KYS writes
+
+Usage:
+  python tools/bench_sign_tooling.py [--scales 1000,10000] [--write-baseline]
+  python tools/bench_sign_tooling.py --baseline tools/bench_baseline.json --fail-on-regression
+"""
+
+import argparse
+import json
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "trafficsigns"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+import build_traffic_signs_pack as pack_builder  # noqa: E402
+import enrich_knowyoursigns_from_dft as enrich  # noqa: E402
+from pack_writer import encode_json, write_json_targets  # noqa: E402
+from sign_sheet import COLUMN_FOR_FIELD, FIELD_NAMES, SignMeta, iter_sign_rows  # noqa: E402
+
+
+DEFAULT_SCALES = (1000, 10000, 100000)
+STAGES = (
+    "sheet_load",
+    "build_image_index",
+    "choose_candidate",
+    "pick_meta",
+    "enrich_theory_and_questions",
+    "json_writers",
+)
+BASELINE_PATH = ROOT / "tools" / "bench_baseline.json"
+DEFAULT_TOLERANCE = 0.25
+# Stage RSS deltas of a few MB are allocator noise; growth below this is not a regression.
+RSS_NOISE_KB = 8192
+
+CATEGORY_NAMES = sorted({name.strip().capitalize() for name in pack_builder.CATEGORY_NAME_TO_FOLDER})
+VARIANT_SUFFIXES = ["", "", "", "L", "R", "LRR", "A", "M"]
+DESCRIPTION_WORDS = (
+    "no entry stop give way speed limit minimum end of turn left right ahead only keep one way "
+    "cyclists children school crossing bend junction bus lane cycle track pedestrian zebra tram "
+    "weight width height low bridge parking waiting loading bay route for use by vehicles motorway"
+).split()
+
+
+def generate_catalogue(scale: int, seed: int = 0) -> list[SignMeta]:
+    rng = random.Random(seed)
+    rows = []
+    for n in range(scale):
+        base = f"{500 + n // 10}.{n % 10}"
+        suffix = rng.choice(VARIANT_SUFFIXES)
+        categories = rng.sample(CATEGORY_NAMES, rng.choice([1, 1, 1, 2]))
+        description = " ".join(rng.sample(DESCRIPTION_WORDS, rng.randint(3, 9))).capitalize()
+        rows.append(
+            SignMeta(
+                category=", ".join(categories),
+                description=f"{description} {n}",
+                caption=description if rng.random() < 0.7 else "",
+                dgno=base,
+                jpg=f"{base}{suffix}.jpg",
+                shape=rng.choice(["Circle", "Triangle", "Rectangle", ""]),
+                bg_colour=rng.choice(["White", "Blue", "Red", ""]),
+                bd_colour=rng.choice(["Red", "White", ""]),
+                text=rng.choice(["", "STOP", "GIVE WAY", "30"]),
+                symbol1=rng.choice(["", "Arrow", "Car"]),
+                symbol2="",
+            )
+        )
+    return rows
+
+
+def generate_image_tree(root: Path, rows: list[SignMeta], seed: int = 0) -> None:
+    rng = random.Random(seed + 1)
+    folders = sorted(pack_builder.FOLDER_TITLE_OVERRIDES)
+    for row in rows:
+        if rng.random() < 0.02:
+            continue  # missing image
+        preferred = pack_builder.category_to_folders(row.category) or [rng.choice(folders)]
+        targets = {preferred[0]}
+        if rng.random() < 0.1:
+            targets.add(rng.choice(folders))  # same basename in another folder
+        for folder in targets:
+            path = root / f"{folder}-set" / folder / row.jpg
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"")
+
+
+def generate_theory(rows: list[SignMeta], seed: int = 0) -> tuple[dict, list[dict]]:
+    rng = random.Random(seed + 2)
+    chapters: dict[str, dict] = {}
+    questions = []
+    for n, row in enumerate(rows, start=1):
+        folder = (pack_builder.category_to_folders(row.category) or ["miscellaneous-jpg"])[0]
+        chapter = chapters.setdefault(
+            folder,
+            {"chapter_id": folder, "title": folder, "sections": [{"section_id": f"{folder}-core", "signs": []}]},
+        )
+        name = row.jpg
+        roll = rng.random()
+        if roll < 0.05:
+            name = name.upper()
+        elif roll < 0.08:
+            name = name.replace(".jpg", "x.jpg")
+        elif roll < 0.10:
+            name = name.replace(".", "-", 1)
+        sign_id = f"kys_{n:06d}"
+        chapter["sections"][0]["signs"].append(
+            {
+                "sign_id": sign_id,
+                "title": row.caption or "Road sign",
+                "category": "Road signs",
+                "image_path": f"{folder}/{name}",
+                "driver_action": "Follow the sign instruction safely.",
+            }
+        )
+        questions.append({"id": n, "sign_id": sign_id, "difficulty": rng.choice(["Easy", "Medium", "Hard"])})
+    return {"meta": {"dataset": "synthetic"}, "chapters": list(chapters.values())}, questions
+
+
+def write_xls(path: Path, rows: list[SignMeta]) -> bool:
+    try:
+        import xlwt
+    except ImportError:
+        return False
+    book = xlwt.Workbook()
+    sheet = book.add_sheet("Sheet1")
+    for col, name in enumerate(FIELD_NAMES):
+        sheet.write(0, col, COLUMN_FOR_FIELD[name])
+    # BIFF8 caps a sheet at 65536 rows, so the largest scales load a truncated sheet.
+    for r, row in enumerate(rows[:65535], start=1):
+        for col, value in enumerate(asdict(row).values()):
+            sheet.write(r, col, value)
+    book.save(str(path))
+    return True
+
+
+def prepare(workdir: Path, scale: int) -> Path:
+    target = workdir / f"scale_{scale}"
+    marker = target / "ready"
+    if marker.exists():
+        return target
+    if target.exists():
+        shutil.rmtree(target)
+    target.mkdir(parents=True)
+    rows = generate_catalogue(scale)
+    (target / "rows.json").write_text(json.dumps([asdict(row) for row in rows]), encoding="utf-8")
+    generate_image_tree(target / "images", rows)
+    theory, questions = generate_theory(rows)
+    (target / "theory.json").write_text(json.dumps(theory), encoding="utf-8")
+    (target / "questions.json").write_text(json.dumps(questions), encoding="utf-8")
+    write_xls(target / "sheet.xls", rows)
+    marker.write_text("ok", encoding="utf-8")
+    return target
+
+
+def peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_stage(data: Path, stage: str) -> dict:
+    """Run one stage in this process and return its measurements."""
+    rows = [SignMeta(**values) for values in json.loads((data / "rows.json").read_text(encoding="utf-8"))]
+    theory = json.loads((data / "theory.json").read_text(encoding="utf-8"))
+    questions = json.loads((data / "questions.json").read_text(encoding="utf-8"))
+    by_jpg = {row.jpg.lower(): row for row in rows}
+    image_names = [
+        Path(sign["image_path"]).name
+        for chapter in theory["chapters"]
+        for section in chapter["sections"]
+        for sign in section["signs"]
+    ]
+
+    if stage == "sheet_load":
+        if not (data / "sheet.xls").exists():
+            return {"skipped": "xlwt not installed"}
+        work = lambda: sum(1 for _ in iter_sign_rows(data / "sheet.xls", cache_root=None))  # noqa: E731
+    elif stage == "build_image_index":
+        work = lambda: pack_builder.build_image_index(data / "images")  # noqa: E731
+    elif stage == "choose_candidate":
+        index = pack_builder.build_image_index(data / "images")
+
+        def work():
+            for row in rows:
+                folders = pack_builder.category_to_folders(row.category)
+                pack_builder.choose_candidate(row.jpg, index.get(row.jpg, []), folders)
+
+    elif stage == "pick_meta":
+
+        def work():
+            matcher = enrich.SignMatcher(by_jpg)
+            for name in image_names:
+                enrich.pick_meta(name, matcher)
+
+    elif stage == "enrich_theory_and_questions":
+        matcher = enrich.SignMatcher(by_jpg)
+        work = lambda: enrich.enrich_theory_and_questions(theory, questions, matcher)  # noqa: E731
+    elif stage == "json_writers":
+        matcher = enrich.SignMatcher(by_jpg)
+        enriched_theory, enriched_questions = enrich.enrich_theory_and_questions(theory, questions, matcher)
+        pack = {"signs": [asdict(row) for row in rows]}
+        out = Path(tempfile.mkdtemp(prefix="bench_writers_"))
+
+        def work():
+            encode_json(pack)
+            write_json_targets([out / "a" / "theory.json", out / "b" / "theory.json"], enriched_theory)
+            write_json_targets([out / "a" / "questions.json", out / "b" / "questions.json"], enriched_questions)
+
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+    rss_before = peak_rss_kb()
+    start = time.perf_counter()
+    work()
+    wall = time.perf_counter() - start
+    if stage == "json_writers":
+        shutil.rmtree(out, ignore_errors=True)
+    peak = peak_rss_kb()
+    return {
+        "wallSeconds": round(wall, 6),
+        "stageRssKb": peak - rss_before,
+        "peakRssKb": peak,
+        "setupPeakRssKb": rss_before,
+    }
+
+
+def measure(data: Path, stage: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--child", str(data), stage],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for scale, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get("results", {}).get(scale, {}).get(stage)
+            if not previous or "wallSeconds" not in previous or "wallSeconds" not in current:
+                continue
+            for metric in ("wallSeconds", "stageRssKb"):
+                if metric not in previous:
+                    continue
+                limit = previous[metric] * (1 + tolerance)
+                if metric == "stageRssKb":
+                    limit = max(limit, previous[metric] + RSS_NOISE_KB)
+                if current[metric] > limit:
+                    ratio = f" ({current[metric] / previous[metric]:.2f}x)" if previous[metric] else ""
+                    regressions.append(f"{stage} @ {scale}: {metric} {previous[metric]} -> {current[metric]}{ratio}")
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the traffic sign tooling on synthetic catalogues.")
+    parser.add_argument(
+        "--scales",
+        type=lambda value: tuple(int(part) for part in value.split(",") if part.strip()),
+        default=DEFAULT_SCALES,
+        help="Comma-separated catalogue sizes (default: 1000,10000,100000).",
+    )
+    parser.add_argument(
+        "--stages",
+        type=lambda value: tuple(value.split(",")),
+        default=STAGES,
+        help="Comma-separated stages to run (default: all stages).",
+    )
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "drivest_sign_bench",
+        help="Where the synthetic catalogues are generated and reused between runs.",
+    )
+    parser.add_argument("--output", type=Path, help="Write the results JSON here.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline to compare against.")
+    parser.add_argument("--write-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative slowdown or stage RSS growth before a regression is reported (default: 0.25).",
+    )
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--child", nargs=2, metavar=("DATA", "STAGE"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.child:
+        print(json.dumps(run_stage(Path(args.child[0]), args.child[1])))
+        return
+
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+
+    results: dict[str, dict] = {}
+    for scale in args.scales:
+        data = prepare(args.workdir, scale)
+        results[str(scale)] = {}
+        for stage in args.stages:
+            measured = measure(data, stage)
+            results[str(scale)][stage] = measured
+            if "skipped" in measured:
+                print(f"{scale:>7} {stage:30s} skipped ({measured['skipped']})")
+            else:
+                print(f"{scale:>7} {stage:30s} {measured['wallSeconds'] * 1000:10.1f} ms  {measured['stageRssKb'] / 1024:8.1f} MB")
+
+    report = {"python": sys.version.split()[0], "platform": sys.platform, "results": results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    regressions = []
+    if args.baseline.exists() and not args.write_baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if not regressions:
+            print(f"No regressions against {args.baseline}")
+    if args.write_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written: {args.baseline}")
+    if regressions and args.fail_on_regression:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
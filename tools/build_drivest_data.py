@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Single entry point for every generated Drivest data pack.
+
+Each stage declares its inputs and outputs as glob patterns relative to the
+repo root. A stage depends on every other stage whose outputs overlap its
+inputs. Stages run as soon as their dependencies finish, up to --jobs at a
+time:
+
+  traffic_signs_pack   roadsign/ DfT catalogue -> android/traffic_signs asset pack
+  kys_enrich           DfT spreadsheet + KYS theory -> KYS theory/questions
+                       (trafficsigns/ and the iOS knowyoursigns copies)
+  hazard_tiles         backend hazard packs -> per-centre quadkey tiles
+  route_packs          backend route packs -> encoded, simplified geometry
+  question_banks       theory pack + 1200-question banks -> topic/difficulty indexes
+  highwaycode_ios      highwaycode question bank -> iOS bundle copy
+
+With --changed-only a stage is skipped when it is up to date: the sha256 of
+every input and output, plus its command line, match the last successful
+run. State lives in tools/.cache/drivest_build_state.json. File hashes are
+reused while a file's size and mtime are unchanged. A stage that rewrites
+its own inputs (kys_enrich updates the theory file in place) lists those
+files as outputs only.
+
+Every output is committed, so a full run on a clean checkout leaves the
+working tree unchanged. A diff after a run means a source changed and the
+outputs need committing with it.
+
+Usage:
+  python tools/build_drivest_data.py [stage ...] [--changed-only] [--jobs N]
+  python tools/build_drivest_data.py --changed-only --dry-run
+  python tools/build_drivest_data.py traffic_signs_pack --stage-arg traffic_signs_pack=--search-index
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+
+from pack_writer import write_if_changed
+
+
+ROOT = Path(__file__).resolve().parents[1]
+STATE_PATH = ROOT / "tools" / ".cache" / "drivest_build_state.json"
+STATE_VERSION = 1
+
+SIGN_PACK_MODULES = (
+    "tools/build_traffic_signs_pack.py",
+    "tools/build_profile.py",
+    "tools/optimize_sign_images.py",
+    "tools/pack_writer.py",
+    "tools/sign_image_dedupe.py",
+    "tools/sign_image_metadata.py",
+    "tools/sign_pack_delta.py",
+    "tools/sign_pack_index.py",
+    "tools/sign_pack_shards.py",
+    "tools/sign_search_index.py",
+    "tools/sign_sheet.py",
+    "tools/sign_sprite_atlas.py",
+)
+KYS_OUTPUT_DIRS = ("trafficsigns", "ios/DrivestNavigation/Resources/Data/knowyoursigns")
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+    # Either a command (run from the repo root) or (source, target) file copies.
+    command: tuple[str, ...] = ()
+    copies: tuple[tuple[str, str], ...] = ()
+
+
+STAGES = (
+    Stage(
+        name="traffic_signs_pack",
+        inputs=("roadsign/**/*", *SIGN_PACK_MODULES),
+        outputs=("android/traffic_signs/src/main/assets/traffic_signs/**/*",),
+        command=("tools/build_traffic_signs_pack.py", "--incremental"),
+    ),
+    Stage(
+        name="kys_enrich",
+        inputs=(
+            "roadsign/traffic-signs-images-image-details.xls",
+            "trafficsigns/*.py",
+            "trafficsigns/sign_rules.json",
+            "tools/build_profile.py",
+            "tools/pack_writer.py",
+            "tools/sign_sheet.py",
+        ),
+        outputs=tuple(
+            f"{folder}/Drivest_KnowYourSigns_{kind}_Expanded*.json*"
+            for folder in KYS_OUTPUT_DIRS
+            for kind in ("Theory", "Questions")
+        ),
+        command=("trafficsigns/enrich_knowyoursigns_from_dft.py",),
+    ),
+    Stage(
+        name="hazard_tiles",
+        inputs=("backend/data/hazards/*.json", "tools/build_hazard_tiles.py", "tools/pack_writer.py"),
+        outputs=("backend/data/hazards/tiles/*/*.json",),
+        command=("tools/build_hazard_tiles.py",),
+    ),
+    Stage(
+        name="route_packs",
+        inputs=("backend/data/routes/*.json", "tools/build_route_packs.py", "tools/pack_writer.py"),
+        outputs=("backend/data/routes/compiled/*.json",),
+        command=("tools/build_route_packs.py",),
+    ),
+    Stage(
+        name="question_banks",
+        inputs=(
+            "android/app/src/main/assets/theory/theory_pack_v1.json",
+            "highwaycode/Drivest_QuestionBank_1200_Varied.json",
+            "Drivest_1200_Questions.json",
+            "highwaycode/compile_question_banks.py",
+            "tools/pack_writer.py",
+        ),
+        outputs=(
+            "android/app/src/main/assets/theory/theory_pack_v1_index/**/*",
+            "highwaycode/Drivest_QuestionBank_1200_Varied_index/**/*",
+            "ios/DrivestNavigation/Resources/Data/highwaycode/Drivest_QuestionBank_1200_Varied_index/**/*",
+            "Drivest_1200_Questions_index/**/*",
+        ),
+        command=("highwaycode/compile_question_banks.py",),
+    ),
+    Stage(
+        name="highwaycode_ios",
+        inputs=("highwaycode/Drivest_QuestionBank_1200_Varied.json",),
+        outputs=("ios/DrivestNavigation/Resources/Data/highwaycode/Drivest_QuestionBank_1200_Varied.json",),
+        copies=(
+            (
+                "highwaycode/Drivest_QuestionBank_1200_Varied.json",
+                "ios/DrivestNavigation/Resources/Data/highwaycode/Drivest_QuestionBank_1200_Varied.json",
+            ),
+        ),
+    ),
+)
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # "built", "up-to-date", "failed", "skipped"
+    seconds: float = 0.0
+    reason: str = ""
+    output: str = ""
+
+
+@dataclass
+class BuildState:
+    stages: dict[str, dict] = field(default_factory=dict)
+    # rel path -> [size, mtime_ns, sha256]
+    files: dict[str, list] = field(default_factory=dict)
+
+
+def load_state(path: Path) -> BuildState:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return BuildState()
+    if payload.get("version") != STATE_VERSION:
+        return BuildState()
+    return BuildState(stages=payload.get("stages", {}), files=payload.get("files", {}))
+
+
+def save_state(path: Path, state: BuildState) -> None:
+    payload = {"version": STATE_VERSION, "stages": state.stages, "files": dict(sorted(state.files.items()))}
+    write_if_changed(path, json.dumps(payload, indent=2) + "\n")
+
+
+def expand(patterns: tuple[str, ...]) -> list[str]:
+    paths: set[str] = set()
+    for pattern in patterns:
+        paths.update(path.relative_to(ROOT).as_posix() for path in ROOT.glob(pattern) if path.is_file())
+    return sorted(paths)
+
+
+def file_sha256(rel: str, state: BuildState) -> str:
+    path = ROOT / rel
+    stat = path.stat()
+    cached = state.files.get(rel)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    state.files[rel] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def stage_fingerprint(stage: Stage, extra_args: list[str], state: BuildState) -> dict:
+    outputs = expand(stage.outputs)
+    owned = set(outputs)
+    return {
+        "command": list(stage.command) + extra_args,
+        "inputs": {rel: file_sha256(rel, state) for rel in expand(stage.inputs) if rel not in owned},
+        "outputs": {rel: file_sha256(rel, state) for rel in outputs},
+    }
+
+
+def stale_reason(stage: Stage, fingerprint: dict, state: BuildState) -> str:
+    """Why ``stage`` must run, or "" when it is up to date."""
+    previous = state.stages.get(stage.name)
+    if previous is None:
+        return "never built"
+    if previous["command"] != fingerprint["command"]:
+        return "command changed"
+    for kind in ("inputs", "outputs"):
+        before, now = previous[kind], fingerprint[kind]
+        changed = sorted(set(before) ^ set(now) | {rel for rel in now if rel in before and before[rel] != now[rel]})
+        if changed:
+            more = f" (+{len(changed) - 1} more)" if len(changed) > 1 else ""
+            return f"{kind[:-1]} changed: {changed[0]}{more}"
+    return ""
+
+
+def patterns_overlap(inputs: tuple[str, ...], outputs: tuple[str, ...]) -> bool:
+    # Pattern against pattern, so outputs that do not exist yet still count.
+    return any(fnmatch(a, b) or fnmatch(b, a) for a in inputs for b in outputs)
+
+
+def stage_dependencies(stages: tuple[Stage, ...]) -> dict[str, set[str]]:
+    outputs = {stage.name: set(expand(stage.outputs)) for stage in stages}
+    deps: dict[str, set[str]] = {}
+    for stage in stages:
+        inputs = set(expand(stage.inputs))
+        deps[stage.name] = {
+            other.name
+            for other in stages
+            if other.name != stage.name
+            and (inputs & outputs[other.name] or patterns_overlap(stage.inputs, other.outputs))
+        }
+    return deps
+
+
+def select_stages(names: list[str], deps: dict[str, set[str]]) -> list[str]:
+    """Requested stages plus everything upstream of them, in declaration order."""
+    if not names:
+        return list(deps)
+    unknown = [name for name in names if name not in deps]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(unknown)}. Known: {', '.join(deps)}")
+    wanted: set[str] = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(deps[name])
+    return [name for name in deps if name in wanted]
+
+
+def run_stage(stage: Stage, extra_args: list[str]) -> tuple[bool, str]:
+    if stage.copies:
+        for source, target in stage.copies:
+            (ROOT / target).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(ROOT / source, ROOT / target)
+        return True, ""
+    completed = subprocess.run(
+        [sys.executable, *stage.command, *extra_args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    return completed.returncode == 0, completed.stdout + completed.stderr
+
+
+def run_build(
+    names: list[str],
+    changed_only: bool = False,
+    jobs: int = 1,
+    dry_run: bool = False,
+    stage_args: dict[str, list[str]] | None = None,
+    state_path: Path = STATE_PATH,
+    stages: tuple[Stage, ...] = STAGES,
+) -> list[StageResult]:
+    stage_args = stage_args or {}
+    by_name = {stage.name: stage for stage in stages}
+    deps = stage_dependencies(stages)
+    selected = select_stages(names, deps)
+    state = load_state(state_path)
+    results: dict[str, StageResult] = {}
+
+    def check(name: str) -> str:
+        # Checked when the stage becomes ready, so upstream outputs are final.
+        if not changed_only:
+            return "forced"
+        return stale_reason(by_name[name], stage_fingerprint(by_name[name], stage_args.get(name, []), state), state)
+
+    def execute(name: str) -> StageResult:
+        started = time.perf_counter()
+        ok, output = run_stage(by_name[name], stage_args.get(name, []))
+        return StageResult(name, "built" if ok else "failed", time.perf_counter() - started, output=output)
+
+    remaining = list(selected)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while remaining or running:
+            progressed = False
+            for name in list(remaining):
+                upstream = deps[name] & set(selected)
+                if any(dep not in results for dep in upstream):
+                    continue
+                remaining.remove(name)
+                progressed = True
+                if any(results[dep].status in ("failed", "skipped") for dep in upstream):
+                    results[name] = StageResult(name, "skipped", reason="upstream stage failed")
+                    continue
+                reason = check(name)
+                if not reason:
+                    results[name] = StageResult(name, "up-to-date")
+                elif dry_run:
+                    results[name] = StageResult(name, "would build", reason=reason)
+                else:
+                    running[pool.submit(execute, name)] = reason
+            if not running:
+                if remaining and not progressed:
+                    raise SystemExit(f"Stage graph has a cycle: {', '.join(remaining)}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                reason = running.pop(future)
+                result = future.result()
+                result.reason = reason
+                results[result.name] = result
+                if result.status == "built":
+                    fingerprint = stage_fingerprint(by_name[result.name], stage_args.get(result.name, []), state)
+                    state.stages[result.name] = fingerprint
+                else:
+                    state.stages.pop(result.name, None)
+
+    if not dry_run:
+        live = {rel for fingerprint in state.stages.values() for kind in ("inputs", "outputs") for rel in fingerprint[kind]}
+        state.files = {rel: entry for rel, entry in state.files.items() if rel in live}
+        save_state(state_path, state)
+    return [results[name] for name in selected]
+
+
+def parse_stage_args(values: list[str]) -> dict[str, list[str]]:
+    out: dict[str, list[str]] = {}
+    for value in values:
+        name, sep, arg = value.partition("=")
+        if not sep:
+            raise SystemExit(f"--stage-arg expects STAGE=ARG, got {value!r}")
+        out.setdefault(name, []).append(arg)
+    return out
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build Drivest data packs from a declared stage graph.")
+    parser.add_argument("stages", nargs="*", help="Stages to build (plus their upstream stages). Default: all.")
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Skip stages whose inputs, outputs and command match the last successful build.",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Stages run in parallel (default: CPU count).")
+    parser.add_argument("--dry-run", action="store_true", help="Print what would run without building.")
+    parser.add_argument(
+        "--stage-arg",
+        action="append",
+        default=[],
+        metavar="STAGE=ARG",
+        help="Extra argument for a stage's command, e.g. traffic_signs_pack=--search-index. Repeatable.",
+    )
+    parser.add_argument("--list", action="store_true", help="List stages with their dependencies and exit.")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        deps = stage_dependencies(STAGES)
+        for stage in STAGES:
+            after = ", ".join(sorted(deps[stage.name])) or "-"
+            print(f"{stage.name:20s} after: {after}")
+        return
+
+    results = run_build(
+        args.stages,
+        changed_only=args.changed_only,
+        jobs=args.jobs,
+        dry_run=args.dry_run,
+        stage_args=parse_stage_args(args.stage_arg),
+    )
+    for result in results:
+        timing = f" {result.seconds:6.1f}s" if result.status in ("built", "failed") else ""
+        reason = f" ({result.reason})" if result.reason and result.reason != "forced" else ""
+        print(f"{result.name:20s} {result.status}{timing}{reason}")
+        if result.status == "failed":
+            print(result.output.rstrip())
+    if any(result.status == "failed" for result in results):
+        raise SystemExit("Build failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Compile hazard packs (backend/data/hazards/<centre>.json) into quadkey tiles.
+
+A hazard pack is one pretty-printed array of hazard objects, each with a full
+OSM "tags" dict and the same value in confidence, confidenceHint and
+confidenceScore. The compiler buckets hazards into Web Mercator quadkey tiles
+(--zoom, default 15: about 0.75 km x 0.75 km at 52N) and writes, per centre:
+
+  <out>/<centre>/index.json
+    {"version": 1, "centreId": ..., "metadata": {...}, "zoom": 15,
+     "hazardCount": N, "types": [...], "levels": [...], "sources": [...],
+     "tiles": [{"quadkey": "...", "file": "<quadkey>.json", "count": n,
+                "bbox": [south, west, north, east],   # of the tile's hazards
+                "sha256": ..., "bytes": ...}, ...]}
+
+  <out>/<centre>/<quadkey>.json (compact, one array per field)
+    {"quadkey": ..., "count": n,
+     "id": [...], "lat": [...], "lon": [...],
+     "type": [i, ...], "level": [i, ...], "source": [i, ...],   # into index tables
+     "confidence": [...], "voiceEligible": [0|1, ...],
+     "strings": [...],                                          # tile-local tag strings
+     "tags": [[key, value, key, value, ...], ...]}              # string indexes
+
+confidenceHint and confidenceScore are not stored. expand_tile() restores
+them from "confidence", so every expanded hazard equals its source object,
+key order included. Clients pick tiles whose bbox lies within their query
+radius of the active route and parse only those.
+
+--verify expands every tile against the source pack and checks tile-pruned
+radius queries against a brute-force scan (hazard_tile_query.py, needs NumPy).
+
+The tiles are committed next to the source packs, like the sign pack.
+Re-run this tool and commit its output whenever a hazard pack changes.
+
+Usage:
+  python tools/build_hazard_tiles.py [--centre colchester] [--zoom 15] [--verify]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+from pathlib import Path
+
+from pack_writer import encode_json, write_if_changed
+
+
+ROOT = Path(__file__).resolve().parents[1]
+HAZARDS_ROOT = ROOT / "backend" / "data" / "hazards"
+OUTPUT_ROOT = HAZARDS_ROOT / "tiles"
+TILE_INDEX_NAME = "index.json"
+TILE_VERSION = 1
+DEFAULT_ZOOM = 15
+MAX_MERCATOR_LAT = 85.05112878
+EARTH_RADIUS_M = 6_371_008.8
+HAZARD_KEYS = (
+    "id",
+    "type",
+    "lat",
+    "lon",
+    "tags",
+    "source",
+    "confidence",
+    "confidenceHint",
+    "confidenceScore",
+    "confidenceLevel",
+    "voiceEligible",
+)
+
+
+class HazardTileError(ValueError):
+    pass
+
+
+def tile_xy(lat: float, lon: float, zoom: int) -> tuple[int, int]:
+    lat = min(max(lat, -MAX_MERCATOR_LAT), MAX_MERCATOR_LAT)
+    scale = 1 << zoom
+    x = (lon + 180.0) / 360.0 * scale
+    sin_lat = math.sin(math.radians(lat))
+    y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * scale
+    return min(max(int(x), 0), scale - 1), min(max(int(y), 0), scale - 1)
+
+
+def quadkey(x: int, y: int, zoom: int) -> str:
+    digits = []
+    for level in range(zoom, 0, -1):
+        mask = 1 << (level - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return "".join(digits)
+
+
+def radius_bbox(lat: float, lon: float, radius_m: float) -> tuple[float, float, float, float]:
+    """(south, west, north, east) enclosing every point within ``radius_m``."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    # Longitude degrees are widest at the poleward edge of the box.
+    edge = min(abs(lat) + dlat, 90.0)
+    dlon = min(dlat / max(math.cos(math.radians(edge)), 1e-9), 180.0)
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+def bbox_intersects(bbox: list[float], other: tuple[float, float, float, float]) -> bool:
+    south, west, north, east = bbox
+    return not (north < other[0] or south > other[2] or east < other[1] or west > other[3])
+
+
+def check_hazard(hazard: dict, position: int) -> None:
+    if tuple(hazard) != HAZARD_KEYS:
+        raise HazardTileError(f"Hazard {position} has keys {list(hazard)}, expected {list(HAZARD_KEYS)}")
+    if not hazard["confidence"] == hazard["confidenceHint"] == hazard["confidenceScore"]:
+        raise HazardTileError(f"Hazard {hazard['id']}: confidence fields differ")
+
+
+def compile_hazard_tiles(pack: dict, zoom: int = DEFAULT_ZOOM) -> tuple[dict, dict[str, dict]]:
+    """Return (tile index, {quadkey: tile payload}); index entries lack sha256/bytes until encoded."""
+    hazards = pack.get("hazards", [])
+    for position, hazard in enumerate(hazards):
+        check_hazard(hazard, position)
+    types = sorted({hazard["type"] for hazard in hazards})
+    levels = sorted({hazard["confidenceLevel"] for hazard in hazards})
+    sources = sorted({hazard["source"] for hazard in hazards})
+    type_of = {value: i for i, value in enumerate(types)}
+    level_of = {value: i for i, value in enumerate(levels)}
+    source_of = {value: i for i, value in enumerate(sources)}
+
+    buckets: dict[str, list[dict]] = {}
+    for hazard in hazards:
+        buckets.setdefault(quadkey(*tile_xy(hazard["lat"], hazard["lon"], zoom), zoom), []).append(hazard)
+
+    tiles: dict[str, dict] = {}
+    entries = []
+    for key in sorted(buckets):
+        members = buckets[key]
+        strings: list[str] = []
+        string_of: dict[str, int] = {}
+
+        def intern(text: str) -> int:
+            if text not in string_of:
+                string_of[text] = len(strings)
+                strings.append(text)
+            return string_of[text]
+
+        tags = [[intern(part) for item in hazard["tags"].items() for part in item] for hazard in members]
+        tiles[key] = {
+            "quadkey": key,
+            "count": len(members),
+            "id": [hazard["id"] for hazard in members],
+            "lat": [hazard["lat"] for hazard in members],
+            "lon": [hazard["lon"] for hazard in members],
+            "type": [type_of[hazard["type"]] for hazard in members],
+            "level": [level_of[hazard["confidenceLevel"]] for hazard in members],
+            "source": [source_of[hazard["source"]] for hazard in members],
+            "confidence": [hazard["confidence"] for hazard in members],
+            "voiceEligible": [int(hazard["voiceEligible"]) for hazard in members],
+            "strings": strings,
+            "tags": tags,
+        }
+        lats = tiles[key]["lat"]
+        lons = tiles[key]["lon"]
+        entries.append(
+            {
+                "quadkey": key,
+                "file": f"{key}.json",
+                "count": len(members),
+                "bbox": [min(lats), min(lons), max(lats), max(lons)],
+            }
+        )
+
+    index = {
+        "version": TILE_VERSION,
+        "centreId": pack.get("centreId"),
+        "metadata": pack.get("metadata"),
+        "zoom": zoom,
+        "hazardCount": len(hazards),
+        "types": types,
+        "levels": levels,
+        "sources": sources,
+        "tiles": entries,
+    }
+    return index, tiles
+
+
+def expand_tile(tile: dict, index: dict) -> list[dict]:
+    hazards = []
+    strings = tile["strings"]
+    for i in range(tile["count"]):
+        pairs = tile["tags"][i]
+        confidence = tile["confidence"][i]
+        hazards.append(
+            {
+                "id": tile["id"][i],
+                "type": index["types"][tile["type"][i]],
+                "lat": tile["lat"][i],
+                "lon": tile["lon"][i],
+                "tags": {strings[pairs[j]]: strings[pairs[j + 1]] for j in range(0, len(pairs), 2)},
+                "source": index["sources"][tile["source"][i]],
+                "confidence": confidence,
+                "confidenceHint": confidence,
+                "confidenceScore": confidence,
+                "confidenceLevel": index["levels"][tile["level"][i]],
+                "voiceEligible": bool(tile["voiceEligible"][i]),
+            }
+        )
+    return hazards
+
+
+def tiles_along_route(index: dict, points: list[tuple[float, float]], radius_m: float) -> list[str]:
+    """Quadkeys of tiles holding a hazard within ``radius_m`` of the route's bounding boxes.
+
+    The route is densified so consecutive points are at most ``radius_m`` apart,
+    then every tile whose hazard bbox meets a point's radius box is kept.
+    """
+    step_deg = max(math.degrees(radius_m / EARTH_RADIUS_M), 1e-6)
+    dense: list[tuple[float, float]] = []
+    for (lat0, lon0), (lat1, lon1) in zip(points, points[1:]):
+        steps = max(1, math.ceil(max(abs(lat1 - lat0), abs(lon1 - lon0)) / step_deg))
+        dense.extend((lat0 + (lat1 - lat0) * s / steps, lon0 + (lon1 - lon0) * s / steps) for s in range(steps))
+    dense.extend(points[-1:])
+    boxes = [radius_bbox(lat, lon, radius_m) for lat, lon in dense]
+    return [tile["quadkey"] for tile in index["tiles"] if any(bbox_intersects(tile["bbox"], box) for box in boxes)]
+
+
+def write_tiles(out_dir: Path, index: dict, tiles: dict[str, dict]) -> tuple[int, list[str]]:
+    """Write tiles then the index; returns (files written, stale tile files removed)."""
+    written = 0
+    for entry in index["tiles"]:
+        data = encode_json(tiles[entry["quadkey"]], indent=None)
+        entry["sha256"] = hashlib.sha256(data).hexdigest()
+        entry["bytes"] = len(data)
+        written += write_if_changed(out_dir / entry["file"], data)
+    written += write_if_changed(out_dir / TILE_INDEX_NAME, encode_json(index))
+    keep = {entry["file"] for entry in index["tiles"]} | {TILE_INDEX_NAME}
+    removed = []
+    for path in sorted(out_dir.glob("*.json")):
+        if path.name not in keep:
+            path.unlink()
+            removed.append(path.name)
+    return written, removed
+
+
+def load_tiles(out_dir: Path) -> tuple[dict, dict[str, dict]]:
+    index = json.loads((out_dir / TILE_INDEX_NAME).read_text(encoding="utf-8"))
+    tiles = {}
+    for entry in index["tiles"]:
+        data = (out_dir / entry["file"]).read_bytes()
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise HazardTileError(f"{entry['file']}: sha256 does not match the index")
+        tiles[entry["quadkey"]] = json.loads(data)
+    return index, tiles
+
+
+def verify_tiles(pack: dict, out_dir: Path) -> list[str]:
+    problems = []
+    try:
+        index, tiles = load_tiles(out_dir)
+    except (OSError, ValueError) as error:
+        return [str(error)]
+    expanded = {hazard["id"]: hazard for tile in tiles.values() for hazard in expand_tile(tile, index)}
+    source = {hazard["id"]: hazard for hazard in pack.get("hazards", [])}
+    if set(expanded) != set(source):
+        problems.append(f"tiles hold {len(expanded)} hazards, pack has {len(source)}")
+    for hazard_id, hazard in source.items():
+        other = expanded.get(hazard_id)
+        if other is not None and (other != hazard or list(other) != list(hazard)):
+            problems.append(f"hazard {hazard_id} does not expand to its source")
+
+    from hazard_tile_query import radius_parity_problems
+
+    problems += radius_parity_problems(pack.get("hazards", []), index, tiles)
+    return problems
+
+
+def centre_packs(centre: str | None) -> list[Path]:
+    if centre:
+        return [HAZARDS_ROOT / f"{centre}.json"]
+    return sorted(HAZARDS_ROOT.glob("*.json"))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile hazard packs into quadkey tiles.")
+    parser.add_argument("--centre", help="Only this centre (default: every backend/data/hazards/*.json).")
+    parser.add_argument("--zoom", type=int, default=DEFAULT_ZOOM, help=f"Quadkey zoom level (default: {DEFAULT_ZOOM}).")
+    parser.add_argument("--out", type=Path, default=OUTPUT_ROOT, help="Output root; tiles go in <out>/<centre>/.")
+    parser.add_argument("--verify", action="store_true", help="Check expansion and radius-query parity after writing.")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for path in centre_packs(args.centre):
+        pack = json.loads(path.read_text(encoding="utf-8"))
+        centre = pack.get("centreId") or path.stem
+        index, tiles = compile_hazard_tiles(pack, args.zoom)
+        out_dir = args.out / centre
+        written, removed = write_tiles(out_dir, index, tiles)
+        source_bytes = path.stat().st_size
+        tile_bytes = sum(entry["bytes"] for entry in index["tiles"])
+        print(
+            f"{centre}: {index['hazardCount']} hazards in {len(index['tiles'])} tiles, "
+            f"{source_bytes} -> {tile_bytes} bytes; written {written}, removed {len(removed)}"
+        )
+        if args.verify:
+            problems = verify_tiles(pack, out_dir)
+            for problem in problems[:20]:
+                print(f"  {problem}")
+            failures += bool(problems)
+            print(f"  verify: {'OK' if not problems else f'{len(problems)} problem(s)'}")
+    if failures:
+        raise SystemExit(f"Hazard tile verification failed for {failures} centre(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Per-stage instrumentation for the data builders (--profile / --cprofile).
+
+Stages are recorded as nested spans. A span that is entered more than once
+under the same parent accumulates into one entry, so per-item work inside a
+loop still reports a single line. Each span records:
+  - wall and CPU time (CPU includes worker processes reaped inside the span)
+  - peak RSS of the process once the span has finished
+  - bytes read/written by this process (Linux /proc/self/io, else omitted)
+  - counters the caller adds (files read/written, bytes, rows, ...)
+
+A disabled profiler has no-op spans. That lets the builders call spans
+unconditionally, and the JSON report is only produced on request.
+
+Usage:
+  profiler = BuildProfiler("build_traffic_signs_pack", enabled=bool(args.profile))
+  with profiler.span("image_index"):
+      ...
+  profiler.finish(args.profile)
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import resource
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TypeVar
+
+REPORT_VERSION = 1
+PROC_IO = Path("/proc/self/io")
+
+T = TypeVar("T")
+
+
+def peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def cpu_seconds() -> tuple[float, float]:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def io_bytes() -> Optional[tuple[int, int]]:
+    try:
+        values = dict(line.split(": ") for line in PROC_IO.read_text().splitlines())
+    except (OSError, ValueError):
+        return None
+    return int(values["rchar"]), int(values["wchar"])
+
+
+@dataclass
+class SpanStats:
+    path: str
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    child_cpu: float = 0.0
+    read_bytes: Optional[int] = None
+    write_bytes: Optional[int] = None
+    peak_rss_kb: int = 0
+    counters: Counter = field(default_factory=Counter)
+
+    def as_dict(self, child_wall: float) -> dict:
+        entry = {
+            "path": self.path,
+            "calls": self.calls,
+            "wallSeconds": round(self.wall, 6),
+            "selfWallSeconds": round(max(self.wall - child_wall, 0.0), 6),
+            "cpuSeconds": round(self.cpu, 6),
+            "workerCpuSeconds": round(self.child_cpu, 6),
+            "peakRssKb": self.peak_rss_kb,
+        }
+        if self.read_bytes is not None:
+            entry["ioReadBytes"] = self.read_bytes
+            entry["ioWriteBytes"] = self.write_bytes
+        if self.counters:
+            entry["counters"] = dict(sorted(self.counters.items()))
+        return entry
+
+
+class BuildProfiler:
+    def __init__(self, tool: str, enabled: bool = False, cprofile_path: Optional[Path] = None) -> None:
+        self.tool = tool
+        self.enabled = enabled or cprofile_path is not None
+        self.cprofile_path = cprofile_path
+        self.spans: Dict[str, SpanStats] = {}
+        self._stack: List[str] = []
+        self._started = time.perf_counter()
+        self._cprofile = cProfile.Profile() if cprofile_path is not None else None
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def _stats(self, name: str) -> SpanStats:
+        path = "/".join(self._stack + [name])
+        if path not in self.spans:
+            self.spans[path] = SpanStats(path)
+        return self.spans[path]
+
+    def span(self, name: str):
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        stats = self._stats(name)
+        self._stack.append(name)
+        io_before = io_bytes()
+        cpu_before, child_before = cpu_seconds()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.wall += time.perf_counter() - start
+            cpu_after, child_after = cpu_seconds()
+            stats.cpu += cpu_after - cpu_before
+            stats.child_cpu += child_after - child_before
+            io_after = io_bytes()
+            if io_before is not None and io_after is not None:
+                stats.read_bytes = (stats.read_bytes or 0) + io_after[0] - io_before[0]
+                stats.write_bytes = (stats.write_bytes or 0) + io_after[1] - io_before[1]
+            stats.peak_rss_kb = peak_rss_kb()
+            stats.calls += 1
+            self._stack.pop()
+
+    def iterate(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield from ``items`` and time only the time spent producing each item.
+
+        This measures a streaming source, such as the spreadsheet reader, that
+        is consumed by a loop doing other work. It uses wall and CPU timers
+        only, because reading /proc per item would cost more than the item.
+        """
+        if not self.enabled:
+            yield from items
+            return
+        stats = self._stats(name)
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                stats.wall += time.perf_counter() - start
+                stats.cpu += time.process_time() - cpu_start
+            stats.calls += 1
+            yield item
+        stats.peak_rss_kb = peak_rss_kb()
+
+    def count(self, **counters: int) -> None:
+        """Add counters (e.g. filesWritten=3) to the innermost open span only."""
+        if not self.enabled or not self._stack:
+            return
+        self.spans["/".join(self._stack)].counters.update(counters)
+
+    def report(self) -> dict:
+        child_wall: Counter = Counter()
+        for path, stats in self.spans.items():
+            parent = path.rpartition("/")[0]
+            if parent:
+                child_wall[parent] += stats.wall
+        spans = [stats.as_dict(child_wall[path]) for path, stats in self.spans.items()]
+        totals: Counter = Counter()
+        for stats in self.spans.values():
+            totals.update(stats.counters)
+        cpu_total, child_total = cpu_seconds()
+        return {
+            "version": REPORT_VERSION,
+            "tool": self.tool,
+            "argv": sys.argv[1:],
+            "wallSeconds": round(time.perf_counter() - self._started, 6),
+            "cpuSeconds": round(cpu_total, 6),
+            "workerCpuSeconds": round(child_total, 6),
+            "peakRssKb": peak_rss_kb(),
+            "counters": dict(sorted(totals.items())),
+            "spans": spans,
+        }
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for entry in self.report()["spans"]:
+            depth = entry["path"].count("/")
+            name = "  " * depth + entry["path"].rpartition("/")[2]
+            lines.append(f"{name:28s} {entry['wallSeconds'] * 1000:9.1f} ms  cpu {entry['cpuSeconds'] * 1000:9.1f} ms")
+        return lines
+
+    def finish(self, report_path: Optional[Path]) -> None:
+        """Stop cProfile and write the requested report/dump files."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self.cprofile_path.parent.mkdir(parents=True, exist_ok=True)
+            self._cprofile.dump_stats(str(self.cprofile_path))
+        if report_path is not None:
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            report_path.write_text(json.dumps(self.report(), indent=2) + "\n", encoding="utf-8")
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Compile route packs (backend/data/routes/<centre>.json) for on-device projection.
+
+Source routes store geometry as {lat, lon} object arrays, and RouteProjection
+recomputes every segment length on each location fix. The compiled pack
+keeps the route fields and replaces "geometry" with one level per
+simplification tolerance:
+
+  {"version": 1, "centreId": ..., "metadata": {...}, "precision": 6,
+   "tolerancesM": [0, 5, 25],
+   "routes": [{"id": ..., "name": ..., "distanceM": ..., "durationS": ...,
+               "startLat": ..., "startLon": ...,
+               "levels": [{"toleranceM": 0,
+                           "polyline": "...",      # Google polyline, 1e-6 degrees
+                           "pointCount": n,
+                           "lengthM": ...,
+                           "cumulativeM": [0, ...],  # n values, metres to each vertex
+                           "bearingDeg": [...]},     # n - 1 segment bearings
+                          ...]}]}
+
+Level 0 is the full geometry. The others are Douglas-Peucker simplifications
+at that tolerance in metres. A level that keeps the same points as the one
+before it is left out, so short routes often have level 0 only; a client
+wanting tolerance T uses the last level whose toleranceM is at most T.
+Bearings use RouteProjection's initial-bearing formula and its earth radius
+(6,371,000 m). Lengths are haversine; at
+segment scale they match RouteProjection's local equirectangular lengths to
+well under 0.1%. distanceAlong is then cumulativeM[i] + t * segment length,
+with no per-fix sums.
+
+Each route's geometry length is checked against its declared distanceM. A
+difference above --distance-tolerance is reported, and --strict makes it
+fail the build. Packs are checked before anything is written, so a failed
+check leaves the committed compiled packs as they were.
+
+Compiled packs are committed next to the source packs, like the sign pack.
+Re-run this tool and commit its output whenever a route pack changes.
+
+Usage:
+  python tools/build_route_packs.py [--centre colchester] [--tolerances 0,5,25] [--strict]
+"""
+
+import argparse
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+
+from pack_writer import encode_json, write_if_changed
+
+
+ROOT = Path(__file__).resolve().parents[1]
+ROUTES_ROOT = ROOT / "backend" / "data" / "routes"
+OUTPUT_ROOT = ROUTES_ROOT / "compiled"
+ROUTE_PACK_VERSION = 1
+POLYLINE_PRECISION = 6
+DEFAULT_TOLERANCES = (0.0, 5.0, 25.0)
+DEFAULT_DISTANCE_TOLERANCE = 0.05
+# Same radius as RouteProjection.kt / RouteProjection.swift.
+EARTH_RADIUS_M = 6_371_000.0
+
+
+def encode_polyline(points: np.ndarray, precision: int = POLYLINE_PRECISION) -> str:
+    """Google encoded polyline of (lat, lon) rows."""
+    scaled = np.rint(points * 10**precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    out = []
+    for value in deltas.tolist():
+        value = ~(value << 1) if value < 0 else value << 1
+        while value >= 0x20:
+            out.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+        out.append(chr(value + 63))
+    return "".join(out)
+
+
+def decode_polyline(text: str, precision: int = POLYLINE_PRECISION) -> list[tuple[float, float]]:
+    values = []
+    value = shift = 0
+    for char in text:
+        byte = ord(char) - 63
+        value |= (byte & 0x1F) << shift
+        shift += 5
+        if byte < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    coords = np.cumsum(np.array(values, dtype=np.int64).reshape(-1, 2), axis=0)
+    return [(lat / 10**precision, lon / 10**precision) for lat, lon in coords.tolist()]
+
+
+def local_metres(points: np.ndarray) -> np.ndarray:
+    """Equirectangular (x, y) metres around the route's mean latitude, as in RouteProjection."""
+    lat = np.radians(points[:, 0])
+    lon = np.radians(points[:, 1])
+    return np.column_stack((lon * EARTH_RADIUS_M * math.cos(lat.mean()), lat * EARTH_RADIUS_M))
+
+
+def simplify(points: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """Douglas-Peucker keep mask; each split measures all interior points at once."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    if tolerance_m <= 0 or len(points) < 3:
+        keep[:] = True
+        return keep
+    xy = local_metres(points)
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = xy[first], xy[last]
+        inner = xy[first + 1 : last]
+        segment = end - start
+        length_sq = float(segment @ segment)
+        if length_sq == 0.0:
+            # Closed loop: measure from the shared endpoint.
+            distances = np.hypot(*(inner - start).T)
+        else:
+            t = np.clip((inner - start) @ segment / length_sq, 0.0, 1.0)
+            distances = np.hypot(*(inner - (start + t[:, None] * segment)).T)
+        split = int(np.argmax(distances))
+        if distances[split] > tolerance_m:
+            index = first + 1 + split
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return keep
+
+
+def segment_lengths(points: np.ndarray) -> np.ndarray:
+    lat = np.radians(points[:, 0])
+    lon = np.radians(points[:, 1])
+    a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def segment_bearings(points: np.ndarray) -> np.ndarray:
+    lat = np.radians(points[:, 0])
+    dlon = np.radians(np.diff(points[:, 1]))
+    y = np.sin(dlon) * np.cos(lat[1:])
+    x = np.cos(lat[:-1]) * np.sin(lat[1:]) - np.sin(lat[:-1]) * np.cos(lat[1:]) * np.cos(dlon)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+def route_level(kept: np.ndarray, tolerance_m: float) -> dict:
+    cumulative = np.concatenate(([0.0], np.cumsum(segment_lengths(kept))))
+    return {
+        "toleranceM": tolerance_m,
+        "polyline": encode_polyline(kept),
+        "pointCount": len(kept),
+        "lengthM": round(float(cumulative[-1]), 1),
+        "cumulativeM": [round(value, 1) for value in cumulative.tolist()],
+        "bearingDeg": [round(value, 1) for value in segment_bearings(kept).tolist()],
+    }
+
+
+def compile_route(route: dict, tolerances: tuple[float, ...]) -> dict:
+    points = np.array([[point["lat"], point["lon"]] for point in route["geometry"]], dtype=np.float64)
+    compiled = {key: value for key, value in route.items() if key != "geometry"}
+    compiled["levels"] = []
+    previous = None
+    for tolerance in tolerances if len(points) >= 2 else ():
+        keep = simplify(points, tolerance)
+        if previous is not None and np.array_equal(keep, previous):
+            continue  # same points as the finer level before it
+        compiled["levels"].append(route_level(points[keep], tolerance))
+        previous = keep
+    return compiled
+
+
+def compile_route_pack(pack: dict, tolerances: tuple[float, ...] = DEFAULT_TOLERANCES) -> dict:
+    return {
+        "version": ROUTE_PACK_VERSION,
+        "centreId": pack.get("centreId"),
+        "metadata": pack.get("metadata"),
+        "precision": POLYLINE_PRECISION,
+        "tolerancesM": list(tolerances),
+        "routes": [compile_route(route, tolerances) for route in pack.get("routes", [])],
+    }
+
+
+def check_route_pack(pack: dict, compiled: dict, distance_tolerance: float) -> tuple[list[str], list[str]]:
+    """Return (errors, distance warnings) for a compiled pack against its source."""
+    errors: list[str] = []
+    warnings: list[str] = []
+    scale = 10**compiled["precision"]
+    for route, out in zip(pack.get("routes", []), compiled["routes"]):
+        if len(route["geometry"]) < 2:
+            warnings.append(f"{route['id']}: fewer than two geometry points")
+            continue
+        source = [(round(p["lat"] * scale), round(p["lon"] * scale)) for p in route["geometry"]]
+        decoded = [(round(lat * scale), round(lon * scale)) for lat, lon in decode_polyline(out["levels"][0]["polyline"])]
+        if decoded != source:
+            errors.append(f"{route['id']}: full-resolution polyline does not decode to the source geometry")
+        for level in out["levels"]:
+            if len(level["cumulativeM"]) != level["pointCount"] or len(level["bearingDeg"]) != level["pointCount"] - 1:
+                errors.append(f"{route['id']}: level {level['toleranceM']} m table sizes do not match its points")
+        length = out["levels"][0]["lengthM"]
+        declared = route.get("distanceM")
+        if declared and abs(length - declared) > distance_tolerance * declared:
+            warnings.append(
+                f"{route['id']}: geometry length {length:.0f} m vs distanceM {declared} m ({length / declared - 1:+.0%})"
+            )
+    return errors, warnings
+
+
+def parse_tolerances(value: str) -> tuple[float, ...]:
+    tolerances = sorted({float(part) for part in value.split(",") if part.strip()})
+    return tuple(tolerances) if tolerances and tolerances[0] == 0 else (0.0, *tolerances)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile route packs with encoded, simplified geometry.")
+    parser.add_argument("--centre", help="Only this centre (default: every backend/data/routes/*.json).")
+    parser.add_argument(
+        "--tolerances",
+        type=parse_tolerances,
+        default=DEFAULT_TOLERANCES,
+        help="Comma-separated simplification tolerances in metres; 0 (full geometry) is always included.",
+    )
+    parser.add_argument("--out", type=Path, default=OUTPUT_ROOT, help="Output folder for <centre>.json.")
+    parser.add_argument(
+        "--distance-tolerance",
+        type=float,
+        default=DEFAULT_DISTANCE_TOLERANCE,
+        help="Allowed relative difference between geometry length and distanceM (default: 0.05).",
+    )
+    parser.add_argument("--strict", action="store_true", help="Fail when a route's length disagrees with distanceM.")
+    args = parser.parse_args(argv)
+
+    paths = [ROUTES_ROOT / f"{args.centre}.json"] if args.centre else sorted(ROUTES_ROOT.glob("*.json"))
+    errors: list[str] = []
+    warnings: list[str] = []
+    outputs = []
+    for path in paths:
+        pack = json.loads(path.read_text(encoding="utf-8"))
+        compiled = compile_route_pack(pack, args.tolerances)
+        pack_errors, pack_warnings = check_route_pack(pack, compiled, args.distance_tolerance)
+        errors += pack_errors
+        warnings += pack_warnings
+        outputs.append((path, compiled, encode_json(compiled, indent=None)))
+    failed = bool(errors or (args.strict and warnings))
+
+    for path, compiled, data in outputs:
+        changed = not failed and write_if_changed(args.out / path.name, data)
+        points = [route["levels"][0]["pointCount"] for route in compiled["routes"] if route["levels"]]
+        levels = sum(len(route["levels"]) for route in compiled["routes"])
+        print(
+            f"{path.stem}: {len(compiled['routes'])} routes, {sum(points)} points, {levels} levels, "
+            f"{path.stat().st_size} -> {len(data)} bytes{' (not written)' if failed else '' if changed else ' (unchanged)'}"
+        )
+    for message in warnings:
+        print(f"  distance: {message}")
+    for message in errors:
+        print(f"  error: {message}")
+    if failed:
+        raise SystemExit(f"Route pack check failed: {len(errors)} error(s), {len(warnings)} distance warning(s)")
+
+
+if __name__ == "__main__":
+    main()
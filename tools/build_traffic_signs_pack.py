@@ -1,20 +1,93 @@
+import argparse
+import hashlib
 import json
 import os
 import shutil
+import tempfile
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
-
-import pandas as pd
+from typing import BinaryIO, Iterable, Iterator
+
+from build_profile import BuildProfiler
+from optimize_sign_images import (
+    DEFAULT_MAX_EDGE,
+    DEFAULT_QUALITY,
+    OptimizeResult,
+    OptimizeSettings,
+    optimize_image,
+    report_row,
+    savings_report,
+)
+from pack_writer import WriteResult, atomic_writer, write_if_changed
+from sign_image_dedupe import duplicate_report, find_duplicates, fingerprint_images
+from sign_image_metadata import collect_image_metadata
+from sign_pack_delta import (
+    DELTA_VERSION,
+    apply_pack_delta,
+    build_delta,
+    encode_delta_zip,
+    encode_pack,
+    image_hashes,
+    record_version,
+    version_manifest,
+)
+from sign_pack_index import code_path_map, encode_index, minified_pack_json
+from sign_pack_shards import ROOT_INDEX_NAME, SHARDS_DIR, write_shards
+from sign_search_index import encode_search_index
+from sign_sheet import SignMeta, iter_sign_rows
+from sign_sprite_atlas import DEFAULT_TIERS, THUMBNAILS_DIR, build_sprite_atlases
 
 
 ROOT = Path(__file__).resolve().parents[1]
 SOURCE_ROOT = ROOT / "roadsign"
 SOURCE_XLS = SOURCE_ROOT / "traffic-signs-images-image-details.xls"
-ASSET_ROOT = ROOT / "android" / "app" / "src" / "main" / "assets" / "traffic_signs"
+ASSET_ROOT = ROOT / "android" / "traffic_signs" / "src" / "main" / "assets" / "traffic_signs"
 ASSET_IMAGES_ROOT = ASSET_ROOT / "images"
 OUTPUT_JSON = ASSET_ROOT / "traffic_signs_pack_v1.json"
+OUTPUT_MIN_JSON = ASSET_ROOT / "traffic_signs_pack_v1.min.json"
+OUTPUT_INDEX = ASSET_ROOT / "traffic_signs_index_v1.bin"
+OUTPUT_SEARCH = ASSET_ROOT / "traffic_signs_search_v1.bin"
+BUILD_CACHE_ROOT = ROOT / "tools" / ".cache"
+BUILD_MANIFEST = BUILD_CACHE_ROOT / "traffic_signs_build_manifest.json"
+BUILD_MANIFEST_VERSION = 1
+OPTIMIZE_REPORT = BUILD_CACHE_ROOT / "traffic_signs_optimize_report.json"
+DUPLICATE_REPORT = BUILD_CACHE_ROOT / "traffic_signs_duplicate_report.json"
+FINGERPRINT_CACHE = BUILD_CACHE_ROOT / "traffic_signs_fingerprints.json"
+IMAGE_METADATA_CACHE = BUILD_CACHE_ROOT / "traffic_signs_image_metadata.json"
+# Committed next to the backend's route/hazard versions, so every checkout and CI run has the bases.
+VERSIONS_ROOT = ROOT / "backend" / "data" / "versions" / "traffic_signs"
+DELTAS_ROOT = ROOT / "backend" / "data" / "deltas" / "traffic_signs"
+# Images synced per worker-pool round trip with --stream.
+STREAM_BATCH_SIZE = 256
+
+# Optional outputs under ASSET_ROOT, by the argparse dest of the flag that emits them. Directories end in "/".
+SIDECARS = {
+    "binary_index": (OUTPUT_INDEX.name,),
+    "search_index": (OUTPUT_SEARCH.name,),
+    "minified_json": (OUTPUT_MIN_JSON.name,),
+    "sharded": (ROOT_INDEX_NAME, f"{SHARDS_DIR}/"),
+    "thumbnails": (f"{THUMBNAILS_DIR}/",),
+}
+# argparse dests that shape the outputs; saved in the build manifest so watch_sign_packs.py can rebuild alike.
+BUILD_OPTIONS = (
+    "optimize",
+    "max_edge",
+    "quality",
+    "image_metadata",
+    "binary_index",
+    "search_index",
+    "minified_json",
+    "dedupe",
+    "perceptual_distance",
+    "deltas",
+    "keep_versions",
+    "sharded",
+    "thumbnails",
+    "thumbnail_tiers",
+)
 
 SOURCE_REFERENCES = [
     "https://www.gov.uk/government/publications/know-your-traffic-signs",
@@ -94,18 +167,20 @@ def category_to_folders(category_value: str) -> list[str]:
     return folders
 
 
+def candidate_image(root: Path, file_path: Path) -> CandidateImage:
+    rel_parts = file_path.relative_to(root).parts
+    folder_slug = next((p for p in rel_parts if p.endswith("-jpg")), "uncategorized")
+    return CandidateImage(
+        basename=file_path.name,
+        full_path=file_path,
+        folder_slug=folder_slug,
+    )
+
+
 def build_image_index(root: Path) -> dict[str, list[CandidateImage]]:
     index: dict[str, list[CandidateImage]] = defaultdict(list)
     for file_path in root.rglob("*.jpg"):
-        rel_parts = file_path.relative_to(root).parts
-        folder_slug = next((p for p in rel_parts if p.endswith("-jpg")), "uncategorized")
-        index[file_path.name].append(
-            CandidateImage(
-                basename=file_path.name,
-                full_path=file_path,
-                folder_slug=folder_slug,
-            )
-        )
+        index[file_path.name].append(candidate_image(root, file_path))
     return index
 
 
@@ -134,73 +209,218 @@ def choose_candidate(
     return ranked[0][1]
 
 
-def safe_text(value) -> str:
-    if pd.isna(value):
-        return ""
-    return str(value).strip()
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
-def main() -> None:
-    if not SOURCE_XLS.exists():
-        raise SystemExit(f"Source spreadsheet missing: {SOURCE_XLS}")
-    if not SOURCE_ROOT.exists():
-        raise SystemExit(f"Source folder missing: {SOURCE_ROOT}")
+def read_build_manifest(path: Path) -> dict:
+    """The whole manifest payload, or {} when it is missing, unreadable or from another version."""
+    if not path.exists():
+        return {}
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != BUILD_MANIFEST_VERSION:
+        return {}
+    return payload
 
-    df = pd.read_excel(SOURCE_XLS)
-    image_index = build_image_index(SOURCE_ROOT)
 
-    if ASSET_ROOT.exists():
-        shutil.rmtree(ASSET_ROOT)
-    ASSET_IMAGES_ROOT.mkdir(parents=True, exist_ok=True)
+def load_build_manifest(path: Path) -> dict[str, dict]:
+    return read_build_manifest(path).get("images", {})
 
-    rows_out = []
-    missing_images = []
-    copied = set()
-    primary_counts = Counter()
 
-    for idx, row in df.iterrows():
-        jpg_name = safe_text(row.get("JPG"))
-        if not jpg_name:
-            continue
+def save_build_manifest(path: Path, images: dict[str, dict], fields: dict | None = None) -> None:
+    """Write the image manifest; ``fields`` are extra top-level keys written before "images"."""
+    # Streamed one entry at a time; the bytes match json.dumps(payload, indent=2) + "\n".
+    with atomic_writer(path) as out:
+        out.write(f'{{\n  "version": {BUILD_MANIFEST_VERSION},'.encode("utf-8"))
+        for key, value in (fields or {}).items():
+            text = json.dumps(value, indent=2).replace("\n", "\n  ")
+            out.write(f'\n  {json.dumps(key)}: {text},'.encode("utf-8"))
+        out.write(b'\n  "images": {')
+        for n, key in enumerate(sorted(images)):
+            entry = json.dumps(images[key], indent=2).replace("\n", "\n    ")
+            out.write(f'{"," if n else ""}\n    {json.dumps(key)}: {entry}'.encode("utf-8"))
+        out.write(b"\n  }\n}\n" if images else b"}\n}\n")
 
-        preferred_folders = category_to_folders(safe_text(row.get("Category")))
+
+@dataclass(frozen=True)
+class ImageJob:
+    asset_key: str
+    source: Path
+    target: Path
+    source_rel: str
+    previous: dict | None
+
+
+def sync_image(job: ImageJob, settings: OptimizeSettings | None = None) -> tuple[dict, bool]:
+    """Write ``job.target`` from ``job.source`` unless the target is already up to date.
+
+    Images are copied byte-for-byte, or re-encoded when ``settings`` is given.
+    Returns the manifest entry for the target and whether it was written.
+    """
+    encoding = settings.encoding_key if settings else "copy"
+    previous = job.previous
+    stat = job.source.stat()
+    target_size = job.target.stat().st_size if job.target.exists() else -1
+    if previous and previous.get("encoding", "copy") == encoding:
+        previous_output_size = previous.get("outputSize", previous.get("size"))
+        if (
+            previous.get("source") == job.source_rel
+            and previous.get("size") == stat.st_size
+            and previous.get("mtimeNs") == stat.st_mtime_ns
+            and target_size == previous_output_size
+        ):
+            return previous, False
+    else:
+        previous = None
+
+    digest = file_sha256(job.source)
+    entry = {
+        "source": job.source_rel,
+        "size": stat.st_size,
+        "mtimeNs": stat.st_mtime_ns,
+        "sha256": digest,
+        "encoding": encoding,
+    }
+    if previous and previous.get("sha256") == digest:
+        if target_size == previous.get("outputSize", previous.get("size")):
+            for key in ("outputSize", "action", "sourceDimensions", "outputDimensions"):
+                if key in previous:
+                    entry[key] = previous[key]
+            entry.setdefault("outputSize", stat.st_size)
+            return entry, False
+    elif previous is None and settings is None and target_size == stat.st_size:
+        if file_sha256(job.target) == digest:
+            entry["outputSize"] = stat.st_size
+            return entry, False
+
+    if settings is None:
+        job.target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(job.source, job.target)
+        entry["outputSize"] = stat.st_size
+    else:
+        result = optimize_image(job.source, job.target, settings)
+        entry["outputSize"] = result.output_bytes
+        entry["action"] = result.action
+        entry["sourceDimensions"] = list(result.source_dimensions)
+        entry["outputDimensions"] = list(result.output_dimensions)
+    return entry, True
+
+
+def _sync_image_job(job_and_settings: tuple[ImageJob, OptimizeSettings | None]) -> tuple[dict, bool]:
+    return sync_image(*job_and_settings)
+
+
+def ingest_images(
+    jobs: list[ImageJob],
+    settings: OptimizeSettings | None,
+    workers: int,
+) -> tuple[dict[str, dict], set[str]]:
+    work = [(job, settings) for job in jobs]
+    if workers > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_sync_image_job, work, chunksize=16))
+    else:
+        results = [_sync_image_job(item) for item in work]
+
+    manifest: dict[str, dict] = {}
+    written: set[str] = set()
+    for job, (entry, did_write) in zip(jobs, results):
+        manifest[job.asset_key] = entry
+        if did_write:
+            written.add(job.asset_key)
+    return manifest, written
+
+
+def iter_selected_signs(
+    rows: Iterable[SignMeta],
+    image_index: dict[str, list[CandidateImage]],
+    previous_manifest: dict[str, dict],
+) -> Iterator[tuple[dict | None, str, ImageJob | None]]:
+    """Pick an image for every spreadsheet row, one row at a time.
+
+    Yields (pack sign row, or None when no image exists; JPG name; image job
+    the first time an asset is used, else None).
+    """
+    seen_assets: set[str] = set()
+    count = 0
+    for meta in rows:
+        jpg_name = meta.jpg
+        preferred_folders = category_to_folders(meta.category)
         candidate = choose_candidate(jpg_name, image_index.get(jpg_name, []), preferred_folders)
         if candidate is None:
-            missing_images.append(jpg_name)
+            yield None, jpg_name, None
             continue
 
         asset_rel = Path("images") / candidate.folder_slug / candidate.basename
-        target_path = ASSET_ROOT / asset_rel
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        if str(target_path) not in copied:
-            shutil.copy2(candidate.full_path, target_path)
-            copied.add(str(target_path))
+        asset_key = asset_rel.as_posix()
+        job = None
+        if asset_key not in seen_assets:
+            seen_assets.add(asset_key)
+            job = ImageJob(
+                asset_key=asset_key,
+                source=candidate.full_path,
+                target=ASSET_ROOT / asset_rel,
+                source_rel=candidate.full_path.relative_to(SOURCE_ROOT).as_posix(),
+                previous=previous_manifest.get(asset_key),
+            )
 
-        category_value = safe_text(row.get("Category"))
+        category_value = meta.category
         official_categories = [part.strip() for part in category_value.split(",") if part.strip()]
         folder_categories = preferred_folders or [candidate.folder_slug]
-        primary_counts[candidate.folder_slug] += 1
+        count += 1
+        sign = {
+            "id": f"sign-{count}",
+            "code": meta.dgno,
+            "caption": meta.caption or meta.description,
+            "description": meta.description,
+            "officialCategory": category_value,
+            "officialCategories": official_categories,
+            "primaryCategoryId": candidate.folder_slug,
+            "categoryIds": folder_categories,
+            "shape": meta.shape,
+            "backgroundColor": meta.bg_colour,
+            "borderColor": meta.bd_colour,
+            "textHint": meta.text,
+            "symbol1": meta.symbol1,
+            "symbol2": meta.symbol2,
+            "imageAssetPath": asset_rel.as_posix(),
+        }
+        yield sign, jpg_name, job
+
+
+def select_signs(
+    rows: Iterable[SignMeta],
+    image_index: dict[str, list[CandidateImage]],
+    previous_manifest: dict[str, dict],
+) -> tuple[list[dict], list[str], dict[str, ImageJob], Counter]:
+    """Pick an image for every spreadsheet row.
+
+    Returns (pack sign rows, missing JPG names, {asset key: image job}, signs per primary folder).
+    """
+    rows_out = []
+    missing_images = []
+    image_jobs: dict[str, ImageJob] = {}
+    primary_counts = Counter()
+    for sign, jpg_name, job in iter_selected_signs(rows, image_index, previous_manifest):
+        if sign is None:
+            missing_images.append(jpg_name)
+            continue
+        if job is not None:
+            image_jobs[job.asset_key] = job
+        primary_counts[sign["primaryCategoryId"]] += 1
+        rows_out.append(sign)
+    return rows_out, missing_images, image_jobs, primary_counts
 
-        rows_out.append(
-            {
-                "id": f"sign-{len(rows_out)+1}",
-                "code": safe_text(row.get("DGNo")),
-                "caption": safe_text(row.get("Caption")) or safe_text(row.get("Description")),
-                "description": safe_text(row.get("Description")),
-                "officialCategory": category_value,
-                "officialCategories": official_categories,
-                "primaryCategoryId": candidate.folder_slug,
-                "categoryIds": folder_categories,
-                "shape": safe_text(row.get("Shape")),
-                "backgroundColor": safe_text(row.get("BGColour")),
-                "borderColor": safe_text(row.get("BDColour")),
-                "textHint": safe_text(row.get("Text")),
-                "symbol1": safe_text(row.get("Symbol1")),
-                "symbol2": safe_text(row.get("Symbol2")),
-                "imageAssetPath": asset_rel.as_posix(),
-            }
-        )
 
+def pack_header(sign_count: int, missing_count: int, missing_names: Iterable[str], primary_counts: Counter) -> dict:
+    """Every top-level pack field except "signs", in pack order."""
     categories = []
     for folder_slug, count in sorted(primary_counts.items(), key=lambda item: (-item[1], item[0])):
         categories.append(
@@ -211,27 +431,544 @@ def main() -> None:
             }
         )
 
-    pack = {
+    return {
         "version": 1,
         "generatedFrom": str(SOURCE_XLS.relative_to(ROOT)).replace("\\", "/"),
         "sourceReferences": SOURCE_REFERENCES,
-        "catalogueSize": len(rows_out),
-        "missingImageCount": len(missing_images),
-        "missingImages": sorted(set(missing_images)),
+        "catalogueSize": sign_count,
+        "missingImageCount": missing_count,
+        "missingImages": sorted(set(missing_names)),
         "categories": categories,
-        "signs": rows_out,
     }
 
-    OUTPUT_JSON.parent.mkdir(parents=True, exist_ok=True)
-    OUTPUT_JSON.write_text(json.dumps(pack, indent=2, ensure_ascii=False), encoding="utf-8")
 
-    print(f"Generated {OUTPUT_JSON}")
+def build_pack(rows_out: list[dict], missing_images: list[str], primary_counts: Counter) -> dict:
+    return {**pack_header(len(rows_out), len(missing_images), missing_images, primary_counts), "signs": rows_out}
+
+
+def encode_pack_sign(sign: dict) -> bytes:
+    """One sign laid out exactly as encode_pack() writes it inside the "signs" list."""
+    text = json.dumps(sign, indent=2, ensure_ascii=False)
+    return ("    " + text.replace("\n", "\n    ")).encode("utf-8")
+
+
+def write_streamed_pack(path: Path, header: dict, signs: BinaryIO, sign_count: int) -> bool:
+    """Write the pack from its header plus the spooled ",\n"-joined output of encode_pack_sign()."""
+    head = json.dumps({**header, "signs": []}, indent=2, ensure_ascii=False)
+    result = WriteResult()
+    with atomic_writer(path, result) as out:
+        if not sign_count:
+            out.write(head.encode("utf-8"))
+        else:
+            out.write(head[: -len("[]\n}")].encode("utf-8") + b"[\n")
+            signs.seek(0)
+            shutil.copyfileobj(signs, out, 1 << 20)
+            out.write(b"\n  ]\n}")
+    return bool(result.written)
+
+
+def stream_pack(
+    rows: Iterable[SignMeta],
+    image_index: dict[str, list[CandidateImage]],
+    previous_manifest: dict[str, dict],
+    settings: OptimizeSettings | None,
+    workers: int,
+) -> tuple[dict, dict[str, dict], set[str], bool]:
+    """Build OUTPUT_JSON without holding the sign rows in memory.
+
+    Each row is selected, its image synced (in batches of STREAM_BATCH_SIZE)
+    and its JSON appended to a temp spool. The header's counts, missing
+    images and categories are only known once the last row is read, so the
+    pack is assembled at the end: header, then the spooled signs. The bytes
+    match encode_pack() of the same pack.
+
+    Memory still grows with distinct images, not signs: the image index and
+    the returned manifest (about 1 KB per image), plus the distinct missing
+    JPG names. Those names go into the header, which precedes the signs and
+    lists them sorted, so they are kept in a set rather than spooled.
+
+    Returns (pack header, image manifest, written asset keys, whether the pack file changed).
+    """
+    manifest: dict[str, dict] = {}
+    copied: set[str] = set()
+    missing_names: set[str] = set()
+    missing_count = sign_count = 0
+    primary_counts = Counter()
+    pending: list[ImageJob] = []
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def sync_pending() -> None:
+        work = [(job, settings) for job in pending]
+        results = pool.map(_sync_image_job, work, chunksize=16) if pool else map(_sync_image_job, work)
+        for job, (entry, did_write) in zip(pending, results):
+            manifest[job.asset_key] = entry
+            if did_write:
+                copied.add(job.asset_key)
+        pending.clear()
+
+    with tempfile.TemporaryFile() as spool, pool or nullcontext():
+        for sign, jpg_name, job in iter_selected_signs(rows, image_index, previous_manifest):
+            if sign is None:
+                missing_count += 1
+                missing_names.add(jpg_name)
+                continue
+            if job is not None:
+                pending.append(job)
+                if len(pending) >= STREAM_BATCH_SIZE:
+                    sync_pending()
+            primary_counts[sign["primaryCategoryId"]] += 1
+            if sign_count:
+                spool.write(b",\n")
+            spool.write(encode_pack_sign(sign))
+            sign_count += 1
+        sync_pending()
+        header = pack_header(sign_count, missing_count, missing_names, primary_counts)
+        changed = write_streamed_pack(OUTPUT_JSON, header, spool, sign_count)
+    return header, manifest, copied, changed
+
+
+def dedupe_image_jobs(
+    image_jobs: dict[str, ImageJob],
+    signs: list[dict],
+    perceptual_distance: int | None,
+    workers: int,
+) -> tuple[dict[str, str], dict]:
+    """Drop byte-identical images from ``image_jobs`` and point ``signs`` at the kept copy.
+
+    Returns ({alias asset path: canonical asset path}, duplicate report).
+    """
+    jobs = []
+    for key, job in image_jobs.items():
+        known = None
+        previous = job.previous or {}
+        if previous.get("source") == job.source_rel:
+            stat = job.source.stat()
+            if previous.get("size") == stat.st_size and previous.get("mtimeNs") == stat.st_mtime_ns:
+                known = previous.get("sha256")
+        jobs.append((key, job.source, known, perceptual_distance is not None))
+    prints = fingerprint_images(jobs, workers=workers, cache_path=FINGERPRINT_CACHE, write_file=write_if_changed)
+    references = Counter(sign["imageAssetPath"] for sign in signs)
+    aliases, groups = find_duplicates(prints, references)
+    for alias in aliases:
+        del image_jobs[alias]
+    for sign in signs:
+        sign["imageAssetPath"] = aliases.get(sign["imageAssetPath"], sign["imageAssetPath"])
+    return aliases, duplicate_report(prints, groups, perceptual_distance)
+
+
+def write_pack_deltas(pack: dict, pack_bytes: bytes, keep: int) -> tuple[str, list[dict]]:
+    """Record this build as a version and write a delta from every kept older version.
+
+    Returns (version id, deltas). Each delta is self-checked against its base
+    pack before it is written; deltas that target older versions are removed.
+    """
+    target = version_manifest(pack_bytes, pack, image_hashes(ASSET_ROOT, pack))
+    kept, _ = record_version(VERSIONS_ROOT, target, pack_bytes, keep)
+    deltas = []
+    wanted = set()
+    for base_version in kept[:-1]:
+        base = json.loads((VERSIONS_ROOT / f"{base_version}.json").read_text(encoding="utf-8"))
+        if base.get("deltaVersion") != DELTA_VERSION:
+            continue  # recorded before sign keys replaced row ids; no delta from it
+        delta = build_delta(base, target, pack)
+        apply_pack_delta((VERSIONS_ROOT / f"{base_version}.pack.json").read_bytes(), delta)
+        path = DELTAS_ROOT / f"{base_version}_to_{target['version']}.zip"
+        write_if_changed(path, encode_delta_zip(delta, ASSET_ROOT))
+        wanted.add(path)
+        deltas.append({**delta, "path": path})
+    if DELTAS_ROOT.exists():
+        for path in DELTAS_ROOT.glob("*.zip"):
+            if path not in wanted:
+                path.unlink()
+    return target["version"], deltas
+
+
+def write_optimize_report(path: Path, manifest: dict[str, dict]) -> dict:
+    rows = []
+    for asset, entry in manifest.items():
+        result = OptimizeResult(
+            source_bytes=entry["size"],
+            output_bytes=entry["outputSize"],
+            source_dimensions=tuple(entry.get("sourceDimensions", ())),
+            output_dimensions=tuple(entry.get("outputDimensions", ())),
+            action=entry.get("action", "copied"),
+        )
+        rows.append(report_row(asset, result))
+    report = savings_report(rows)
+    write_if_changed(path, json.dumps(report, indent=2) + "\n")
+    return report
+
+
+def remove_orphan_images(images_root: Path, keep: set[str]) -> list[str]:
+    if not images_root.exists():
+        return []
+    removed = []
+    for file_path in sorted(images_root.rglob("*")):
+        if not file_path.is_file():
+            continue
+        rel = file_path.relative_to(images_root.parent).as_posix()
+        if rel not in keep:
+            file_path.unlink()
+            removed.append(rel)
+    for dir_path in sorted((p for p in images_root.rglob("*") if p.is_dir()), reverse=True):
+        if not any(dir_path.iterdir()):
+            dir_path.rmdir()
+    return removed
+
+
+def sidecar_paths(args: argparse.Namespace) -> list[str]:
+    """SIDECARS entries this build emits, in table order."""
+    return [rel for flag, paths in SIDECARS.items() if getattr(args, flag, False) for rel in paths]
+
+
+def remove_stale_sidecars(asset_root: Path, previous: Iterable[str], current: Iterable[str]) -> list[str]:
+    """Delete sidecars the previous build recorded, or any flag can emit, that this build does not."""
+    known = {rel for paths in SIDECARS.values() for rel in paths}
+    removed = []
+    for rel in sorted((set(previous) | known) - set(current)):
+        target = asset_root / rel.rstrip("/")
+        if rel.endswith("/") and target.is_dir():
+            shutil.rmtree(target)
+        elif not rel.endswith("/") and target.is_file():
+            target.unlink()
+        else:
+            continue
+        removed.append(rel)
+    return removed
+
+
+def build_options(args: argparse.Namespace) -> dict:
+    """The BUILD_OPTIONS values of ``args``, JSON-ready."""
+    options = {name: getattr(args, name) for name in BUILD_OPTIONS}
+    options["thumbnail_tiers"] = list(options["thumbnail_tiers"])
+    return options
+
+
+def options_namespace(options: dict) -> argparse.Namespace:
+    """Default arguments overlaid with build_options() saved by an earlier build."""
+    args = parse_args([])
+    for name in BUILD_OPTIONS:
+        if name in options:
+            setattr(args, name, options[name])
+    args.thumbnail_tiers = tuple(args.thumbnail_tiers)
+    return args
+
+
+def apply_image_metadata(rows_out: list[dict], manifest: dict[str, dict], workers: int) -> tuple[dict, int]:
+    """--image-metadata: add the cached size/placeholder fields to every sign. Returns (metadata, images decoded)."""
+    image_metadata, decoded = collect_image_metadata(
+        ASSET_ROOT, manifest, IMAGE_METADATA_CACHE, workers, write_file=write_if_changed
+    )
+    for row in rows_out:
+        row.update(image_metadata[row["imageAssetPath"]])
+    return image_metadata, decoded
+
+
+def write_pack_files(args: argparse.Namespace, pack: dict, rows_out: list[dict]) -> tuple[bytes, list[bool], dict | None]:
+    """Write the pack and the file sidecars ``args`` asks for.
+
+    Returns (pack bytes, written flag per file with the pack first, shard index or None).
+    """
+    pack_bytes = encode_pack(pack)
+    outputs = [write_if_changed(OUTPUT_JSON, pack_bytes)]
+    if args.binary_index:
+        outputs.append(write_if_changed(OUTPUT_INDEX, encode_index(code_path_map(rows_out))))
+    if args.search_index:
+        outputs.append(write_if_changed(OUTPUT_SEARCH, encode_search_index(rows_out)))
+    if args.minified_json:
+        outputs.append(write_if_changed(OUTPUT_MIN_JSON, minified_pack_json(pack)))
+    shard_index = None
+    if args.sharded:
+        shard_index = write_shards(ASSET_ROOT, pack, write_file=lambda path, data: outputs.append(write_if_changed(path, data)))
+    return pack_bytes, outputs, shard_index
+
+
+def write_thumbnails(args: argparse.Namespace, rows_out: list[dict], manifest: dict[str, dict], workers: int) -> dict:
+    return build_sprite_atlases(
+        ASSET_ROOT,
+        rows_out,
+        tiers=args.thumbnail_tiers,
+        workers=workers,
+        write_file=write_if_changed,
+        manifest=manifest,
+        cache_root=BUILD_CACHE_ROOT,
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the traffic_signs asset pack from the DfT catalogue.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse the existing asset pack: copy only new or changed images and delete orphans.",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Resize and re-encode images instead of copying them byte-for-byte.",
+    )
+    parser.add_argument("--max-edge", type=int, default=DEFAULT_MAX_EDGE, help="Longest image edge in pixels with --optimize.")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help="JPEG quality with --optimize.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Image ingest worker processes.")
+    parser.add_argument(
+        "--binary-index",
+        action="store_true",
+        help="Also emit the compact code -> imageAssetPath sidecar (traffic_signs_index_v1.bin).",
+    )
+    parser.add_argument(
+        "--image-metadata",
+        action="store_true",
+        help="Add imageWidth/imageHeight/imageBytes/imagePlaceholder to every sign (cached by content).",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="Also emit the type-ahead search index over sign text (traffic_signs_search_v1.bin).",
+    )
+    parser.add_argument(
+        "--minified-json",
+        action="store_true",
+        help="Also emit a whitespace-free copy of the pack (traffic_signs_pack_v1.min.json).",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Ship byte-identical images once; other paths become imageAliases in the pack.",
+    )
+    parser.add_argument(
+        "--perceptual-distance",
+        type=int,
+        help="With --dedupe, also report (never merge) look-alike images within N dHash bits.",
+    )
+    parser.add_argument(
+        "--deltas",
+        action="store_true",
+        help="Record this build as a version (backend/data/versions/traffic_signs/) and emit delta zips from "
+        "previous versions (backend/data/deltas/traffic_signs/). Commit both.",
+    )
+    parser.add_argument("--keep-versions", type=int, default=3, help="Versions kept for --deltas (default: 3).")
+    parser.add_argument(
+        "--sharded",
+        action="store_true",
+        help="Also emit per-category shards plus a root index (traffic_signs_shards_v1.json).",
+    )
+    parser.add_argument(
+        "--thumbnails",
+        action="store_true",
+        help="Also emit pre-scaled thumbnail tiers and sprite atlases for map markers.",
+    )
+    parser.add_argument(
+        "--thumbnail-tiers",
+        type=lambda value: tuple(int(part) for part in value.split(",") if part.strip()),
+        default=DEFAULT_TIERS,
+        help="Comma-separated thumbnail sizes in pixels (default: 48,96,192).",
+    )
+    parser.add_argument("--profile", type=Path, help="Write a per-stage timing/memory/IO report (JSON) to this path.")
+    parser.add_argument("--cprofile", type=Path, help="Also dump cProfile stats (pstats format) to this path.")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream rows through selection, image sync and output so memory does not grow with the sign count "
+        "(it still grows with distinct and missing images).",
+    )
+    args = parser.parse_args(argv)
+    if args.perceptual_distance is not None and not args.dedupe:
+        parser.error("--perceptual-distance only applies with --dedupe")
+    if args.stream:
+        whole_pack = [
+            flag
+            for flag, enabled in (
+                ("--binary-index", args.binary_index),
+                ("--image-metadata", args.image_metadata),
+                ("--search-index", args.search_index),
+                ("--minified-json", args.minified_json),
+                ("--dedupe", args.dedupe),
+                ("--deltas", args.deltas),
+                ("--sharded", args.sharded),
+                ("--thumbnails", args.thumbnails),
+            )
+            if enabled
+        ]
+        if whole_pack:
+            parser.error(f"--stream cannot be combined with {', '.join(whole_pack)} (they need every sign in memory)")
+    return args
+
+
+def stream_main(
+    args: argparse.Namespace, profiler: BuildProfiler, image_index: dict, previous_manifest: dict, previous_sidecars: list[str]
+) -> None:
+    """--stream: the default pack and images, built by stream_pack()."""
+    settings = OptimizeSettings(max_edge=args.max_edge, quality=args.quality) if args.optimize else None
+    with profiler.span("stream"):
+        header, manifest, copied, pack_written = stream_pack(
+            profiler.iterate("spreadsheet_load", iter_sign_rows(SOURCE_XLS, cache_root=BUILD_CACHE_ROOT)),
+            image_index,
+            previous_manifest,
+            settings,
+            max(1, args.workers),
+        )
+        profiler.count(
+            rows=header["catalogueSize"],
+            missingImages=header["missingImageCount"],
+            filesWritten=len(copied) + pack_written,
+            bytesWritten=sum(manifest[key]["outputSize"] for key in copied),
+        )
+    with profiler.span("orphan_cleanup"):
+        removed = remove_orphan_images(ASSET_IMAGES_ROOT, set(manifest)) if args.incremental else []
+        stale_sidecars = remove_stale_sidecars(ASSET_ROOT, previous_sidecars, [])
+        profiler.count(filesRemoved=len(removed) + len(stale_sidecars))
+    with profiler.span("manifest"):
+        save_build_manifest(BUILD_MANIFEST, manifest, {"options": build_options(args), "sidecars": []})
+
+    print(f"{'Generated' if pack_written else 'Unchanged'} {OUTPUT_JSON} (streamed)")
+    print(f"Signs: {header['catalogueSize']}")
+    print(f"Categories: {len(header['categories'])}")
+    print(f"{'Encoded' if settings else 'Copied'} images: {len(copied)}")
+    if args.incremental:
+        print(f"Unchanged images: {len(manifest) - len(copied)}")
+        print(f"Removed orphan images: {len(removed)}")
+    if stale_sidecars:
+        print(f"Removed stale sidecars: {', '.join(stale_sidecars)}")
+    if settings:
+        with profiler.span("optimize_report"):
+            report = write_optimize_report(OPTIMIZE_REPORT, manifest)
+        print(f"Image bytes: {report['sourceBytes']} -> {report['outputBytes']} (saved {report['savedPercent']}%)")
+        print(f"Optimisation report: {OPTIMIZE_REPORT}")
+    print(f"Missing images: {len(header['missingImages'])}")
+    if header["missingImages"]:
+        print("Missing image names:", ", ".join(header["missingImages"]))
+    if profiler.enabled:
+        profiler.finish(args.profile)
+        for line in profiler.summary_lines():
+            print(f"  {line}")
+        if args.profile:
+            print(f"Profile report: {args.profile}")
+        if args.cprofile:
+            print(f"cProfile stats: {args.cprofile}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if not SOURCE_XLS.exists():
+        raise SystemExit(f"Source spreadsheet missing: {SOURCE_XLS}")
+    if not SOURCE_ROOT.exists():
+        raise SystemExit(f"Source folder missing: {SOURCE_ROOT}")
+    profiler = BuildProfiler("build_traffic_signs_pack", enabled=args.profile is not None, cprofile_path=args.cprofile)
+
+    with profiler.span("image_index"):
+        image_index = build_image_index(SOURCE_ROOT)
+        profiler.count(sourceImages=sum(len(options) for options in image_index.values()))
+
+    if args.incremental:
+        previous_build = read_build_manifest(BUILD_MANIFEST)
+        previous_manifest = previous_build.get("images", {})
+        previous_sidecars = previous_build.get("sidecars", [])
+    else:
+        previous_manifest, previous_sidecars = {}, []
+        if ASSET_ROOT.exists():
+            shutil.rmtree(ASSET_ROOT)
+    ASSET_IMAGES_ROOT.mkdir(parents=True, exist_ok=True)
+    if args.stream:
+        stream_main(args, profiler, image_index, previous_manifest, previous_sidecars)
+        return
+
+    with profiler.span("candidate_selection"):
+        rows_out, missing_images, image_jobs, primary_counts = select_signs(
+            profiler.iterate("spreadsheet_load", iter_sign_rows(SOURCE_XLS, cache_root=BUILD_CACHE_ROOT)),
+            image_index,
+            previous_manifest,
+        )
+        profiler.count(rows=len(rows_out), missingImages=len(missing_images))
+
+    image_aliases: dict[str, str] = {}
+    if args.dedupe:
+        with profiler.span("dedupe"):
+            image_aliases, duplicates = dedupe_image_jobs(
+                image_jobs, rows_out, args.perceptual_distance, max(1, args.workers)
+            )
+            write_if_changed(DUPLICATE_REPORT, json.dumps(duplicates, indent=2) + "\n")
+            profiler.count(filesRead=duplicates["images"], duplicateImages=len(image_aliases))
+
+    pack = build_pack(rows_out, missing_images, primary_counts)
+    if args.dedupe:
+        pack["imageAliases"] = dict(sorted(image_aliases.items()))
+
+    settings = OptimizeSettings(max_edge=args.max_edge, quality=args.quality) if args.optimize else None
+    with profiler.span("copy_encode"):
+        manifest, copied = ingest_images(list(image_jobs.values()), settings, max(1, args.workers))
+        profiler.count(
+            filesRead=len(manifest),
+            filesWritten=len(copied),
+            bytesWritten=sum(manifest[key]["outputSize"] for key in copied),
+        )
+    if args.image_metadata:
+        with profiler.span("image_metadata"):
+            image_metadata, decoded = apply_image_metadata(rows_out, manifest, max(1, args.workers))
+            profiler.count(filesRead=decoded)
+    with profiler.span("orphan_cleanup"):
+        removed = remove_orphan_images(ASSET_IMAGES_ROOT, set(manifest)) if args.incremental else []
+        sidecars = sidecar_paths(args)
+        stale_sidecars = remove_stale_sidecars(ASSET_ROOT, previous_sidecars, sidecars)
+        profiler.count(filesRemoved=len(removed) + len(stale_sidecars))
+    with profiler.span("serialisation"):
+        pack_bytes, outputs, shard_index = write_pack_files(args, pack, rows_out)
+        pack_written = outputs[0]
+        profiler.count(filesWritten=sum(outputs), filesUnchanged=len(outputs) - sum(outputs))
+    atlas_index = None
+    if args.thumbnails:
+        with profiler.span("thumbnails"):
+            atlas_index = write_thumbnails(args, rows_out, manifest, max(1, args.workers))
+    with profiler.span("manifest"):
+        save_build_manifest(BUILD_MANIFEST, manifest, {"options": build_options(args), "sidecars": sidecars})
+    if args.deltas:
+        with profiler.span("deltas"):
+            pack_version, deltas = write_pack_deltas(pack, pack_bytes, max(1, args.keep_versions))
+            profiler.count(filesWritten=len(deltas))
+
+    print(f"{'Generated' if pack_written else 'Unchanged'} {OUTPUT_JSON}")
     print(f"Signs: {len(rows_out)}")
-    print(f"Categories: {len(categories)}")
-    print(f"Copied images: {len(copied)}")
+    print(f"Categories: {len(pack['categories'])}")
+    print(f"{'Encoded' if settings else 'Copied'} images: {len(copied)}")
+    if args.incremental:
+        print(f"Unchanged images: {len(manifest) - len(copied)}")
+        print(f"Removed orphan images: {len(removed)}")
+    if stale_sidecars:
+        print(f"Removed stale sidecars: {', '.join(stale_sidecars)}")
+    if settings:
+        with profiler.span("optimize_report"):
+            report = write_optimize_report(OPTIMIZE_REPORT, manifest)
+        print(f"Image bytes: {report['sourceBytes']} -> {report['outputBytes']} (saved {report['savedPercent']}%)")
+        print(f"Optimisation report: {OPTIMIZE_REPORT}")
+    if args.image_metadata:
+        print(f"Image metadata: {len(image_metadata)} images ({decoded} decoded, {len(image_metadata) - decoded} cached)")
+    if args.dedupe:
+        print(f"Duplicate images: {len(image_aliases)} (saved {duplicates['savedBytes']} bytes)")
+        if args.perceptual_distance is not None:
+            print(f"Look-alike image pairs to review: {len(duplicates['nearDuplicates'])}")
+        print(f"Duplicate report: {DUPLICATE_REPORT}")
+    if args.deltas:
+        print(f"Pack version: {pack_version}")
+        for delta in deltas:
+            print(
+                f"Delta {delta['from']}: +{len(delta['added'])} ~{len(delta['changed'])} -{len(delta['removed'])} signs, "
+                f"{len(delta['images'])} images, {delta['path'].stat().st_size} bytes"
+            )
+    if args.sharded:
+        print(f"Shards: {len(shard_index['categories'])} ({ASSET_ROOT / ROOT_INDEX_NAME})")
+    if atlas_index:
+        atlas_count = sum(len(tier["atlases"]) for tier in atlas_index["tiers"])
+        print(f"Thumbnail tiers: {', '.join(str(tier['size']) for tier in atlas_index['tiers'])} ({atlas_count} atlases)")
     print(f"Missing images: {len(set(missing_images))}")
     if missing_images:
         print("Missing image names:", ", ".join(sorted(set(missing_images))))
+    if profiler.enabled:
+        profiler.finish(args.profile)
+        for line in profiler.summary_lines():
+            print(f"  {line}")
+        if args.profile:
+            print(f"Profile report: {args.profile}")
+        if args.cprofile:
+            print(f"cProfile stats: {args.cprofile}")
 
 
 if __name__ == "__main__":
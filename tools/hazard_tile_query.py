@@ -0,0 +1,145 @@
+"""
+Vectorised radius queries over compiled hazard tiles (NumPy).
+
+HazardTileQuery concatenates the columns of the loaded tiles into arrays.
+For each query it prunes tiles by bbox in one vectorised test, then computes
+haversine distances for the surviving hazards only. brute_force_radius()
+scans the source hazard list one by one and defines the expected result.
+
+Usage:
+  python tools/hazard_tile_query.py <tiles_dir> <lat> <lon> <radius_m>
+"""
+
+import argparse
+import math
+import random
+from pathlib import Path
+
+import numpy as np
+
+from build_hazard_tiles import EARTH_RADIUS_M, load_tiles, radius_bbox, tiles_along_route
+
+
+# Hazards this close to the query radius may land on either side through float rounding.
+BOUNDARY_TOLERANCE_M = 1e-6
+
+
+def haversine_m(lat0: float, lon0: float, lat1: float, lon1: float) -> float:
+    phi0, phi1 = math.radians(lat0), math.radians(lat1)
+    a = math.sin((phi1 - phi0) / 2) ** 2 + math.cos(phi0) * math.cos(phi1) * math.sin(math.radians(lon1 - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def brute_force_radius(hazards: list[dict], lat: float, lon: float, radius_m: float) -> dict[str, float]:
+    """{hazard id: distance in metres} for every hazard within ``radius_m``."""
+    out = {}
+    for hazard in hazards:
+        distance = haversine_m(lat, lon, hazard["lat"], hazard["lon"])
+        if distance <= radius_m:
+            out[hazard["id"]] = distance
+    return out
+
+
+class HazardTileQuery:
+    def __init__(self, index: dict, tiles: dict[str, dict]) -> None:
+        entries = [entry for entry in index["tiles"] if entry["quadkey"] in tiles]
+        self.bboxes = np.array([entry["bbox"] for entry in entries], dtype=np.float64).reshape(-1, 4)
+        counts = [tiles[entry["quadkey"]]["count"] for entry in entries]
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        columns = [tiles[entry["quadkey"]] for entry in entries]
+        self.ids = [hazard_id for tile in columns for hazard_id in tile["id"]]
+        self.lat = np.radians(np.array([v for tile in columns for v in tile["lat"]], dtype=np.float64))
+        self.lon = np.radians(np.array([v for tile in columns for v in tile["lon"]], dtype=np.float64))
+        self.cos_lat = np.cos(self.lat)
+
+    def candidate_rows(self, lat: float, lon: float, radius_m: float) -> np.ndarray:
+        box_south, box_west, box_north, box_east = radius_bbox(lat, lon, radius_m)
+        south, west, north, east = self.bboxes.T
+        hit = (north >= box_south) & (south <= box_north) & (east >= box_west) & (west <= box_east)
+        ranges = [np.arange(self.offsets[i], self.offsets[i + 1]) for i in np.flatnonzero(hit)]
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+
+    def distances(self, lat: float, lon: float, rows: np.ndarray) -> np.ndarray:
+        phi = math.radians(lat)
+        a = np.sin((self.lat[rows] - phi) / 2) ** 2 + math.cos(phi) * self.cos_lat[rows] * np.sin(
+            (self.lon[rows] - math.radians(lon)) / 2
+        ) ** 2
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+    def query(self, lat: float, lon: float, radius_m: float) -> dict[str, float]:
+        rows = self.candidate_rows(lat, lon, radius_m)
+        if not len(rows):
+            return {}
+        distances = self.distances(lat, lon, rows)
+        keep = distances <= radius_m
+        return {self.ids[row]: float(distance) for row, distance in zip(rows[keep], distances[keep])}
+
+
+def differs(expected: dict[str, float], found: dict[str, float], radius_m: float) -> list[str]:
+    out = []
+    for hazard_id in set(expected) ^ set(found):
+        distance = expected.get(hazard_id, found.get(hazard_id))
+        if abs(distance - radius_m) > BOUNDARY_TOLERANCE_M:
+            out.append(hazard_id)
+    return sorted(out)
+
+
+def radius_parity_problems(
+    hazards: list[dict],
+    index: dict,
+    tiles: dict[str, dict],
+    radii: tuple[float, ...] = (25.0, 150.0, 600.0, 2500.0),
+    random_points: int = 200,
+    seed: int = 0,
+) -> list[str]:
+    """Compare tile-pruned vectorised queries with brute-force scans.
+
+    Queries are centred on every hazard and on random points in the pack bbox.
+    """
+    if not hazards:
+        return []
+    engine = HazardTileQuery(index, tiles)
+    rng = random.Random(seed)
+    south = min(h["lat"] for h in hazards)
+    north = max(h["lat"] for h in hazards)
+    west = min(h["lon"] for h in hazards)
+    east = max(h["lon"] for h in hazards)
+    centres = [(h["lat"], h["lon"]) for h in hazards]
+    centres += [(rng.uniform(south, north), rng.uniform(west, east)) for _ in range(random_points)]
+
+    problems = []
+    for radius in radii:
+        for lat, lon in centres:
+            wrong = differs(brute_force_radius(hazards, lat, lon, radius), engine.query(lat, lon, radius), radius)
+            if wrong:
+                problems.append(f"radius {radius} m at ({lat}, {lon}): {len(wrong)} hazard(s) differ, e.g. {wrong[0]}")
+
+    # Tiles picked for a route must hold every hazard near any point on it.
+    for _ in range(20):
+        route = [(rng.uniform(south, north), rng.uniform(west, east)) for _ in range(4)]
+        picked = {key: tiles[key] for key in tiles_along_route(index, route, radii[1])}
+        routed = HazardTileQuery(index, picked)
+        midpoints = [((a[0] + b[0]) / 2, (a[1] + b[1]) / 2) for a, b in zip(route, route[1:])]
+        for lat, lon in route + midpoints:
+            wrong = differs(brute_force_radius(hazards, lat, lon, radii[1]), routed.query(lat, lon, radii[1]), radii[1])
+            if wrong:
+                problems.append(f"route tiles miss {len(wrong)} hazard(s) near ({lat}, {lon})")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Radius query over compiled hazard tiles.")
+    parser.add_argument("tiles_dir", type=Path)
+    parser.add_argument("lat", type=float)
+    parser.add_argument("lon", type=float)
+    parser.add_argument("radius_m", type=float)
+    args = parser.parse_args(argv)
+
+    index, tiles = load_tiles(args.tiles_dir)
+    hits = HazardTileQuery(index, tiles).query(args.lat, args.lon, args.radius_m)
+    for hazard_id, distance in sorted(hits.items(), key=lambda item: item[1]):
+        print(f"{distance:8.1f} m  {hazard_id}")
+
+
+if __name__ == "__main__":
+    main()
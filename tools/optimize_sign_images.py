@@ -0,0 +1,175 @@
+"""
+Re-encode traffic sign JPEGs for the on-demand traffic_signs asset pack.
+
+Signs are rendered at 220-260 dp in TrafficSignsActivity, so anything above
+DEFAULT_MAX_EDGE pixels (260 dp at xxhdpi) is wasted download size. Images are
+resized, re-encoded without EXIF/XMP/Photoshop metadata and written alongside
+a per-image size-savings report. When re-encoding would not make an image
+smaller, its original JPEG data is kept with the metadata segments cut out,
+which is lossless.
+
+Usage:
+  python tools/optimize_sign_images.py <source_dir> <output_dir> [--max-edge 780]
+"""
+
+import argparse
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+
+DEFAULT_MAX_EDGE = 780
+DEFAULT_QUALITY = 85
+# Bump when optimize_image() output changes, so incremental builds redo images encoded by the old version.
+ENCODER_VERSION = 2
+# JPEG segments kept when stripping metadata: APP0 (JFIF) and APP14 (Adobe colour transform) affect decoding.
+KEPT_APP_MARKERS = {0xE0, 0xEE}
+
+
+@dataclass(frozen=True)
+class OptimizeSettings:
+    max_edge: int = DEFAULT_MAX_EDGE
+    quality: int = DEFAULT_QUALITY
+
+    @property
+    def encoding_key(self) -> str:
+        return f"jpeg-v{ENCODER_VERSION}-q{self.quality}-max{self.max_edge}"
+
+
+@dataclass(frozen=True)
+class OptimizeResult:
+    source_bytes: int
+    output_bytes: int
+    source_dimensions: tuple[int, int]
+    output_dimensions: tuple[int, int]
+    action: str
+
+
+def strip_jpeg_metadata(data: bytes) -> bytes:
+    """``data`` without its APPn (other than KEPT_APP_MARKERS) and COM segments; image data is untouched.
+
+    Anything that does not parse as a JPEG header is returned unchanged.
+    """
+    if not data.startswith(b"\xff\xd8"):
+        return data
+    out = bytearray(data[:2])
+    pos = 2
+    while pos + 4 <= len(data) and data[pos] == 0xFF:
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker == 0xDA:  # start of scan: the rest is entropy-coded data
+            out += data[pos:]
+            return bytes(out)
+        end = pos + 2 + int.from_bytes(data[pos + 2 : pos + 4], "big")
+        if end > len(data):
+            return data
+        if not (0xE0 <= marker <= 0xEF or marker == 0xFE) or marker in KEPT_APP_MARKERS:
+            out += data[pos:end]
+        pos = end
+    return data
+
+
+def encode_image(source: Path, settings: OptimizeSettings) -> tuple[bytes, tuple[int, int], tuple[int, int]]:
+    with Image.open(source) as image:
+        source_dimensions = image.size
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        if max(image.size) > settings.max_edge:
+            image = image.copy()
+            image.thumbnail((settings.max_edge, settings.max_edge), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        # Saving without exif/icc_profile drops those; Pillow still carries a source comment over, so strip it.
+        image.save(buffer, format="JPEG", quality=settings.quality, optimize=True, progressive=True)
+        return strip_jpeg_metadata(buffer.getvalue()), source_dimensions, image.size
+
+
+def optimize_image(source: Path, target: Path, settings: OptimizeSettings) -> OptimizeResult:
+    source_bytes = source.stat().st_size
+    data, source_dimensions, output_dimensions = encode_image(source, settings)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    original = strip_jpeg_metadata(source.read_bytes())
+    if len(data) >= len(original) and output_dimensions == source_dimensions:
+        # Re-encoding an already small image can grow it; ship the original image data, minus metadata.
+        target.write_bytes(original)
+        return OptimizeResult(source_bytes, len(original), source_dimensions, source_dimensions, "kept")
+    target.write_bytes(data)
+    action = "resized" if output_dimensions != source_dimensions else "reencoded"
+    return OptimizeResult(source_bytes, len(data), source_dimensions, output_dimensions, action)
+
+
+def savings_report(rows: list[dict]) -> dict:
+    source_total = sum(row["sourceBytes"] for row in rows)
+    output_total = sum(row["outputBytes"] for row in rows)
+    return {
+        "imageCount": len(rows),
+        "sourceBytes": source_total,
+        "outputBytes": output_total,
+        "savedBytes": source_total - output_total,
+        "savedPercent": round(100.0 * (source_total - output_total) / source_total, 2) if source_total else 0.0,
+        "images": sorted(rows, key=lambda row: (-row["savedBytes"], row["asset"])),
+    }
+
+
+def report_row(asset: str, result: OptimizeResult) -> dict:
+    saved = result.source_bytes - result.output_bytes
+    return {
+        "asset": asset,
+        "action": result.action,
+        "sourceBytes": result.source_bytes,
+        "outputBytes": result.output_bytes,
+        "savedBytes": saved,
+        "savedPercent": round(100.0 * saved / result.source_bytes, 2) if result.source_bytes else 0.0,
+        "sourceDimensions": list(result.source_dimensions),
+        "outputDimensions": list(result.output_dimensions),
+    }
+
+
+def _optimize_job(job: tuple[str, Path, Path, OptimizeSettings]) -> dict:
+    asset, source, target, settings = job
+    return report_row(asset, optimize_image(source, target, settings))
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Resize and re-encode traffic sign JPEGs.")
+    parser.add_argument("source_dir", type=Path)
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--max-edge", type=int, default=DEFAULT_MAX_EDGE)
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--report", type=Path, help="Savings report path (default: <output_dir>/optimize_report.json).")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if not args.source_dir.exists():
+        raise SystemExit(f"Source folder missing: {args.source_dir}")
+    settings = OptimizeSettings(max_edge=args.max_edge, quality=args.quality)
+
+    jobs = []
+    for source in sorted(args.source_dir.rglob("*.jpg")):
+        rel = source.relative_to(args.source_dir)
+        jobs.append((rel.as_posix(), source, args.output_dir / rel, settings))
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        rows = list(pool.map(_optimize_job, jobs, chunksize=16))
+
+    report = savings_report(rows)
+    report_path = args.report or args.output_dir / "optimize_report.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(f"Optimised images: {report['imageCount']}")
+    print(f"Bytes: {report['sourceBytes']} -> {report['outputBytes']} (saved {report['savedPercent']}%)")
+    print(f"Report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
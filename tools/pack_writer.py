@@ -0,0 +1,156 @@
+"""
+Atomic, deduplicated writers for generated data packs.
+
+A payload is serialised once and the same bytes are written to every target
+through a temp file plus rename, so an interrupted job never leaves a
+half-written copy behind. Targets that already hold identical bytes are
+left untouched. atomic_writer() does the same for output too large to hold
+in memory: it is streamed to the temp file and compared chunk by chunk.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+
+# Read once: os.umask can only be queried by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@dataclass
+class WriteResult:
+    written: list[Path] = field(default_factory=list)
+    unchanged: list[Path] = field(default_factory=list)
+
+
+def encode_json(payload, indent: int | None = 2) -> bytes:
+    if indent is None:
+        text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(payload, ensure_ascii=False, indent=indent)
+    return (text + "\n").encode("utf-8")
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    # mtime=0 keeps the archive bytes stable between runs.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def file_matches(path: Path, data: bytes, digest: str | None = None) -> bool:
+    try:
+        if path.stat().st_size != len(data):
+            return False
+    except FileNotFoundError:
+        return False
+    existing = hashlib.sha256(path.read_bytes()).hexdigest()
+    return existing == (digest or hashlib.sha256(data).hexdigest())
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        # mkstemp creates 0600 files; give outputs the usual umask-derived mode.
+        os.chmod(tmp_name, 0o666 & ~_UMASK)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def files_equal(a: Path, b: Path, chunk_size: int = 1 << 20) -> bool:
+    try:
+        if a.stat().st_size != b.stat().st_size:
+            return False
+    except FileNotFoundError:
+        return False
+    with a.open("rb") as left, b.open("rb") as right:
+        while True:
+            chunk = left.read(chunk_size)
+            if chunk != right.read(chunk_size):
+                return False
+            if not chunk:
+                return True
+
+
+@contextmanager
+def atomic_writer(path: Path, result: WriteResult | None = None) -> Iterator[BinaryIO]:
+    """Stream bytes to ``path`` through a temp file; identical output leaves ``path`` untouched.
+
+    ``path`` is added to ``result.written`` or ``result.unchanged`` on success.
+    """
+    result = result if result is not None else WriteResult()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    tmp = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+        if files_equal(tmp, path):
+            tmp.unlink()
+            result.unchanged.append(path)
+            return
+        os.chmod(tmp, 0o666 & ~_UMASK)
+        os.replace(tmp, path)
+        result.written.append(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def write_if_changed(path: Path, content: str | bytes) -> bool:
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    if file_matches(path, data):
+        return False
+    write_atomic(path, data)
+    return True
+
+
+def write_targets(paths: Iterable[Path], data: bytes, result: WriteResult | None = None) -> WriteResult:
+    result = result or WriteResult()
+    digest = hashlib.sha256(data).hexdigest()
+    for path in paths:
+        if file_matches(path, data, digest):
+            result.unchanged.append(path)
+        else:
+            write_atomic(path, data)
+            result.written.append(path)
+    return result
+
+
+def variant_path(path: Path, suffix: str) -> Path:
+    """Drivest_X.json -> Drivest_X.min.json / Drivest_X.json.gz"""
+    if suffix == ".gz":
+        return path.with_name(path.name + suffix)
+    return path.with_name(f"{path.stem}{suffix}{path.suffix}")
+
+
+def write_json_targets(
+    paths: Iterable[Path],
+    payload,
+    minified: bool = False,
+    gzipped: bool = False,
+) -> WriteResult:
+    """Serialise ``payload`` once and write it (plus optional variants) to every path."""
+    paths = list(paths)
+    result = write_targets(paths, encode_json(payload))
+    if minified or gzipped:
+        compact = encode_json(payload, indent=None)
+        if minified:
+            write_targets([variant_path(path, ".min") for path in paths], compact, result)
+        if gzipped:
+            write_targets([variant_path(path, ".gz") for path in paths], gzip_bytes(compact), result)
+    return result
@@ -0,0 +1,259 @@
+"""
+Content-hash deduplication of traffic sign images.
+
+Some DfT images are shipped with identical bytes under more than one name or
+category folder. Each selected pack image is fingerprinted with the sha256 of
+its bytes. Byte-identical images form a group that keeps one canonical blob,
+and the other asset paths become aliases of it.
+
+With --perceptual-distance the report also lists near-duplicates. These are
+pairs whose 256-bit difference hash (dHash over a 16x16 grid) differs by at
+most that many bits and whose colour thumbnails nearly match. They are only
+listed for review and never merged. Road signs that look alike often differ
+only in their wording or number ("Meter ZONE" / "Ticket ZONE", 5t / 7.5t),
+so merging them would ship the wrong sign.
+
+Candidate pairs are found by splitting the hash into distance + 1 bands.
+Any pair within the distance must agree on at least one band (pigeonhole),
+so only band collisions are compared.
+
+The canonical image of a group is the one referenced by the most signs, then
+the lowest asset path, so results are stable between runs.
+
+The builder caches fingerprints in tools/.cache by source path, size and
+mtime, so unchanged images are neither hashed nor decoded again.
+
+Usage:
+  python tools/sign_image_dedupe.py <images_root> [--perceptual-distance 12]
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+
+DHASH_SIZE = 16
+DHASH_BITS = DHASH_SIZE * DHASH_SIZE
+THUMB_SIZE = 16
+# Mean absolute RGB difference (0-255) below which a dHash match is reported.
+MAX_THUMB_DIFFERENCE = 6.0
+REPORT_VERSION = 1
+CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ImageFingerprint:
+    asset_key: str
+    sha256: str
+    size: int
+    dhash: int | None = None
+    thumbnail: bytes = b""
+
+
+def dhash(image: Image.Image) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair, brighter-left = 1."""
+    small = image.convert("L").resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for col in range(DHASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def fingerprint(job: tuple[str, Path, str | None, bool]) -> ImageFingerprint:
+    asset_key, source, known_sha256, perceptual = job
+    size = source.stat().st_size
+    if known_sha256 is None:
+        known_sha256 = hashlib.sha256(source.read_bytes()).hexdigest()
+    if not perceptual:
+        return ImageFingerprint(asset_key, known_sha256, size)
+    with Image.open(source) as image:
+        image = image.convert("RGB")
+        thumbnail = image.resize((THUMB_SIZE, THUMB_SIZE), Image.Resampling.BOX).tobytes()
+        return ImageFingerprint(asset_key, known_sha256, size, dhash(image), thumbnail)
+
+
+def load_cache(path: Path) -> dict[str, dict]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return payload.get("images", {}) if payload.get("version") == CACHE_VERSION else {}
+
+
+def cached_fingerprint(asset_key: str, entry: dict | None, size: int, mtime_ns: int, perceptual: bool) -> ImageFingerprint | None:
+    if entry is None or entry.get("size") != size or entry.get("mtimeNs") != mtime_ns:
+        return None
+    if not perceptual:
+        return ImageFingerprint(asset_key, entry["sha256"], size)
+    if "dhash" not in entry:
+        return None
+    return ImageFingerprint(
+        asset_key, entry["sha256"], size, int(entry["dhash"], 16), base64.b64decode(entry["thumbnail"])
+    )
+
+
+def fingerprint_images(
+    jobs: list[tuple[str, Path, str | None, bool]],
+    workers: int = 1,
+    cache_path: Path | None = None,
+    write_file=None,
+) -> list[ImageFingerprint]:
+    """``jobs`` are (asset_key, source path, sha256 if already known, perceptual).
+
+    With ``cache_path``, fingerprints of sources whose size and mtime are
+    unchanged come from the cache; the cache is rewritten to hold only these sources.
+    """
+    cache = load_cache(cache_path) if cache_path is not None else {}
+    prints: list[ImageFingerprint | None] = []
+    stats = {}
+    pending = []
+    for job in jobs:
+        asset_key, source, _, perceptual = job
+        stat = source.stat()
+        stats[str(source)] = (stat.st_size, stat.st_mtime_ns)
+        prints.append(cached_fingerprint(asset_key, cache.get(str(source)), stat.st_size, stat.st_mtime_ns, perceptual))
+        if prints[-1] is None:
+            pending.append((len(prints) - 1, job))
+    work = [job for _, job in pending]
+    if workers > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            computed = list(pool.map(fingerprint, work, chunksize=16))
+    else:
+        computed = [fingerprint(job) for job in work]
+    for (position, job), item in zip(pending, computed):
+        prints[position] = item
+        size, mtime_ns = stats[str(job[1])]
+        entry = {"size": size, "mtimeNs": mtime_ns, "sha256": item.sha256}
+        if item.dhash is not None:
+            entry.update(dhash=f"{item.dhash:064x}", thumbnail=base64.b64encode(item.thumbnail).decode("ascii"))
+        cache[str(job[1])] = entry
+
+    if cache_path is not None:
+        current = {path: cache[path] for path in sorted(stats) if path in cache}
+        payload = json.dumps({"version": CACHE_VERSION, "images": current}, indent=2) + "\n"
+        if write_file is not None:
+            write_file(cache_path, payload)
+        else:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(payload, encoding="utf-8")
+    return prints
+
+
+def find_duplicates(
+    prints: list[ImageFingerprint],
+    references: dict[str, int] | None = None,
+) -> tuple[dict[str, str], list[dict]]:
+    """Return ({alias asset_key: canonical asset_key}, byte-identical groups for the report)."""
+    references = references or {}
+    by_sha: dict[str, list[ImageFingerprint]] = {}
+    for item in prints:
+        by_sha.setdefault(item.sha256, []).append(item)
+
+    aliases: dict[str, str] = {}
+    groups = []
+    for sha256, members in by_sha.items():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda item: (-references.get(item.asset_key, 0), item.asset_key))
+        canonical = members[0].asset_key
+        for item in members[1:]:
+            aliases[item.asset_key] = canonical
+        groups.append(
+            {
+                "canonical": canonical,
+                "aliases": [item.asset_key for item in members[1:]],
+                "sha256": sha256,
+                "savedBytes": sum(item.size for item in members[1:]),
+            }
+        )
+    groups.sort(key=lambda group: (-group["savedBytes"], group["canonical"]))
+    return aliases, groups
+
+
+def thumbnail_difference(left: bytes, right: bytes) -> float:
+    return sum(abs(a - b) for a, b in zip(left, right)) / max(len(left), 1)
+
+
+def near_duplicates(prints: list[ImageFingerprint], max_distance: int) -> list[dict]:
+    """Visually similar but not byte-identical pairs, closest first."""
+    bands = max_distance + 1
+    width = -(-DHASH_BITS // bands)
+    mask = (1 << width) - 1
+    buckets: dict[tuple[int, int], list[ImageFingerprint]] = {}
+    for item in prints:
+        if item.dhash is None:
+            continue
+        for band in range(bands):
+            buckets.setdefault((band, (item.dhash >> (band * width)) & mask), []).append(item)
+
+    seen: set[tuple[str, str]] = set()
+    pairs = []
+    for members in buckets.values():
+        for i, left in enumerate(members):
+            for right in members[i + 1 :]:
+                key = tuple(sorted((left.asset_key, right.asset_key)))
+                if key in seen or left.sha256 == right.sha256:
+                    continue
+                seen.add(key)
+                distance = (left.dhash ^ right.dhash).bit_count()
+                if distance > max_distance:
+                    continue
+                difference = thumbnail_difference(left.thumbnail, right.thumbnail)
+                if difference <= MAX_THUMB_DIFFERENCE:
+                    pairs.append(
+                        {"images": list(key), "dhashDistance": distance, "thumbnailDifference": round(difference, 2)}
+                    )
+    pairs.sort(key=lambda pair: (pair["dhashDistance"], pair["thumbnailDifference"], pair["images"]))
+    return pairs
+
+
+def duplicate_report(
+    prints: list[ImageFingerprint],
+    groups: list[dict],
+    max_distance: int | None = None,
+) -> dict:
+    report = {
+        "version": REPORT_VERSION,
+        "images": len(prints),
+        "uniqueImages": len(prints) - sum(len(group["aliases"]) for group in groups),
+        "savedBytes": sum(group["savedBytes"] for group in groups),
+        "groups": groups,
+    }
+    if max_distance is not None:
+        report["perceptualDistance"] = max_distance
+        report["nearDuplicates"] = near_duplicates(prints, max_distance)
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Report duplicate traffic sign images under a folder.")
+    parser.add_argument("images_root", type=Path)
+    parser.add_argument(
+        "--perceptual-distance",
+        type=int,
+        help="Also list visually similar images whose dHash differs by at most N of 256 bits.",
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    perceptual = args.perceptual_distance is not None
+    jobs = [
+        (path.relative_to(args.images_root).as_posix(), path, None, perceptual)
+        for path in sorted(args.images_root.rglob("*.jpg"))
+    ]
+    prints = fingerprint_images(jobs, workers=max(1, args.workers))
+    _, groups = find_duplicates(prints)
+    print(json.dumps(duplicate_report(prints, groups, args.perceptual_distance), indent=2))
+
+
+if __name__ == "__main__":
+    main()
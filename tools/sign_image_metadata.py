@@ -0,0 +1,124 @@
+"""
+Per-image layout metadata for the traffic_signs pack.
+
+For every shipped image the builder records, next to imageAssetPath:
+
+  imageWidth, imageHeight   pixel size of the asset as shipped
+  imageBytes                file size of the asset
+  imagePlaceholder          "#rrggbb" dominant colour (most common colour
+                            after a 4-colour median-cut of a 16x16 thumbnail,
+                            usually the sign's background)
+
+Clients can then size grid cells and markers and paint a placeholder before
+decoding the JPEG. Results are cached in tools/.cache by content key: the
+source sha256 plus the encoding key from the build manifest, which together
+fix the output bytes. Unchanged images are therefore never decoded again.
+
+Usage:
+  python tools/sign_image_metadata.py <image.jpg> [...]
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+
+CACHE_VERSION = 1
+PLACEHOLDER_THUMB = 16
+PLACEHOLDER_COLOURS = 4
+
+
+def dominant_colour(image: Image.Image) -> str:
+    thumb = image.convert("RGB").resize((PLACEHOLDER_THUMB, PLACEHOLDER_THUMB), Image.Resampling.BOX)
+    quantized = thumb.quantize(colors=PLACEHOLDER_COLOURS, method=Image.Quantize.MEDIANCUT)
+    palette = quantized.getpalette()
+    # Highest count wins; ties go to the lowest palette index so results are stable.
+    _, index = max(quantized.getcolors(), key=lambda item: (item[0], -item[1]))
+    red, green, blue = palette[index * 3 : index * 3 + 3]
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def read_metadata(path: Path) -> dict:
+    with Image.open(path) as image:
+        return {
+            "imageWidth": image.width,
+            "imageHeight": image.height,
+            "imagePlaceholder": dominant_colour(image),
+        }
+
+
+def _metadata_job(job: tuple[str, Path]) -> tuple[str, dict]:
+    key, path = job
+    return key, read_metadata(path)
+
+
+def content_key(entry: dict) -> str:
+    return f"{entry['sha256']}:{entry.get('encoding', 'copy')}"
+
+
+def load_cache(path: Path) -> dict[str, dict]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return payload.get("images", {}) if payload.get("version") == CACHE_VERSION else {}
+
+
+def collect_image_metadata(
+    asset_root: Path,
+    manifest: dict[str, dict],
+    cache_path: Path,
+    workers: int = 1,
+    write_file=None,
+) -> tuple[dict[str, dict], int]:
+    """Return ({asset path: metadata fields}, number of images decoded this run).
+
+    ``manifest`` is the build manifest (asset path -> entry with sha256,
+    encoding and outputSize). The cache is rewritten to hold only current images.
+    """
+    cache = load_cache(cache_path)
+    keys = {asset: content_key(entry) for asset, entry in manifest.items()}
+    # Keyed by content, so identical images are decoded once.
+    pending = {key: asset_root / asset for asset, key in sorted(keys.items()) if key not in cache}
+    jobs = sorted(pending.items())
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            cache.update(pool.map(_metadata_job, jobs, chunksize=16))
+    else:
+        cache.update(_metadata_job(job) for job in jobs)
+
+    current = {key: cache[key] for key in sorted(set(keys.values()))}
+    payload = json.dumps({"version": CACHE_VERSION, "images": current}, indent=2) + "\n"
+    if write_file is not None:
+        write_file(cache_path, payload)
+    else:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(payload, encoding="utf-8")
+
+    metadata = {}
+    for asset, entry in manifest.items():
+        fields = current[keys[asset]]
+        metadata[asset] = {
+            "imageWidth": fields["imageWidth"],
+            "imageHeight": fields["imageHeight"],
+            "imageBytes": entry["outputSize"],
+            "imagePlaceholder": fields["imagePlaceholder"],
+        }
+    return metadata, len(jobs)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Print pack layout metadata for sign images.")
+    parser.add_argument("images", type=Path, nargs="+")
+    args = parser.parse_args(argv)
+    for path in args.images:
+        fields = read_metadata(path)
+        fields["imageBytes"] = path.stat().st_size
+        print(f"{path}: {json.dumps(fields)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Versioned delta packs between successive traffic_signs pack builds.
+
+Every --deltas build records a version under backend/data/versions/traffic_signs/,
+next to the backend's other data/versions/<packType>/ folders: <version>.json
+(sign and image hashes) plus <version>.pack.json (the exact pack bytes). Both
+folders are committed, so a fresh checkout or CI run has the earlier versions
+to diff against. The latest --keep-versions builds are kept. For every kept
+older version the builder writes backend/data/deltas/traffic_signs/<from>_to_<to>.zip:
+
+  delta.json   {"version": 1, "from": ..., "to": ...,
+                "baseSha256": ..., "targetSha256": ...,      # pack JSON bytes
+                "header": {..., "signs": null, ...},         # every other pack key, in order
+                "added": {key: sign}, "changed": {key: sign}, "removed": [key, ...],
+                "order": [[start, end] | [key, ...], ...],
+                "images": {"<asset path>": "<sha256>"},     # added or changed, stored below
+                "removedImages": ["<asset path>", ...]}
+  images/...   only the added or changed image files
+
+Signs are keyed by "<code>|<imageAssetPath>", with "#2", "#3"... on repeats,
+not by "id". Builder ids are "sign-<row>", so inserting one spreadsheet row
+renumbers every later sign; keyed by id, that would make a near-full delta.
+Sign hashes leave "id" out. "order" rebuilds the target sequence from base
+slices ([start, end]) and runs of new keys. apply_delta then renumbers the ids
+and checks the rebuilt pack against targetSha256. Images are checked against
+their hashes. The result is staged in a temporary folder next to the output
+and only swapped in once every check has passed, so a bad delta leaves the
+output as it was. Thumbnails, shards and other sidecars are derived from the
+pack, so they are not part of a delta.
+
+Usage:
+  python tools/sign_pack_delta.py apply <base_asset_root> <delta.zip> <out_asset_root>
+  python tools/sign_pack_delta.py verify <base_asset_root> <delta.zip> <target_asset_root>
+"""
+
+import argparse
+import difflib
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+
+PACK_NAME = "traffic_signs_pack_v1.json"
+DELTA_VERSION = 2
+VERSION_INDEX = "index.json"
+ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+class DeltaError(ValueError):
+    pass
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_pack(pack: dict) -> bytes:
+    # Same serialisation as build_traffic_signs_pack.py.
+    return json.dumps(pack, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def sign_hash(sign: dict) -> str:
+    content = {key: value for key, value in sign.items() if key != "id"}
+    return sha256_bytes(json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+
+
+def sign_keys(signs: list[dict]) -> list[str]:
+    """Stable identity per sign, independent of its row position."""
+    seen: dict[str, int] = {}
+    keys = []
+    for sign in signs:
+        key = f"{sign.get('code', '')}|{sign.get('imageAssetPath', '')}"
+        seen[key] = seen.get(key, 0) + 1
+        keys.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+    return keys
+
+
+def image_hashes(asset_root: Path, pack: dict) -> dict[str, str]:
+    paths = sorted({sign["imageAssetPath"] for sign in pack.get("signs", []) if sign.get("imageAssetPath")})
+    return {path: sha256_bytes((asset_root / path).read_bytes()) for path in paths}
+
+
+def version_manifest(pack_bytes: bytes, pack: dict, images: dict[str, str]) -> dict:
+    signs = pack.get("signs", [])
+    hashes = dict(zip(sign_keys(signs), map(sign_hash, signs)))
+    fingerprint = hashlib.sha256(pack_bytes)
+    for path, digest in images.items():
+        fingerprint.update(f"\n{path}\t{digest}".encode("utf-8"))
+    return {
+        "version": f"signs-{fingerprint.hexdigest()[:12]}",
+        "deltaVersion": DELTA_VERSION,
+        "packSha256": sha256_bytes(pack_bytes),
+        "signs": hashes,  # in pack order
+        "images": images,
+    }
+
+
+def load_versions(versions_dir: Path) -> list[str]:
+    index = versions_dir / VERSION_INDEX
+    if not index.exists():
+        return []
+    return json.loads(index.read_text(encoding="utf-8")).get("versions", [])
+
+
+def record_version(versions_dir: Path, manifest: dict, pack_bytes: bytes, keep: int) -> tuple[list[str], list[str]]:
+    """Store ``manifest`` as the newest version; returns (kept versions oldest first, pruned)."""
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    version = manifest["version"]
+    (versions_dir / f"{version}.json").write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    (versions_dir / f"{version}.pack.json").write_bytes(pack_bytes)
+    versions = [v for v in load_versions(versions_dir) if v != version] + [version]
+    kept, pruned = versions[-keep:], versions[:-keep]
+    for old in pruned:
+        (versions_dir / f"{old}.json").unlink(missing_ok=True)
+        (versions_dir / f"{old}.pack.json").unlink(missing_ok=True)
+    (versions_dir / VERSION_INDEX).write_text(json.dumps({"versions": kept}, indent=2) + "\n", encoding="utf-8")
+    return kept, pruned
+
+
+def order_ops(base_keys: list[str], target_keys: list[str]) -> list[list]:
+    """Target key order as base slices [start, end] and runs of keys not taken from the base."""
+    ops: list[list] = []
+    matcher = difflib.SequenceMatcher(None, base_keys, target_keys, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(target_keys[j1:j2])
+    return ops
+
+
+def build_delta(base: dict, target: dict, pack: dict) -> dict:
+    """Delta from version manifest ``base`` to ``target`` (whose full pack is ``pack``)."""
+    if base.get("deltaVersion") != DELTA_VERSION:
+        raise DeltaError(f"Version {base['version']} predates delta format {DELTA_VERSION}")
+    by_key = dict(zip(sign_keys(pack.get("signs", [])), pack.get("signs", [])))
+    added = {key: by_key[key] for key in target["signs"] if key not in base["signs"]}
+    changed = {
+        key: by_key[key]
+        for key, digest in target["signs"].items()
+        if key in base["signs"] and base["signs"][key] != digest
+    }
+    removed = [key for key in base["signs"] if key not in target["signs"]]
+    images = {path: digest for path, digest in target["images"].items() if base["images"].get(path) != digest}
+    return {
+        "version": DELTA_VERSION,
+        "from": base["version"],
+        "to": target["version"],
+        "baseSha256": base["packSha256"],
+        "targetSha256": target["packSha256"],
+        # "signs" stays as a null placeholder so the rebuilt pack keeps its key order.
+        "header": {key: None if key == "signs" else value for key, value in pack.items()},
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "order": order_ops(list(base["signs"]), list(target["signs"])),
+        "images": images,
+        "removedImages": sorted(set(base["images"]) - set(target["images"])),
+    }
+
+
+def encode_delta_zip(delta: dict, asset_root: Path) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        info = zipfile.ZipInfo("delta.json", ZIP_DATE)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        archive.writestr(info, json.dumps(delta, ensure_ascii=False, separators=(",", ":")))
+        for path in sorted(delta["images"]):
+            # JPEGs do not compress further; store them as-is.
+            archive.writestr(zipfile.ZipInfo(path, ZIP_DATE), (asset_root / path).read_bytes())
+    return buffer.getvalue()
+
+
+def apply_pack_delta(base_bytes: bytes, delta: dict) -> bytes:
+    """Rebuild the target pack JSON bytes from the base pack bytes and ``delta``."""
+    if sha256_bytes(base_bytes) != delta["baseSha256"]:
+        raise DeltaError(f"Base pack does not match delta {delta['from']}")
+    base_signs = json.loads(base_bytes).get("signs", [])
+    signs = dict(zip(sign_keys(base_signs), base_signs))
+    base_keys = list(signs)
+    signs.update(delta["changed"])
+    signs.update(delta["added"])
+    order: list[str] = []
+    for op in delta["order"]:
+        order.extend(base_keys[op[0] : op[1]] if isinstance(op[0], int) else op)
+    pack = dict(delta["header"])
+    # Builder ids are "sign-<row>": renumber by position.
+    pack["signs"] = [{**signs[key], "id": f"sign-{n}"} for n, key in enumerate(order, start=1)]
+    data = encode_pack(pack)
+    if sha256_bytes(data) != delta["targetSha256"]:
+        raise DeltaError(f"Rebuilt pack does not match delta {delta['to']}")
+    return data
+
+
+def apply_delta(base_root: Path, delta_zip: Path, out_root: Path) -> dict:
+    """Write base + delta into ``out_root`` (which may be ``base_root``); returns the delta.
+
+    In place, only images/ and the pack are replaced. Any other existing
+    ``out_root`` must be empty or an asset pack (holding PACK_NAME); it is
+    replaced as a whole.
+    """
+    base_path, out_path = base_root.resolve(), out_root.resolve()
+    in_place = out_path == base_path
+    if not in_place and (out_path.is_relative_to(base_path) or base_path.is_relative_to(out_path)):
+        raise DeltaError(f"Output {out_root} overlaps the base pack {base_root}")
+    if not in_place and out_root.exists() and any(out_root.iterdir()) and not (out_root / PACK_NAME).is_file():
+        raise DeltaError(f"Output {out_root} is not a sign asset pack; refusing to replace it")
+    out_root.parent.mkdir(parents=True, exist_ok=True)
+    stage = Path(tempfile.mkdtemp(prefix=f".{out_root.name}_delta_", dir=out_root.parent))
+    try:
+        staged = stage / "pack"
+        with zipfile.ZipFile(delta_zip) as archive:
+            delta = json.loads(archive.read("delta.json"))
+            pack_bytes = apply_pack_delta((base_root / PACK_NAME).read_bytes(), delta)
+            shutil.copytree(base_root / "images", staged / "images")
+            for path in delta["removedImages"]:
+                (staged / path).unlink(missing_ok=True)
+            for path, digest in delta["images"].items():
+                data = archive.read(path)
+                if sha256_bytes(data) != digest:
+                    raise DeltaError(f"Image hash mismatch in delta: {path}")
+                (staged / path).parent.mkdir(parents=True, exist_ok=True)
+                (staged / path).write_bytes(data)
+        (staged / PACK_NAME).write_bytes(pack_bytes)
+
+        # Everything checked out: swap the staged files in. The old ones go to the stage and are dropped with it.
+        if in_place:
+            (out_root / "images").rename(stage / "previous_images")
+            (staged / "images").rename(out_root / "images")
+            os.replace(staged / PACK_NAME, out_root / PACK_NAME)
+        else:
+            if out_root.exists():
+                out_root.rename(stage / "previous")
+            staged.rename(out_root)
+    finally:
+        shutil.rmtree(stage, ignore_errors=True)
+    return delta
+
+
+def verify_delta(base_root: Path, delta_zip: Path, target_root: Path) -> list[str]:
+    """Return a list of problems; empty when base + delta reproduces the target pack and images."""
+    with tempfile.TemporaryDirectory(prefix="sign_delta_") as tmp:
+        out_root = Path(tmp) / "pack"
+        try:
+            apply_delta(base_root, delta_zip, out_root)
+        except (DeltaError, KeyError, OSError) as error:
+            return [str(error)]
+        problems = []
+        if (out_root / PACK_NAME).read_bytes() != (target_root / PACK_NAME).read_bytes():
+            problems.append(f"{PACK_NAME} differs from the target")
+        target = json.loads((target_root / PACK_NAME).read_text(encoding="utf-8"))
+        for path, digest in image_hashes(target_root, target).items():
+            rebuilt = out_root / path
+            if not rebuilt.exists():
+                problems.append(f"missing image {path}")
+            elif sha256_bytes(rebuilt.read_bytes()) != digest:
+                problems.append(f"image {path} differs from the target")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Apply or verify traffic sign pack deltas.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("apply", "verify"):
+        command = sub.add_parser(name)
+        command.add_argument("base", type=Path, help="Asset root holding the base pack and images.")
+        command.add_argument("delta", type=Path)
+        command.add_argument("target", type=Path, help="Output asset root (apply) or expected asset root (verify).")
+    args = parser.parse_args(argv)
+
+    if args.command == "apply":
+        delta = apply_delta(args.base, args.delta, args.target)
+        print(f"Applied {delta['from']} -> {delta['to']}: {args.target}")
+        return
+    problems = verify_delta(args.base, args.delta, args.target)
+    for problem in problems:
+        print(problem)
+    if problems:
+        raise SystemExit(f"Delta verification failed: {len(problems)} problem(s)")
+    print("Delta OK: base + delta == target")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Compact binary code -> imageAssetPath index for the traffic_signs pack.
+
+MainActivity only needs code -> imageAssetPath from traffic_signs_pack_v1.json,
+so the builder can emit this sidecar (traffic_signs_index_v1.bin) that is
+read in one pass or memory-mapped and binary-searched without parsing JSON.
+SignIndex checks the crc32 once when it is opened; lookup() on raw bytes
+reads only the fixed header and the entries it probes.
+
+Layout (little-endian):
+
+  header   magic "DTSI", u16 version, u16 flags, u32 count,
+           u32 table offset, u32 strings offset, u32 strings size,
+           u32 crc32 of everything after the header
+  table    count x (u32 code offset, u16 code length,
+                    u32 path offset, u16 path length), sorted by code bytes
+  strings  UTF-8 blob, each distinct string stored once
+
+Usage:
+  python tools/sign_pack_index.py verify <index.bin> <traffic_signs_pack_v1.json>
+  python tools/sign_pack_index.py lookup <index.bin> <code>
+"""
+
+import argparse
+import json
+import struct
+import zlib
+from pathlib import Path
+
+
+INDEX_MAGIC = b"DTSI"
+INDEX_VERSION = 1
+HEADER = struct.Struct("<4sHHIIIII")
+ENTRY = struct.Struct("<IHIH")
+
+
+class IndexFormatError(ValueError):
+    pass
+
+
+def code_path_map(signs: list[dict]) -> dict[str, str]:
+    """Same mapping as MainActivity.loadRoadSignIndex: trimmed, non-blank, last sign wins."""
+    index: dict[str, str] = {}
+    for sign in signs:
+        code = str(sign.get("code", "")).strip()
+        path = str(sign.get("imageAssetPath", "")).strip()
+        if code and path:
+            index[code] = path
+    return index
+
+
+def encode_index(mapping: dict[str, str]) -> bytes:
+    items = sorted(((code.encode("utf-8"), path.encode("utf-8")) for code, path in mapping.items()))
+    strings = bytearray()
+    offsets: dict[bytes, int] = {}
+
+    def intern(value: bytes) -> int:
+        if value not in offsets:
+            offsets[value] = len(strings)
+            strings.extend(value)
+        return offsets[value]
+
+    table = bytearray()
+    for code, path in items:
+        table.extend(ENTRY.pack(intern(code), len(code), intern(path), len(path)))
+
+    table_offset = HEADER.size
+    strings_offset = table_offset + len(table)
+    body = bytes(table) + bytes(strings)
+    header = HEADER.pack(
+        INDEX_MAGIC,
+        INDEX_VERSION,
+        0,
+        len(items),
+        table_offset,
+        strings_offset,
+        len(strings),
+        zlib.crc32(body),
+    )
+    return header + body
+
+
+def _parse_header(data: bytes | memoryview) -> tuple[int, int, int, int, int]:
+    """Check the fixed header against the file size; does not read the body."""
+    if len(data) < HEADER.size:
+        raise IndexFormatError("Index is shorter than its header")
+    magic, version, _flags, count, table_offset, strings_offset, strings_size, crc = HEADER.unpack_from(data, 0)
+    if magic != INDEX_MAGIC:
+        raise IndexFormatError(f"Bad magic: {magic!r}")
+    if version != INDEX_VERSION:
+        raise IndexFormatError(f"Unsupported index version: {version}")
+    if strings_offset != table_offset + count * ENTRY.size or strings_offset + strings_size != len(data):
+        raise IndexFormatError("Index section sizes do not match the file size")
+    return count, table_offset, strings_offset, strings_size, crc
+
+
+def _find(view: memoryview, count: int, table_offset: int, strings_offset: int, code: str) -> str | None:
+    key = code.encode("utf-8")
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        code_off, code_len, path_off, path_len = ENTRY.unpack_from(view, table_offset + mid * ENTRY.size)
+        probe = bytes(view[strings_offset + code_off : strings_offset + code_off + code_len])
+        if probe == key:
+            return bytes(view[strings_offset + path_off : strings_offset + path_off + path_len]).decode("utf-8")
+        if probe < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return None
+
+
+class SignIndex:
+    """An index checked once on open (header and crc32), then searched without rechecking."""
+
+    def __init__(self, data: bytes | memoryview) -> None:
+        self.count, self.table_offset, self.strings_offset, _, crc = _parse_header(data)
+        self.data = memoryview(data)
+        if zlib.crc32(self.data[HEADER.size :]) != crc:
+            raise IndexFormatError("Index checksum mismatch")
+
+    def lookup(self, code: str) -> str | None:
+        return _find(self.data, self.count, self.table_offset, self.strings_offset, code)
+
+    def items(self) -> dict[str, str]:
+        view, base = self.data, self.strings_offset
+        out: dict[str, str] = {}
+        for i in range(self.count):
+            code_off, code_len, path_off, path_len = ENTRY.unpack_from(view, self.table_offset + i * ENTRY.size)
+            code = bytes(view[base + code_off : base + code_off + code_len]).decode("utf-8")
+            out[code] = bytes(view[base + path_off : base + path_off + path_len]).decode("utf-8")
+        return out
+
+
+def decode_index(data: bytes | memoryview) -> dict[str, str]:
+    return SignIndex(data).items()
+
+
+def lookup(data: bytes | memoryview, code: str) -> str | None:
+    """Binary-search a single code, reading only the fixed header and the probed entries.
+
+    The crc32 is not checked here; open a SignIndex once to verify the file
+    and reuse it for repeated lookups.
+    """
+    count, table_offset, strings_offset, _, _ = _parse_header(data)
+    return _find(memoryview(data), count, table_offset, strings_offset, code)
+
+
+def minified_pack_json(pack: dict) -> str:
+    return json.dumps(pack, ensure_ascii=False, separators=(",", ":"))
+
+
+def verify_index(index_path: Path, pack_path: Path) -> list[str]:
+    """Return a list of problems; empty when the sidecar round-trips the pack."""
+    pack = json.loads(pack_path.read_text(encoding="utf-8"))
+    expected = code_path_map(pack.get("signs", []))
+    data = index_path.read_bytes()
+    try:
+        index = SignIndex(data)
+    except IndexFormatError as error:
+        return [str(error)]
+    actual = index.items()
+
+    problems = []
+    for code in sorted(expected.keys() - actual.keys()):
+        problems.append(f"missing code {code}")
+    for code in sorted(actual.keys() - expected.keys()):
+        problems.append(f"unexpected code {code}")
+    for code in sorted(expected.keys() & actual.keys()):
+        if expected[code] != actual[code]:
+            problems.append(f"code {code}: {actual[code]} != {expected[code]}")
+        elif index.lookup(code) != expected[code]:
+            problems.append(f"code {code}: binary search failed")
+    if encode_index(expected) != data:
+        problems.append("index bytes differ from a fresh encode of the pack")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect or verify a traffic sign binary index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify")
+    verify.add_argument("index", type=Path)
+    verify.add_argument("pack", type=Path)
+    find = sub.add_parser("lookup")
+    find.add_argument("index", type=Path)
+    find.add_argument("code")
+    args = parser.parse_args(argv)
+
+    if args.command == "verify":
+        problems = verify_index(args.index, args.pack)
+        for problem in problems:
+            print(problem)
+        if problems:
+            raise SystemExit(f"Index verification failed: {len(problems)} problem(s)")
+        print(f"Index OK: {len(decode_index(args.index.read_bytes()))} codes")
+    else:
+        path = SignIndex(args.index.read_bytes()).lookup(args.code)
+        if path is None:
+            raise SystemExit(f"Code not found: {args.code}")
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
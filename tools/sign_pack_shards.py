@@ -0,0 +1,173 @@
+"""
+Per-category shards of the traffic_signs pack with a small root index.
+
+The pack is split by primaryCategoryId into shards/<categoryId>.json so the
+sign browser and the map overlay can load and cache only the categories
+they need. The root index (traffic_signs_shards_v1.json) carries everything
+needed before a shard is opened:
+
+  {
+    "version": 1,
+    "generatedFrom": "...", "sourceReferences": [...],
+    "catalogueSize": 655, "missingImageCount": 6, "missingImages": [...],
+    "categories": [
+      {"id": "warning-signs-jpg", "name": "Warning Signs", "signCount": 140,
+       "shard": "shards/warning-signs-jpg.json", "sha256": "...", "bytes": 61234,
+       "memberShards": ["warning-signs-jpg", "road-works-and-temporary-jpg"]}
+    ],
+    "codes": {"<sign code>": "<categoryId of the shard holding it>"}
+  }
+
+memberShards lists every shard that has a sign whose categoryIds include
+the category. The browser filters on categoryIds, so a category view loads
+those shards rather than only its own. Codes map to the shard of the last
+sign carrying that code, matching MainActivity.loadRoadSignIndex.
+
+Each shard is {"version": 1, "categoryId": ..., "signs": [...]} written as
+compact JSON, with signs in pack order. Clients compare "sha256" with
+their cached copy to decide whether to reload a shard.
+
+Usage:
+  python tools/sign_pack_shards.py verify <traffic_signs_shards_v1.json> <traffic_signs_pack_v1.json>
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+from sign_pack_index import code_path_map
+
+
+SHARDS_DIR = "shards"
+ROOT_INDEX_NAME = "traffic_signs_shards_v1.json"
+SHARD_VERSION = 1
+PACK_HEADER_KEYS = ("generatedFrom", "sourceReferences", "catalogueSize", "missingImageCount", "missingImages")
+
+
+def encode_shard(category_id: str, signs: list[dict]) -> bytes:
+    payload = {"version": SHARD_VERSION, "categoryId": category_id, "signs": signs}
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_shards(pack: dict) -> tuple[dict, dict[str, bytes]]:
+    """Return (root index, {relative shard path: shard bytes}) for ``pack``."""
+    signs = pack.get("signs", [])
+    by_category: dict[str, list[dict]] = {}
+    members: dict[str, set[str]] = {}
+    for sign in signs:
+        shard_id = sign["primaryCategoryId"]
+        by_category.setdefault(shard_id, []).append(sign)
+        for category_id in [shard_id, *sign.get("categoryIds", [])]:
+            members.setdefault(category_id, set()).add(shard_id)
+
+    files: dict[str, bytes] = {}
+    categories = []
+    for category in pack.get("categories", []):
+        category_id = category["id"]
+        data = encode_shard(category_id, by_category.get(category_id, []))
+        rel = f"{SHARDS_DIR}/{category_id}.json"
+        files[rel] = data
+        own = [category_id]
+        others = sorted(members.get(category_id, set()) - {category_id})
+        categories.append(
+            {
+                **category,
+                "shard": rel,
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "bytes": len(data),
+                "memberShards": own + others,
+            }
+        )
+
+    codes = {}
+    for sign in signs:
+        code = str(sign.get("code", "")).strip()
+        if code and str(sign.get("imageAssetPath", "")).strip():
+            codes[code] = sign["primaryCategoryId"]
+
+    root = {"version": SHARD_VERSION}
+    root.update({key: pack[key] for key in PACK_HEADER_KEYS if key in pack})
+    root["categories"] = categories
+    root["codes"] = dict(sorted(codes.items()))
+    return root, files
+
+
+def write_shards(asset_root: Path, pack: dict, write_file=None) -> dict:
+    """Write the root index and shards under ``asset_root``; returns the root index.
+
+    ``write_file(path, data)`` is used for every output so callers can skip
+    unchanged files; shards of categories that no longer exist are removed.
+    """
+    write_file = write_file or (lambda path, data: path.write_bytes(data))
+    root, files = build_shards(pack)
+    shards_root = asset_root / SHARDS_DIR
+    shards_root.mkdir(parents=True, exist_ok=True)
+    for rel, data in files.items():
+        write_file(asset_root / rel, data)
+    write_file(asset_root / ROOT_INDEX_NAME, (json.dumps(root, indent=2, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    keep = {asset_root / rel for rel in files}
+    for file_path in shards_root.glob("*.json"):
+        if file_path not in keep:
+            file_path.unlink()
+    return root
+
+
+def merge_shards(asset_root: Path, root: dict) -> list[dict]:
+    """Reassemble pack-ordered signs from the shards listed in ``root``."""
+    signs = []
+    for category in root["categories"]:
+        data = (asset_root / category["shard"]).read_bytes()
+        if hashlib.sha256(data).hexdigest() != category["sha256"]:
+            raise ValueError(f"Shard hash mismatch: {category['shard']}")
+        signs.extend(json.loads(data)["signs"])
+    return sorted(signs, key=lambda sign: int(sign["id"].rpartition("-")[2]))
+
+
+def verify_shards(root_path: Path, pack_path: Path) -> list[str]:
+    """Return a list of problems; empty when the shards round-trip the pack."""
+    pack = json.loads(pack_path.read_text(encoding="utf-8"))
+    root = json.loads(root_path.read_text(encoding="utf-8"))
+    try:
+        signs = merge_shards(root_path.parent, root)
+    except (OSError, ValueError) as error:
+        return [str(error)]
+
+    problems = []
+    if signs != pack.get("signs", []):
+        problems.append("merged shard signs differ from the pack")
+    # Deduplicated images can be shared across categories, so resolve codes by sign, not by path.
+    last_shard = {
+        str(sign.get("code", "")).strip(): sign["primaryCategoryId"]
+        for sign in signs
+        if str(sign.get("imageAssetPath", "")).strip()
+    }
+    for code in code_path_map(pack.get("signs", [])):
+        if root["codes"].get(code) != last_shard[code]:
+            problems.append(f"code {code}: shard {root['codes'].get(code)} != {last_shard[code]}")
+    for category in root["categories"]:
+        if category["signCount"] != sum(1 for sign in signs if sign["primaryCategoryId"] == category["id"]):
+            problems.append(f"category {category['id']}: signCount does not match its shard")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Verify traffic sign pack shards against the full pack.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify")
+    verify.add_argument("root", type=Path)
+    verify.add_argument("pack", type=Path)
+    args = parser.parse_args(argv)
+
+    problems = verify_shards(args.root, args.pack)
+    for problem in problems:
+        print(problem)
+    if problems:
+        raise SystemExit(f"Shard verification failed: {len(problems)} problem(s)")
+    root = json.loads(args.root.read_text(encoding="utf-8"))
+    print(f"Shards OK: {len(root['categories'])} shards, {len(root['codes'])} codes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Precomputed type-ahead search index for the traffic_signs pack.
+
+Searchable text per sign: caption, description, code, officialCategories and
+textHint. Text is lower-cased and split into tokens of letters and digits;
+dotted numbers such as sign codes ("954.3", "610.1L") stay one token. A sign
+matches a query when every query token is a prefix of at least one of its
+tokens. brute_force_search() defines the same semantics by scanning the pack.
+
+The index (traffic_signs_search_v1.bin) holds two sorted tables over one
+string blob:
+
+  terms     every distinct token        -> ordinals of the signs containing it
+  prefixes  every edge n-gram of length -> ordinals of the signs with a token
+            1..MAX_PREFIX of a token       starting with it
+
+Query tokens up to MAX_PREFIX characters read one prefix posting list.
+Longer tokens start from their MAX_PREFIX posting list and union the term
+postings in the sorted term range that starts with the token. Ordinals are
+indexes into the pack's "signs" array.
+
+Layout (little-endian):
+
+  header    magic "DTSS", u16 version, u16 max prefix, u32 sign count,
+            u32 term count, u32 prefix count, u32 strings size,
+            u32 postings size, u32 crc32 of everything after the header
+  terms     term count x (u32 string offset, u16 string length,
+                          u32 postings offset, u32 postings count)
+  prefixes  prefix count x the same entry, both tables sorted by UTF-8 bytes
+  strings   UTF-8 blob
+  postings  per entry: ascending ordinals as LEB128 varints, first value
+            absolute, the rest as gaps from the previous ordinal
+
+Usage:
+  python tools/sign_search_index.py verify <index.bin> <traffic_signs_pack_v1.json>
+  python tools/sign_search_index.py query <index.bin> <traffic_signs_pack_v1.json> "speed lim"
+"""
+
+import argparse
+import json
+import re
+import struct
+import zlib
+from pathlib import Path
+
+
+SEARCH_MAGIC = b"DTSS"
+SEARCH_VERSION = 1
+MAX_PREFIX = 6
+HEADER = struct.Struct("<4sHHIIIIII")
+ENTRY = struct.Struct("<IHII")
+TOKEN_RE = re.compile(r"[0-9a-z]+(?:\.[0-9a-z]+)*")
+SEARCH_FIELDS = ("caption", "description", "code", "officialCategories", "textHint")
+
+
+class SearchIndexError(ValueError):
+    pass
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def sign_tokens(sign: dict) -> set[str]:
+    tokens: set[str] = set()
+    for field in SEARCH_FIELDS:
+        value = sign.get(field, "")
+        for part in value if isinstance(value, list) else [value]:
+            tokens.update(tokenize(str(part)))
+    return tokens
+
+
+def brute_force_search(signs: list[dict], query: str, token_sets: list[set[str]] | None = None) -> list[int]:
+    """Reference scan: ordinals whose tokens cover every query token as a prefix.
+
+    ``token_sets`` may hold precomputed sign_tokens() per sign for repeated scans.
+    """
+    wanted = tokenize(query)
+    if not wanted:
+        return []
+    token_sets = token_sets if token_sets is not None else [sign_tokens(sign) for sign in signs]
+    out = []
+    for ordinal, tokens in enumerate(token_sets):
+        if all(any(token.startswith(part) for token in tokens) for part in wanted):
+            out.append(ordinal)
+    return out
+
+
+def encode_postings(ordinals: list[int]) -> bytes:
+    out = bytearray()
+    previous = 0
+    for i, ordinal in enumerate(ordinals):
+        value = ordinal if i == 0 else ordinal - previous
+        previous = ordinal
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_postings(data: bytes | memoryview, offset: int, count: int) -> list[int]:
+    out = []
+    previous = 0
+    for i in range(count):
+        value = shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        previous = value if i == 0 else previous + value
+        out.append(previous)
+    return out
+
+
+def encode_search_index(signs: list[dict], max_prefix: int = MAX_PREFIX) -> bytes:
+    terms: dict[str, list[int]] = {}
+    prefixes: dict[str, set[int]] = {}
+    for ordinal, sign in enumerate(signs):
+        for token in sign_tokens(sign):
+            terms.setdefault(token, []).append(ordinal)
+            for length in range(1, min(len(token), max_prefix) + 1):
+                prefixes.setdefault(token[:length], set()).add(ordinal)
+
+    strings = bytearray()
+    postings = bytearray()
+    offsets: dict[bytes, int] = {}
+
+    def table(entries: dict[str, list[int] | set[int]]) -> bytes:
+        out = bytearray()
+        for key in sorted(entries, key=lambda value: value.encode("utf-8")):
+            raw = key.encode("utf-8")
+            if raw not in offsets:
+                offsets[raw] = len(strings)
+                strings.extend(raw)
+            ordinals = sorted(entries[key])
+            out.extend(ENTRY.pack(offsets[raw], len(raw), len(postings), len(ordinals)))
+            postings.extend(encode_postings(ordinals))
+        return bytes(out)
+
+    body = table(terms) + table(prefixes)
+    body += bytes(strings) + bytes(postings)
+    header = HEADER.pack(
+        SEARCH_MAGIC,
+        SEARCH_VERSION,
+        max_prefix,
+        len(signs),
+        len(terms),
+        len(prefixes),
+        len(strings),
+        len(postings),
+        zlib.crc32(body),
+    )
+    return header + body
+
+
+class SearchIndex:
+    def __init__(self, data: bytes) -> None:
+        if len(data) < HEADER.size:
+            raise SearchIndexError("Index is shorter than its header")
+        magic, version, max_prefix, sign_count, term_count, prefix_count, strings_size, postings_size, crc = (
+            HEADER.unpack_from(data, 0)
+        )
+        if magic != SEARCH_MAGIC:
+            raise SearchIndexError(f"Bad magic: {magic!r}")
+        if version != SEARCH_VERSION:
+            raise SearchIndexError(f"Unsupported search index version: {version}")
+        self.terms_offset = HEADER.size
+        self.prefixes_offset = self.terms_offset + term_count * ENTRY.size
+        self.strings_offset = self.prefixes_offset + prefix_count * ENTRY.size
+        self.postings_offset = self.strings_offset + strings_size
+        if self.postings_offset + postings_size != len(data):
+            raise SearchIndexError("Index section sizes do not match the file size")
+        if zlib.crc32(data[HEADER.size:]) != crc:
+            raise SearchIndexError("Index checksum mismatch")
+        self.data = memoryview(data)
+        self.max_prefix = max_prefix
+        self.sign_count = sign_count
+        self.term_count = term_count
+        self.prefix_count = prefix_count
+
+    def _entry(self, table_offset: int, i: int) -> tuple[bytes, int, int]:
+        string_off, string_len, postings_off, count = ENTRY.unpack_from(self.data, table_offset + i * ENTRY.size)
+        start = self.strings_offset + string_off
+        return bytes(self.data[start : start + string_len]), postings_off, count
+
+    def _lower_bound(self, table_offset: int, count: int, key: bytes) -> int:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(table_offset, mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _postings(self, postings_off: int, count: int) -> list[int]:
+        return decode_postings(self.data, self.postings_offset + postings_off, count)
+
+    def prefix_postings(self, token: str) -> set[int]:
+        """Ordinals of signs with a token starting with ``token``."""
+        key = token.encode("utf-8")
+        head = key[: self.max_prefix]
+        i = self._lower_bound(self.prefixes_offset, self.prefix_count, head)
+        if i >= self.prefix_count:
+            return set()
+        found, postings_off, count = self._entry(self.prefixes_offset, i)
+        if found != head:
+            return set()
+        candidates = set(self._postings(postings_off, count))
+        if len(key) <= self.max_prefix:
+            return candidates
+
+        matched: set[int] = set()
+        i = self._lower_bound(self.terms_offset, self.term_count, key)
+        while i < self.term_count:
+            term, postings_off, count = self._entry(self.terms_offset, i)
+            if not term.startswith(key):
+                break
+            matched.update(self._postings(postings_off, count))
+            i += 1
+        return matched & candidates
+
+    def search(self, query: str) -> list[int]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Longest tokens first: they usually have the shortest posting lists.
+        result: set[int] | None = None
+        for token in sorted(set(tokens), key=len, reverse=True):
+            hits = self.prefix_postings(token)
+            result = hits if result is None else result & hits
+            if not result:
+                return []
+        return sorted(result)
+
+
+def verify_search_index(index_path: Path, pack_path: Path) -> list[str]:
+    """Compare every indexed term, prefix and multi-token query with a brute-force scan."""
+    signs = json.loads(pack_path.read_text(encoding="utf-8")).get("signs", [])
+    data = index_path.read_bytes()
+    try:
+        index = SearchIndex(data)
+    except SearchIndexError as error:
+        return [str(error)]
+
+    problems = []
+    if index.sign_count != len(signs):
+        problems.append(f"index covers {index.sign_count} signs, pack has {len(signs)}")
+    if encode_search_index(signs, index.max_prefix) != data:
+        problems.append("index bytes differ from a fresh encode of the pack")
+    token_sets = [sign_tokens(sign) for sign in signs]
+    queries: set[str] = set()
+    for sign, token_set in zip(signs, token_sets):
+        tokens = sorted(token_set)
+        for token in tokens:
+            queries.update(token[:length] for length in range(1, len(token) + 1))
+        queries.add(" ".join(tokens[:2]))
+        queries.add(f"{sign.get('caption', '')[:12]} {sign.get('code', '')}")
+    for query in sorted(queries):
+        if index.search(query) != brute_force_search(signs, query, token_sets):
+            problems.append(f"query {query!r} differs from the brute-force scan")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Query or verify a traffic sign search index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify")
+    verify.add_argument("index", type=Path)
+    verify.add_argument("pack", type=Path)
+    find = sub.add_parser("query")
+    find.add_argument("index", type=Path)
+    find.add_argument("pack", type=Path)
+    find.add_argument("text")
+    args = parser.parse_args(argv)
+
+    if args.command == "verify":
+        problems = verify_search_index(args.index, args.pack)
+        for problem in problems[:50]:
+            print(problem)
+        if problems:
+            raise SystemExit(f"Search index verification failed: {len(problems)} problem(s)")
+        print("Search index OK: matches the brute-force scan")
+    else:
+        signs = json.loads(args.pack.read_text(encoding="utf-8")).get("signs", [])
+        for ordinal in SearchIndex(args.index.read_bytes()).search(args.text):
+            sign = signs[ordinal]
+            print(f"{sign.get('code', ''):12s} {sign.get('caption', '')}")
+
+
+if __name__ == "__main__":
+    main()
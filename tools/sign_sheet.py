@@ -0,0 +1,174 @@
+"""
+Shared reader for the DfT traffic sign spreadsheet.
+
+Both build_traffic_signs_pack.py and trafficsigns/enrich_knowyoursigns_from_dft.py
+need the same handful of columns. Rows are streamed from the workbook with
+xlrd (no pandas import) into SignMeta records and the parsed rows are cached
+under tools/.cache keyed by the spreadsheet's sha256, so later runs of either
+tool skip the XLS parse entirely. The cache is a sequence of marshalled
+chunks of CACHE_CHUNK_ROWS rows. Rows are read back and written one chunk at
+a time, so a cached load never holds the whole sheet. Writing a new cache
+removes caches left by other sheet versions or CACHE_VERSIONs.
+"""
+
+import hashlib
+import marshal
+import os
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Iterator
+
+import xlrd
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_XLS_PATH = ROOT / "roadsign" / "traffic-signs-images-image-details.xls"
+CACHE_ROOT = ROOT / "tools" / ".cache"
+CACHE_VERSION = 2
+CACHE_CHUNK_ROWS = 4096
+
+REQUIRED_COLUMNS = ("Category", "Description", "Caption", "DGNo", "JPG")
+
+# Cells the DfT sheet uses for "no value". These match pandas' default NA
+# strings, which is how build_traffic_signs_pack.py originally read the sheet.
+EMPTY_MARKERS = frozenset(
+    {
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+        "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SignMeta:
+    category: str
+    description: str
+    caption: str
+    dgno: str
+    jpg: str
+    shape: str = ""
+    bg_colour: str = ""
+    bd_colour: str = ""
+    text: str = ""
+    symbol1: str = ""
+    symbol2: str = ""
+
+
+# Spreadsheet header for each SignMeta field, in field order.
+COLUMN_FOR_FIELD = {
+    "category": "Category",
+    "description": "Description",
+    "caption": "Caption",
+    "dgno": "DGNo",
+    "jpg": "JPG",
+    "shape": "Shape",
+    "bg_colour": "BGColour",
+    "bd_colour": "BDColour",
+    "text": "Text",
+    "symbol1": "Symbol1",
+    "symbol2": "Symbol2",
+}
+FIELD_NAMES = tuple(field.name for field in fields(SignMeta))
+
+
+def cell_text(value) -> str:
+    if isinstance(value, str) and value in EMPTY_MARKERS:
+        return ""
+    return str(value).strip()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path_for(path: Path, cache_root: Path = CACHE_ROOT) -> Path:
+    return cache_root / f"sign_sheet_v{CACHE_VERSION}_{file_sha256(path)[:24]}.marshal"
+
+
+def remove_stale_caches(current: Path) -> None:
+    for stale in current.parent.glob("sign_sheet_v*_*.marshal"):
+        if stale.name != current.name:
+            stale.unlink(missing_ok=True)
+
+
+def _read_workbook_rows(path: Path) -> Iterator[tuple[str, ...]]:
+    book = xlrd.open_workbook(str(path), on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        headers = [str(sheet.cell_value(0, c)).strip() for c in range(sheet.ncols)]
+        index = {name: i for i, name in enumerate(headers)}
+        for col in REQUIRED_COLUMNS:
+            if col not in index:
+                raise ValueError(f"Missing expected column in DfT sheet: {col}")
+        columns = [index.get(COLUMN_FOR_FIELD[name]) for name in FIELD_NAMES]
+        for row in range(1, sheet.nrows):
+            values = sheet.row_values(row)
+            yield tuple("" if c is None else cell_text(values[c]) for c in columns)
+    finally:
+        book.release_resources()
+
+
+def iter_sign_rows(path: Path = DEFAULT_XLS_PATH, cache_root: Path | None = CACHE_ROOT) -> Iterator[SignMeta]:
+    """Yield one SignMeta per spreadsheet row that has a JPG name.
+
+    Pass ``cache_root=None`` to bypass the on-disk cache.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"DfT spreadsheet not found: {path}")
+
+    cache_file = cache_path_for(path, cache_root) if cache_root is not None else None
+    if cache_file is not None and cache_file.exists():
+        yielded = False
+        try:
+            with cache_file.open("rb") as handle:
+                while True:
+                    try:
+                        chunk = marshal.load(handle)
+                    except EOFError:
+                        return
+                    for values in chunk:
+                        yielded = True
+                        yield SignMeta(*values)
+        except (ValueError, TypeError):
+            # Unreadable cache: re-parse the sheet, unless rows were already handed out.
+            if yielded:
+                raise
+
+    if cache_file is None:
+        for values in _read_workbook_rows(path):
+            if values[FIELD_NAMES.index("jpg")]:
+                yield SignMeta(*values)
+        return
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    # Per-process name: the build graph runs both sign builders at once, and both may parse the sheet.
+    tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    complete = False
+    try:
+        with tmp.open("wb") as handle:
+            chunk = []
+            for values in _read_workbook_rows(path):
+                if not values[FIELD_NAMES.index("jpg")]:
+                    continue
+                chunk.append(values)
+                yield SignMeta(*values)
+                if len(chunk) == CACHE_CHUNK_ROWS:
+                    marshal.dump(chunk, handle)
+                    chunk = []
+            if chunk:
+                marshal.dump(chunk, handle)
+        complete = True
+    finally:
+        if complete:
+            tmp.replace(cache_file)
+            remove_stale_caches(cache_file)
+        else:
+            tmp.unlink(missing_ok=True)
+
+
+def load_sign_rows(path: Path = DEFAULT_XLS_PATH, cache_root: Path | None = CACHE_ROOT) -> list[SignMeta]:
+    return list(iter_sign_rows(path, cache_root))
@@ -0,0 +1,286 @@
+"""
+Pre-scaled thumbnail tiers and sprite atlases for road-sign map markers.
+
+For every tier size each pack image is scaled to fit a size x size box and
+written to thumbnails/<size>/<folder>/<name>.jpg. The same thumbnails are
+shelf-packed into atlases (thumbnails/atlas_<size>_<n>.jpg) described by
+thumbnails/sprite_atlas_v1.json:
+
+  {
+    "version": 1,
+    "tiers": [
+      {
+        "size": 48,
+        "atlases": [{"path": "thumbnails/atlas_48_0.jpg", "width": 2048, "height": 310}],
+        "rects": {"<sign code>": [atlasIndex, x, y, width, height]}
+      }
+    ]
+  }
+
+Codes map to the image of the last sign carrying that code, matching
+MainActivity.loadRoadSignIndex.
+
+Given the build manifest and a cache root, rendered tiles are cached under
+tools/.cache/sprite_tiles/ by content key (manifest sha256 plus encoding) and
+tier size, so only new or changed images are rendered again. When the content
+keys, code mapping, tiers and settings all match the last build and every
+output is still on disk, thumbnails/ is left untouched.
+"""
+
+import hashlib
+import io
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+from PIL import __version__ as PIL_VERSION
+
+from sign_image_metadata import content_key
+
+
+DEFAULT_TIERS = (48, 96, 192)
+THUMBNAILS_DIR = "thumbnails"
+ATLAS_INDEX_NAME = "sprite_atlas_v1.json"
+ATLAS_INDEX_VERSION = 1
+MAX_ATLAS_EDGE = 2048
+SPRITE_PADDING = 2
+THUMBNAIL_QUALITY = 88
+TILE_CACHE_DIR = "sprite_tiles"
+TILE_CACHE_STATE = "state.json"
+TILE_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Sprite:
+    asset_path: str
+    image: Image.Image
+    encoded: bytes
+
+
+@dataclass(frozen=True)
+class Placement:
+    atlas: int
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def render_thumbnails(source: Path, tiers: tuple[int, ...]) -> dict[int, Image.Image]:
+    with Image.open(source) as image:
+        image = image.convert("RGB")
+        out = {}
+        for size in tiers:
+            thumb = image.copy()
+            thumb.thumbnail((size, size), Image.Resampling.LANCZOS)
+            out[size] = thumb
+        return out
+
+
+def _render_job(job: tuple[str, Path, tuple[int, ...]]) -> tuple[str, dict[int, tuple[Image.Image, bytes]]]:
+    asset_path, source, tiers = job
+    thumbnails = render_thumbnails(source, tiers)
+    return asset_path, {size: (thumb, encode_jpeg(thumb)) for size, thumb in thumbnails.items()}
+
+
+def shelf_pack(sizes: list[tuple[int, int]], max_edge: int = MAX_ATLAS_EDGE) -> tuple[list[Placement], list[tuple[int, int]]]:
+    """Place rectangles on shelves, tallest first, starting a new atlas when one fills up.
+
+    Returns one placement per input (in input order) and the used size of each atlas.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0], i))
+    placements: list[Placement | None] = [None] * len(sizes)
+    atlas_sizes: list[tuple[int, int]] = []
+    atlas = 0
+    x = y = shelf_height = used_width = 0
+    for i in order:
+        width, height = sizes[i]
+        if x + width > max_edge:
+            x = 0
+            y += shelf_height + SPRITE_PADDING
+            shelf_height = 0
+        if y + height > max_edge:
+            atlas_sizes.append((used_width, y - SPRITE_PADDING))
+            atlas += 1
+            x = y = shelf_height = used_width = 0
+        placements[i] = Placement(atlas, x, y, width, height)
+        x += width + SPRITE_PADDING
+        shelf_height = max(shelf_height, height)
+        used_width = max(used_width, x - SPRITE_PADDING)
+    if sizes:
+        atlas_sizes.append((used_width, y + shelf_height))
+    return placements, atlas_sizes
+
+
+def encode_jpeg(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def tile_cache_settings() -> list:
+    """Everything besides the source image that fixes the tile and atlas bytes."""
+    return [TILE_CACHE_VERSION, ATLAS_INDEX_VERSION, MAX_ATLAS_EDGE, SPRITE_PADDING, THUMBNAIL_QUALITY, PIL_VERSION]
+
+
+def tile_paths(cache_dir: Path, key: str, size: int) -> tuple[Path, Path]:
+    """Cached (lossless image, encoded JPEG) for one content key and tier."""
+    stem = f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}_{size}"
+    return cache_dir / f"{stem}.png", cache_dir / f"{stem}.jpg"
+
+
+def load_tile_state(cache_dir: Path) -> dict | None:
+    try:
+        state = json.loads((cache_dir / TILE_CACHE_STATE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return state if state.get("settings") == tile_cache_settings() else None
+
+
+def load_tiles(cache_dir: Path, key: str, tiers: tuple[int, ...]) -> dict[int, tuple[Image.Image, bytes]] | None:
+    out = {}
+    for size in tiers:
+        image_path, jpeg_path = tile_paths(cache_dir, key, size)
+        try:
+            with Image.open(image_path) as image:
+                out[size] = (image.convert("RGB"), jpeg_path.read_bytes())
+        except OSError:
+            return None
+    return out
+
+
+def store_tiles(cache_dir: Path, key: str, tiles: dict[int, tuple[Image.Image, bytes]]) -> None:
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for size, (image, encoded) in tiles.items():
+        image_path, jpeg_path = tile_paths(cache_dir, key, size)
+        image.save(image_path, format="PNG")
+        jpeg_path.write_bytes(encoded)
+
+
+def atlas_input_key(tiers: tuple[int, ...], keys: dict[str, str], code_to_image: dict[str, str]) -> str:
+    payload = [tile_cache_settings(), list(tiers), sorted(keys.items()), sorted(code_to_image.items())]
+    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def outputs_present(asset_root: Path, outputs: dict[str, int]) -> bool:
+    for rel, size in outputs.items():
+        try:
+            if (asset_root / rel).stat().st_size != size:
+                return False
+        except OSError:
+            return False
+    return bool(outputs)
+
+
+def build_sprite_atlases(
+    asset_root: Path,
+    signs: list[dict],
+    tiers: tuple[int, ...] = DEFAULT_TIERS,
+    workers: int = 1,
+    write_file=None,
+    manifest: dict[str, dict] | None = None,
+    cache_root: Path | None = None,
+) -> dict:
+    """Write thumbnail tiers and atlases under ``asset_root``; returns the atlas index.
+
+    ``write_file(path, data)`` is used for every output so callers can skip
+    unchanged files; stale files under thumbnails/ are removed. Tiles are
+    cached under ``cache_root`` only when ``manifest`` (the build manifest)
+    covers every image.
+    """
+    write_file = write_file or (lambda path, data: path.write_bytes(data))
+    image_paths = sorted({sign["imageAssetPath"] for sign in signs if sign.get("imageAssetPath")})
+    thumbs_root = asset_root / THUMBNAILS_DIR
+
+    code_to_image: dict[str, str] = {}
+    for sign in signs:
+        code = sign.get("code", "").strip()
+        if code and sign.get("imageAssetPath"):
+            code_to_image[code] = sign["imageAssetPath"]
+
+    cache_dir = None
+    if cache_root is not None and manifest is not None and all(path in manifest for path in image_paths):
+        cache_dir = cache_root / TILE_CACHE_DIR
+        keys = {path: content_key(manifest[path]) for path in image_paths}
+        input_key = atlas_input_key(tiers, keys, code_to_image)
+        state = load_tile_state(cache_dir)
+        if state is None:
+            # Missing, unreadable or written with other settings: tiles may be stale.
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            state = {}
+        elif state.get("inputKey") == input_key and outputs_present(asset_root, state.get("outputs", {})):
+            return json.loads((thumbs_root / ATLAS_INDEX_NAME).read_text(encoding="utf-8"))
+
+    rendered: dict[str, dict[int, tuple[Image.Image, bytes]]] = {}
+    jobs = []
+    for path in image_paths:
+        cached = load_tiles(cache_dir, keys[path], tiers) if cache_dir is not None else None
+        if cached is None:
+            jobs.append((path, asset_root / path, tiers))
+        else:
+            rendered[path] = cached
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fresh = dict(pool.map(_render_job, jobs, chunksize=16))
+    else:
+        fresh = dict(_render_job(job) for job in jobs)
+    rendered.update(fresh)
+    if cache_dir is not None:
+        for path, tiles in fresh.items():
+            store_tiles(cache_dir, keys[path], tiles)
+
+    written: set[Path] = set()
+
+    def emit(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_file(path, data)
+        written.add(path)
+
+    tier_entries = []
+    for size in tiers:
+        sprites = [Sprite(path, *rendered[path][size]) for path in image_paths]
+        for sprite in sprites:
+            rel = Path(sprite.asset_path).relative_to("images")
+            emit(thumbs_root / str(size) / rel, sprite.encoded)
+
+        placements, atlas_sizes = shelf_pack([sprite.image.size for sprite in sprites])
+        canvases = [Image.new("RGB", dims, (255, 255, 255)) for dims in atlas_sizes]
+        for sprite, placement in zip(sprites, placements):
+            canvases[placement.atlas].paste(sprite.image, (placement.x, placement.y))
+
+        atlases = []
+        for n, canvas in enumerate(canvases):
+            rel = f"{THUMBNAILS_DIR}/atlas_{size}_{n}.jpg"
+            emit(asset_root / rel, encode_jpeg(canvas))
+            atlases.append({"path": rel, "width": canvas.width, "height": canvas.height})
+
+        by_image = {sprite.asset_path: placement for sprite, placement in zip(sprites, placements)}
+        rects = {}
+        for code in sorted(code_to_image):
+            p = by_image[code_to_image[code]]
+            rects[code] = [p.atlas, p.x, p.y, p.width, p.height]
+        tier_entries.append({"size": size, "atlases": atlases, "rects": rects})
+
+    index = {"version": ATLAS_INDEX_VERSION, "tiers": tier_entries}
+    emit(thumbs_root / ATLAS_INDEX_NAME, json.dumps(index, separators=(",", ":")).encode("utf-8"))
+
+    if thumbs_root.exists():
+        for file_path in sorted(thumbs_root.rglob("*"), reverse=True):
+            if file_path.is_file() and file_path not in written:
+                file_path.unlink()
+            elif file_path.is_dir() and not any(file_path.iterdir()):
+                file_path.rmdir()
+
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        current = {path.name for key in set(keys.values()) for size in tiers for path in tile_paths(cache_dir, key, size)}
+        for file_path in cache_dir.iterdir():
+            if file_path.name != TILE_CACHE_STATE and file_path.name not in current:
+                file_path.unlink()
+        outputs = {path.relative_to(asset_root).as_posix(): path.stat().st_size for path in sorted(written)}
+        state = {"settings": tile_cache_settings(), "inputKey": input_key, "outputs": outputs}
+        (cache_dir / TILE_CACHE_STATE).write_text(json.dumps(state, indent=2) + "\n", encoding="utf-8")
+    return index
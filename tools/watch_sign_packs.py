@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Watch the traffic sign sources and rebuild the sign packs in place.
+
+This is an editor preview loop for the outputs of build_traffic_signs_pack.py
+--incremental and trafficsigns/enrich_knowyoursigns_from_dft.py. The process
+stays up, so its state is warm between rebuilds:
+
+  - the parsed DfT spreadsheet rows, reloaded only when the .xls changes
+  - the roadsign/ image index, patched per added or removed .jpg
+  - the asset pack's image manifest, so only new, changed or re-pointed
+    images are copied, and only orphaned ones are deleted
+  - the last KYS theory/question output and its SignMatcher
+
+The source trees are polled by stat (roadsign/, trafficsigns/*-jpg/, the
+spreadsheet and the KYS theory/question sources). The poll does not read or
+hash files. A burst of changes is handled as one rebuild once nothing has
+changed for --debounce seconds. Each rebuild prints one status line: what
+changed, signs and questions affected, images copied/removed, files written
+and the time taken.
+
+The pack is rebuilt with the flags the last build_traffic_signs_pack.py run
+recorded in its build manifest (--optimize, --image-metadata, --dedupe and
+the sidecar flags), so a save never strips fields or leaves sidecars stale.
+The watcher refuses to start when the pack was built with --deltas, which
+would record a new version on every save, or when the manifest predates the
+recorded flags. The KYS outputs take the enrich script's own flags here
+(--minified, --gzip, --compact, --distractors, --seed, --locales).
+
+Enrichment is re-run over every sign from memory. Distractor pools are
+shared across a category, so one caption edit can change other questions'
+options, and the whole pass takes tens of milliseconds. Only files whose
+bytes changed are written. The watcher ignores its own writes to the KYS
+theory/question files. A rebuild that fails (e.g. a half-saved spreadsheet)
+is reported and the previous outputs are kept.
+
+Usage:
+  python tools/watch_sign_packs.py [--interval 0.2] [--debounce 0.3] [--once] [--locales DIR] [--minified]
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "trafficsigns"))
+
+import build_traffic_signs_pack as pack_builder  # noqa: E402
+import enrich_knowyoursigns_from_dft as enrich  # noqa: E402
+from locale_banks import load_catalogues  # noqa: E402
+from optimize_sign_images import OptimizeSettings  # noqa: E402
+from pack_writer import encode_json, write_if_changed  # noqa: E402
+from sign_sheet import SignMeta, load_sign_rows  # noqa: E402
+
+
+DEFAULT_INTERVAL_S = 0.2
+DEFAULT_DEBOUNCE_S = 0.3
+KYS_IMAGE_ROOT = enrich.TRAFFICSIGNS_DIR
+KYS_SOURCES = (enrich.THEORY_PATHS[0], enrich.QUESTION_PATHS[0])
+# Recorded build flags the watcher will not redo on every save.
+UNSUPPORTED_OPTIONS = ("deltas",)
+
+Snapshot = dict[str, tuple[int, int]]
+
+
+def scan_tree(root: Path, suffix: str, out: Snapshot) -> None:
+    """Add {path: (size, mtime_ns)} for every file under ``root`` ending in ``suffix`` (any case)."""
+    try:
+        entries = list(os.scandir(root))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            scan_tree(Path(entry.path), suffix, out)
+        elif entry.name.lower().endswith(suffix):
+            stat = entry.stat()
+            out[entry.path] = (stat.st_size, stat.st_mtime_ns)
+
+
+def scan_sources() -> Snapshot:
+    snapshot: Snapshot = {}
+    scan_tree(pack_builder.SOURCE_ROOT, ".jpg", snapshot)
+    for folder in sorted(KYS_IMAGE_ROOT.glob("*-jpg")):
+        scan_tree(folder, ".jpg", snapshot)
+    for path in (pack_builder.SOURCE_XLS, *KYS_SOURCES):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        snapshot[str(path)] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> tuple[set[str], set[str], set[str]]:
+    """Return (added, removed, modified) paths."""
+    added = new.keys() - old.keys()
+    removed = old.keys() - new.keys()
+    modified = {path for path in new.keys() & old.keys() if new[path] != old[path]}
+    return set(added), set(removed), modified
+
+
+def sign_content(sign: dict) -> str:
+    return json.dumps({key: value for key, value in sign.items() if key != "id"}, sort_keys=True)
+
+
+def under(path: str, root: Path) -> bool:
+    return path.startswith(str(root) + os.sep)
+
+
+def iter_signs(theory: dict):
+    for chapter in theory.get("chapters", []):
+        for section in chapter.get("sections", []):
+            yield from section.get("signs", [])
+
+
+def recorded_build_options(build: dict):
+    """The argparse namespace of the build that wrote ``build`` (a build manifest payload)."""
+    if build.get("images") and "options" not in build:
+        raise SystemExit(
+            f"{pack_builder.BUILD_MANIFEST} does not record its build flags; "
+            "re-run build_traffic_signs_pack.py --incremental with the flags you want, then start the watcher."
+        )
+    options = pack_builder.options_namespace(build.get("options", {}))
+    unsupported = [f"--{name.replace('_', '-')}" for name in UNSUPPORTED_OPTIONS if getattr(options, name)]
+    if unsupported:
+        raise SystemExit(
+            f"The sign pack was built with {', '.join(unsupported)}, which the watcher does not reproduce; "
+            "rebuild without it before watching."
+        )
+    return options
+
+
+class WarmSignPack:
+    """The traffic_signs asset pack, rebuilt from in-memory rows, image index and manifest."""
+
+    def __init__(self, rows: list[SignMeta]) -> None:
+        build = pack_builder.read_build_manifest(pack_builder.BUILD_MANIFEST)
+        self.options = recorded_build_options(build)
+        self.settings = (
+            OptimizeSettings(max_edge=self.options.max_edge, quality=self.options.quality) if self.options.optimize else None
+        )
+        self.sidecars = pack_builder.sidecar_paths(self.options)
+        self.image_index = pack_builder.build_image_index(pack_builder.SOURCE_ROOT)
+        self.manifest = build.get("images", {})
+        self.signs: list[dict] = []
+        self.summary = ""
+        pack_builder.ASSET_IMAGES_ROOT.mkdir(parents=True, exist_ok=True)
+        self.rebuild(rows, set(), full=True)
+
+    def patch_image_index(self, added: set[str], removed: set[str]) -> None:
+        root = pack_builder.SOURCE_ROOT
+        for path in removed:
+            if under(path, root) and path.endswith(".jpg"):
+                name = os.path.basename(path)
+                options = [c for c in self.image_index.get(name, []) if str(c.full_path) != path]
+                if options:
+                    self.image_index[name] = options
+                else:
+                    self.image_index.pop(name, None)
+        for path in sorted(added):
+            if under(path, root) and path.endswith(".jpg"):
+                self.image_index[os.path.basename(path)].append(pack_builder.candidate_image(root, Path(path)))
+
+    def rebuild(self, rows: list[SignMeta], changed: set[str], full: bool = False) -> None:
+        options = self.options
+        signs, missing, jobs, counts = pack_builder.select_signs(rows, self.image_index, self.manifest)
+        if options.dedupe:
+            aliases, duplicates = pack_builder.dedupe_image_jobs(jobs, signs, options.perceptual_distance, workers=1)
+            write_if_changed(pack_builder.DUPLICATE_REPORT, json.dumps(duplicates, indent=2) + "\n")
+        pack = pack_builder.build_pack(signs, missing, counts)
+        if options.dedupe:
+            pack["imageAliases"] = dict(sorted(aliases.items()))
+        if full:
+            manifest, copied = pack_builder.ingest_images(list(jobs.values()), self.settings, workers=1)
+        else:
+            manifest, copied = {}, set()
+            for key, job in jobs.items():
+                previous = self.manifest.get(key)
+                if previous is None or previous.get("source") != job.source_rel or str(job.source) in changed:
+                    entry, did_write = pack_builder.sync_image(job, self.settings)
+                    manifest[key] = entry
+                    if did_write:
+                        copied.add(key)
+                else:
+                    manifest[key] = previous
+        if options.image_metadata:
+            pack_builder.apply_image_metadata(signs, manifest, workers=1)
+        if full:
+            removed = pack_builder.remove_orphan_images(pack_builder.ASSET_IMAGES_ROOT, set(manifest))
+        else:
+            removed = sorted(set(self.manifest) - set(manifest))
+            for key in removed:
+                target = pack_builder.ASSET_ROOT / key
+                target.unlink(missing_ok=True)
+                if target.parent.exists() and not any(target.parent.iterdir()):
+                    target.parent.rmdir()
+
+        _, outputs, _ = pack_builder.write_pack_files(options, pack, signs)
+        if options.thumbnails:
+            pack_builder.write_thumbnails(options, signs, manifest, workers=1)
+        pack_builder.save_build_manifest(
+            pack_builder.BUILD_MANIFEST,
+            manifest,
+            {"options": pack_builder.build_options(options), "sidecars": self.sidecars},
+        )
+        if full:
+            sign_note = ""
+        else:
+            # Sign ids are positional, so compare content: one new row would otherwise "change" every later sign.
+            before, after = Counter(map(sign_content, self.signs)), Counter(map(sign_content, signs))
+            changed_signs = max((after - before).total(), (before - after).total())
+            sign_note = f" ({changed_signs} changed)"
+        self.signs = signs
+        self.manifest = manifest
+        self.summary = (
+            f"pack: {len(signs)} signs{sign_note}, {len(copied)} images copied, "
+            f"{len(removed)} removed, {len(set(missing))} missing, "
+            f"{'written' if outputs[0] else 'unchanged'}"
+        )
+        if len(outputs) > 1:
+            self.summary += f", {sum(outputs[1:])}/{len(outputs) - 1} sidecar files written"
+
+
+class WarmKnowYourSigns:
+    """KYS theory/questions, re-enriched from the previous output like a repeated batch run."""
+
+    def __init__(self, rows: list[SignMeta], image_paths: set[str], args: argparse.Namespace) -> None:
+        self.args = args
+        self.catalogues = load_catalogues(args.locales) if args.locales else []
+        self.theory = enrich.load_json(enrich.THEORY_PATHS[0])
+        self.questions = enrich.load_json(enrich.QUESTION_PATHS[0])
+        self.own_writes: dict[str, bytes] = {}
+        self.summary = ""
+        self.rebuild(rows, image_paths)
+
+    def reload_sources(self, changed: set[str]) -> bool:
+        """Re-read KYS sources edited outside the watcher; returns whether any were."""
+        reloaded = False
+        for path, attr in zip(KYS_SOURCES, ("theory", "questions")):
+            if str(path) not in changed or not path.exists():
+                continue
+            if path.read_bytes() != self.own_writes.get(str(path)):
+                setattr(self, attr, enrich.load_json(path))
+                reloaded = True
+        return reloaded
+
+    def rebuild(self, rows: list[SignMeta], image_paths: set[str]) -> None:
+        # Same keys as enrich.load_dft_meta: the last row per lower-cased JPG name wins.
+        matcher = enrich.SignMatcher({meta.jpg.lower(): meta for meta in rows})
+        provenance: dict[str, str] = {}
+        args = self.args
+        theory, questions = enrich.enrich_theory_and_questions(
+            copy.deepcopy(self.theory), self.questions, matcher, provenance, distractor_mode=args.distractors, seed=args.seed
+        )
+        before = {sign["sign_id"]: sign for sign in iter_signs(self.theory)}
+        changed_signs = sum(1 for sign in iter_signs(theory) if before.get(sign["sign_id"]) != sign)
+        old_questions = {question["sign_id"]: question for question in self.questions}
+        changed_questions = sum(1 for q in questions if old_questions.get(q["sign_id"]) != q)
+
+        variants = {"minified": args.minified, "gzipped": args.gzip, "compact": args.compact}
+        theory_result, question_result = enrich.write_enriched(theory, questions, **variants)
+        written = len(theory_result.written) + len(question_result.written)
+        if self.catalogues:
+            _, locale_result = enrich.write_locale_banks(
+                self.catalogues, theory, questions, workers=max(1, args.locale_workers), **variants
+            )
+            written += len(locale_result.written)
+        self.own_writes = {str(KYS_SOURCES[0]): encode_json(theory), str(KYS_SOURCES[1]): encode_json(questions)}
+        self.theory, self.questions = theory, questions
+
+        missing_images = [
+            sign["sign_id"]
+            for sign in iter_signs(theory)
+            if str(KYS_IMAGE_ROOT / sign.get("image_path", "")) not in image_paths
+        ]
+        unmatched = sum(1 for how in provenance.values() if how == "unmatched")
+        self.summary = (
+            f"kys: {changed_signs} signs / {changed_questions} questions changed, {unmatched} unmatched, "
+            f"{len(missing_images)} missing images, "
+            f"{written} files written"
+        )
+        if missing_images:
+            self.summary += f" ({', '.join(missing_images[:5])}{', ...' if len(missing_images) > 5 else ''})"
+
+
+class SignPackWatcher:
+    def __init__(self, args: argparse.Namespace) -> None:
+        started = time.perf_counter()
+        self.snapshot = scan_sources()
+        self.rows = load_sign_rows(pack_builder.SOURCE_XLS, cache_root=pack_builder.BUILD_CACHE_ROOT)
+        self.pack = WarmSignPack(self.rows)
+        self.kys = WarmKnowYourSigns(self.rows, self.kys_image_paths(), args)
+        self.refresh(KYS_SOURCES)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"Warm start: {len(self.rows)} sheet rows, {len(self.snapshot)} files watched ({elapsed:.0f} ms)")
+        print(f"  {self.pack.summary}")
+        print(f"  {self.kys.summary}")
+
+    def kys_image_paths(self) -> set[str]:
+        return {path for path in self.snapshot if under(path, KYS_IMAGE_ROOT) and path.lower().endswith(".jpg")}
+
+    def refresh(self, paths) -> None:
+        """Re-stat files the watcher itself wrote so they do not trigger another rebuild."""
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            self.snapshot[str(path)] = (stat.st_size, stat.st_mtime_ns)
+
+    def wait_for_changes(self, interval: float, debounce: float) -> tuple[Snapshot, set[str], set[str], set[str]]:
+        """Block until sources change, then until they have been quiet for ``debounce`` seconds."""
+        while True:
+            time.sleep(interval)
+            current = scan_sources()
+            if current != self.snapshot:
+                break
+        quiet_since = time.monotonic()
+        while time.monotonic() - quiet_since < debounce:
+            time.sleep(interval)
+            latest = scan_sources()
+            if latest != current:
+                current = latest
+                quiet_since = time.monotonic()
+        return current, *diff_snapshots(self.snapshot, current)
+
+    def apply(self, snapshot: Snapshot, added: set[str], removed: set[str], modified: set[str]) -> str:
+        changed = added | removed | modified
+        sheet_changed = str(pack_builder.SOURCE_XLS) in changed
+        pack_images = any(under(path, pack_builder.SOURCE_ROOT) and path.endswith(".jpg") for path in changed)
+        kys_images = any(under(path, KYS_IMAGE_ROOT) and path.lower().endswith(".jpg") for path in changed)
+
+        self.snapshot = snapshot
+        self.pack.patch_image_index(added, removed)
+        if sheet_changed:
+            self.rows = load_sign_rows(pack_builder.SOURCE_XLS, cache_root=pack_builder.BUILD_CACHE_ROOT)
+        rows = self.rows
+        parts = []
+        if sheet_changed or pack_images:
+            self.pack.rebuild(rows, changed)
+            parts.append(self.pack.summary)
+        if self.kys.reload_sources(changed) or sheet_changed or kys_images:
+            self.kys.rebuild(rows, self.kys_image_paths())
+            self.refresh(KYS_SOURCES)
+            parts.append(self.kys.summary)
+        return "; ".join(parts) or "no output affected"
+
+    def run(self, interval: float, debounce: float) -> None:
+        print(f"Watching {pack_builder.SOURCE_ROOT.relative_to(ROOT)}/ and {KYS_IMAGE_ROOT.relative_to(ROOT)}/ (Ctrl-C to stop)")
+        while True:
+            snapshot, added, removed, modified = self.wait_for_changes(interval, debounce)
+            started = time.perf_counter()
+            names = sorted(os.path.relpath(path, ROOT) for path in added | removed | modified)
+            label = ", ".join(names[:3]) + (f" (+{len(names) - 3} more)" if len(names) > 3 else "")
+            try:
+                summary = self.apply(snapshot, added, removed, modified)
+            except Exception as exc:  # keep watching; the next save retries
+                summary = f"rebuild failed, outputs kept: {type(exc).__name__}: {exc}"
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"[{time.strftime('%H:%M:%S')}] {label}: {summary} ({elapsed:.0f} ms)", flush=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Watch sign sources and rebuild the sign packs on change.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_S, help="Seconds between source scans.")
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE_S,
+        help="Seconds the sources must stay unchanged before a rebuild (default: 0.3).",
+    )
+    parser.add_argument("--once", action="store_true", help="Do the warm-up build and exit.")
+    kys = parser.add_argument_group("Know Your Signs outputs (as enrich_knowyoursigns_from_dft.py)")
+    kys.add_argument("--minified", action="store_true", help="Also write .min.json copies next to every output.")
+    kys.add_argument("--gzip", action="store_true", help="Also write minified .json.gz copies next to every output.")
+    kys.add_argument("--compact", action="store_true", help="Also write .compact.json copies of the question bank.")
+    kys.add_argument("--distractors", choices=["stable", "semantic"], default="stable", help="Distractor selection mode.")
+    kys.add_argument("--seed", type=int, default=0, help="Seed for semantic distractor selection.")
+    kys.add_argument("--locales", type=Path, help="Directory of <locale>.json catalogues; rebuilds a bank per locale.")
+    kys.add_argument("--locale-workers", type=int, default=1, help="Processes used to build locale banks (default: 1).")
+    args = parser.parse_args(argv)
+
+    watcher = SignPackWatcher(args)
+    if args.once:
+        return
+    try:
+        watcher.run(args.interval, args.debounce)
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled sign rule engine against the original if/elif chains.
+
+The corpus is every DfT spreadsheet row plus the Highway Code question banks
+(question text classified under their topic), repeated to --scale entries.
+Results from both implementations are compared first; the benchmark fails if
+any classification differs.
+
+Usage:
+  python trafficsigns/bench_sign_rules.py [--scale 50000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+from sign_rules import load_ruleset  # noqa: E402
+from sign_sheet import DEFAULT_XLS_PATH, iter_sign_rows  # noqa: E402
+
+QUESTION_BANKS = [
+    ROOT / "highwaycode" / "Drivest_QuestionBank_1200_Varied.json",
+    ROOT / "Drivest_1200_Questions.json",
+]
+
+FALLBACK_ACTION = "Follow the sign instruction safely."
+
+
+def legacy_driver_action(category: str, description: str, fallback: str) -> str:
+    text = description.lower()
+    cat = category.lower()
+
+    if "no entry" in text:
+        return "Do not enter. Find an alternative legal route."
+    if "stop" in text and "bus stop" not in text:
+        return "Stop fully, check all directions, then proceed only when safe."
+    if "give way" in text or "yield" in text:
+        return "Give way to other traffic and continue only when safe."
+    if "speed limit" in text:
+        return "Do not exceed the posted speed limit and adjust for conditions."
+    if "minimum speed" in text:
+        return "Maintain at least the minimum speed when safe to do so."
+    if "end of" in text and "speed" in text:
+        return "The previous speed restriction ends here; follow the new road limit."
+    if "no left turn" in text or "no right turn" in text or "no u-turn" in text:
+        return "Do not make the prohibited turn shown by this sign."
+    if "turn left" in text or "turn right" in text:
+        return "Follow the turn direction shown and position early."
+    if "ahead only" in text or "straight ahead" in text:
+        return "Continue in the direction indicated by the sign."
+    if "keep left" in text or "keep right" in text:
+        return "Pass on the side indicated and keep within your lane."
+    if "one way" in text:
+        return "Travel only in the permitted one-way direction."
+    if "ahead" in text and any(
+        token in text
+        for token in ["cyclists", "children", "school", "crossing", "event", "hazard", "bend", "junction"]
+    ):
+        return "Reduce speed, scan ahead, and prepare early for the condition shown."
+    if "bus lane" in text or "with-flow" in text or "contra-flow" in text or "route for use by" in text:
+        return "Use this lane only if your vehicle class is permitted by the sign."
+    if "cycle lane" in text or "cycle track" in text or "pedal cycles only" in text:
+        return "Keep out of this lane unless your vehicle is specifically permitted."
+    if "pedestrian" in text or "zebra" in text or "crossing" in text:
+        return "Slow down and be ready to stop for pedestrians as required."
+    if "tram" in text:
+        return "Follow tram-specific restrictions and keep clear of tram tracks."
+    if "weight limit" in text or "max gross weight" in text:
+        return "Do not proceed if your vehicle exceeds the signed weight limit."
+    if "width limit" in text or "max width" in text:
+        return "Check vehicle width and do not enter if you exceed the limit."
+    if "height limit" in text or "low bridge" in text:
+        return "Check vehicle height and avoid this route if clearance is insufficient."
+    if "parking" in text or "waiting" in text or "loading" in text or "bay" in text:
+        return "Follow the parking, waiting, and loading restrictions exactly as signed."
+
+    if "warning" in cat:
+        return "Reduce speed, scan ahead, and prepare for the hazard shown."
+    if "direction" in cat or "information" in cat:
+        return "Use the sign information early to choose the correct route and lane."
+    if "regulatory" in cat:
+        return "Comply with the mandatory or prohibitory instruction immediately."
+    if "parking" in cat:
+        return "Follow the signed parking and waiting conditions before stopping."
+
+    return fallback
+
+
+def legacy_family(category: str, description: str) -> str:
+    cat = category.lower()
+    text = description.lower()
+    if "speed" in text or "speed" in cat:
+        return "speed"
+    if "parking" in text or "waiting" in text or "parking" in cat:
+        return "parking"
+    if "bus lane" in text or "cycle lane" in text or "bus and cycle" in cat or "tram" in text:
+        return "lane_restriction"
+    if "pedestrian" in text or "zebra" in text or "crossing" in text:
+        return "pedestrian"
+    if "no " in text or "prohibited" in text:
+        return "prohibition"
+    if "left" in text or "right" in text or "ahead" in text or "one way" in text or "keep" in text:
+        return "direction"
+    if "warning" in cat:
+        return "warning"
+    if "information" in cat or "direction" in cat:
+        return "information"
+    return "general"
+
+
+def load_corpus() -> List[Tuple[str, str]]:
+    corpus = [(meta.category, meta.description or meta.caption) for meta in iter_sign_rows(DEFAULT_XLS_PATH)]
+    for path in QUESTION_BANKS:
+        if path.exists():
+            for question in json.loads(path.read_text(encoding="utf-8")):
+                corpus.append((str(question.get("topic", "")), str(question.get("question", ""))))
+    return corpus
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark compiled sign rules against the legacy chains.")
+    parser.add_argument("--scale", type=int, default=50000, help="Number of (category, description) pairs to classify.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    base = load_corpus()
+    corpus = (base * (args.scale // len(base) + 1))[: args.scale]
+    actions = load_ruleset("driver_action")
+    families = load_ruleset("family")
+
+    mismatches = 0
+    for category, description in base:
+        mismatches += actions.classify(description, category, FALLBACK_ACTION) != legacy_driver_action(category, description, FALLBACK_ACTION)
+        mismatches += families.classify(description, category, "general") != legacy_family(category, description)
+    if mismatches:
+        raise SystemExit(f"Compiled rules disagree with the legacy chains on {mismatches} classification(s)")
+
+    timings = {
+        "legacy driver_action": best_time(lambda: [legacy_driver_action(c, d, FALLBACK_ACTION) for c, d in corpus], args.repeat),
+        "rules driver_action": best_time(lambda: [actions.classify(d, c, FALLBACK_ACTION) for c, d in corpus], args.repeat),
+        "legacy family": best_time(lambda: [legacy_family(c, d) for c, d in corpus], args.repeat),
+        "rules family": best_time(lambda: [families.classify(d, c, "general") for c, d in corpus], args.repeat),
+    }
+    print(f"Corpus: {len(base)} unique entries, {len(corpus)} classified per run, parity OK")
+    for name, seconds in timings.items():
+        print(f"{name:22s} {seconds * 1000:9.1f} ms  {seconds / len(corpus) * 1e6:7.2f} us/entry")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Semantic "hard but wrong" distractors for Know Your Signs questions.
+
+Descriptions are embedded as hashed TF-IDF vectors over word unigrams and
+character 3-5 grams, then every description's nearest neighbours are found
+with blocked matrix products. Candidates that would make a question
+ambiguous are masked out before ranking:
+  - the description itself and exact duplicates
+  - left/right mirror variants ("Bend to the left" vs "Bend to the right")
+  - near-paraphrases above ``max_similarity``
+
+Three distractors are drawn from the top ``candidates`` neighbours using a
+seeded generator, so the same inputs always give the same bank. Callers that
+top up a short pick from elsewhere check each extra with allows(). Only NumPy
+is required; nothing is downloaded.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+MIRROR_RE = re.compile(r"\b(left|right|nearside|offside)\b")
+WORD_RE = re.compile(r"[a-z0-9]+")
+SAME_CATEGORY_BONUS = 0.05
+BLOCK_ROWS = 512
+
+
+def mirror_key(text: str) -> str:
+    return MIRROR_RE.sub("side", text.lower())
+
+
+def features(text: str) -> List[str]:
+    lower = text.lower()
+    grams = [f"w:{word}" for word in WORD_RE.findall(lower)]
+    padded = f" {' '.join(WORD_RE.findall(lower))} "
+    for n in (3, 4, 5):
+        grams.extend(padded[i : i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def tfidf_matrix(texts: Sequence[str], dims: int = 2048) -> np.ndarray:
+    """Row-normalised hashed TF-IDF matrix (len(texts) x dims, float32)."""
+    cells: List[int] = []
+    for row, text in enumerate(texts):
+        offset = row * dims
+        cells.extend(offset + zlib.crc32(gram.encode("utf-8")) % dims for gram in features(text))
+    counts = np.bincount(np.asarray(cells, dtype=np.int64), minlength=len(texts) * dims)
+    counts = counts.astype(np.float32).reshape(len(texts), dims)
+    doc_freq = np.count_nonzero(counts, axis=0)
+    idf = np.log((1.0 + len(texts)) / (1.0 + doc_freq)).astype(np.float32) + 1.0
+    matrix = np.log1p(counts) * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class DistractorEngine:
+    def __init__(
+        self,
+        descriptions: Sequence[str],
+        categories: Optional[Sequence[str]] = None,
+        seed: int = 0,
+        candidates: int = 6,
+        max_similarity: float = 0.9,
+        dims: int = 2048,
+    ) -> None:
+        self.descriptions = list(descriptions)
+        self.position = {text: i for i, text in enumerate(self.descriptions)}
+        self.categories = list(categories) if categories is not None else [""] * len(self.descriptions)
+        self.seed = seed
+        self.candidates = candidates
+        self.max_similarity = max_similarity
+        self.matrix = tfidf_matrix(self.descriptions, dims)
+        self._choices: Optional[np.ndarray] = None
+
+    def neighbours(self) -> np.ndarray:
+        """Top-``candidates`` neighbour indices per description, best first; -1 pads."""
+        count = len(self.descriptions)
+        k = min(self.candidates, max(count - 1, 0))
+        out = np.full((count, self.candidates), -1, dtype=np.int64)
+        if k == 0:
+            return out
+
+        mirrors = np.unique([mirror_key(text) for text in self.descriptions], return_inverse=True)[1]
+        categories = np.unique(self.categories, return_inverse=True)[1]
+        rng = np.random.default_rng(self.seed)
+        # Tiny seeded jitter gives a deterministic but unbiased order among exact ties.
+        jitter = rng.random(count, dtype=np.float32) * 1e-6
+
+        for start in range(0, count, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, count)
+            sims = self.matrix[start:stop] @ self.matrix.T
+            scores = sims + jitter[None, :]
+            scores += SAME_CATEGORY_BONUS * (categories[start:stop, None] == categories[None, :])
+            excluded = (sims >= self.max_similarity) | (mirrors[start:stop, None] == mirrors[None, :])
+            excluded[np.arange(stop - start), np.arange(start, stop)] = True
+            scores[excluded] = -np.inf
+
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            top[np.isneginf(top_scores)] = -1
+            out[start:stop, :k] = top
+        return out
+
+    def choices(self) -> np.ndarray:
+        """Three distractor indices per description (-1 where none is available)."""
+        if self._choices is None:
+            neighbours = self.neighbours()
+            rng = np.random.default_rng(self.seed + 1)
+            # Valid neighbours get a random key in [0, 1); padding sorts last.
+            keys = rng.random(neighbours.shape)
+            keys[neighbours < 0] = 2.0
+            order = np.argsort(keys, axis=1, kind="stable")[:, :3]
+            self._choices = np.take_along_axis(neighbours, order, axis=1)
+        return self._choices
+
+    def allows(self, description: str, candidate: str) -> bool:
+        """Whether ``candidate`` passes the same masks as a neighbour of ``description``."""
+        if candidate == description or mirror_key(candidate) == mirror_key(description):
+            return False
+        row, other = self.position.get(description), self.position.get(candidate)
+        if row is None or other is None:
+            return True
+        return float(self.matrix[row] @ self.matrix[other]) < self.max_similarity
+
+    def pick(self, description: str) -> List[str]:
+        row = self.position.get(description)
+        if row is None:
+            return []
+        return [self.descriptions[i] for i in self.choices()[row] if i >= 0]
@@ -3,7 +3,7 @@
 Rebuild Know Your Signs data using official DfT metadata.
 
 Inputs:
-  - /tmp/traffic-signs-images-image-details.xls (DfT spreadsheet)
+  - roadsign/traffic-signs-images-image-details.xls (DfT spreadsheet, shared with tools/build_traffic_signs_pack.py)
   - trafficsigns/Drivest_KnowYourSigns_Theory_Expanded.json
 
 Outputs:
@@ -15,20 +15,30 @@ Outputs:
 
 from __future__ import annotations
 
+import argparse
 import json
 import os
 import re
-from dataclasses import dataclass
+import sys
+from bisect import bisect_right
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence
-
-import xlrd
+from typing import Dict, List, Optional, Sequence, Tuple
 
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+from build_profile import BuildProfiler  # noqa: E402
+from locale_banks import LocaleBank, build_locale_banks, load_catalogues  # noqa: E402
+from pack_writer import WriteResult, encode_json, variant_path, write_json_targets, write_targets  # noqa: E402
+from question_bank_compact import compact_questions  # noqa: E402
+from sign_rules import load_ruleset  # noqa: E402
+from sign_sheet import SignMeta, iter_sign_rows  # noqa: E402
+
 TRAFFICSIGNS_DIR = ROOT / "trafficsigns"
 IOS_KYS_DIR = ROOT / "ios" / "DrivestNavigation" / "Resources" / "Data" / "knowyoursigns"
-DFT_XLS_PATH = Path("/tmp/traffic-signs-images-image-details.xls")
+DFT_XLS_PATH = ROOT / "roadsign" / "traffic-signs-images-image-details.xls"
 
 THEORY_PATHS = [
     TRAFFICSIGNS_DIR / "Drivest_KnowYourSigns_Theory_Expanded.json",
@@ -40,45 +50,15 @@ QUESTION_PATHS = [
 ]
 
 
-@dataclass
-class SignMeta:
-    category: str
-    description: str
-    caption: str
-    dgno: str
-    jpg: str
-
-
 def normalize_stem(value: str) -> str:
     stem = Path(value).stem.lower()
     return re.sub(r"[^a-z0-9]+", "", stem)
 
 
 def load_dft_meta(path: Path) -> Dict[str, SignMeta]:
-    if not path.exists():
-        raise FileNotFoundError(f"DfT spreadsheet not found: {path}")
-    sheet = xlrd.open_workbook(str(path)).sheet_by_index(0)
-    headers = [str(sheet.cell_value(0, c)).strip() for c in range(sheet.ncols)]
-    index = {name: i for i, name in enumerate(headers)}
-
-    required = ["Category", "Description", "Caption", "DGNo", "JPG"]
-    for col in required:
-        if col not in index:
-            raise ValueError(f"Missing expected column in DfT sheet: {col}")
-
     by_jpg: Dict[str, SignMeta] = {}
-    for row in range(1, sheet.nrows):
-        jpg = str(sheet.cell_value(row, index["JPG"])).strip()
-        if not jpg:
-            continue
-        item = SignMeta(
-            category=str(sheet.cell_value(row, index["Category"])).strip(),
-            description=str(sheet.cell_value(row, index["Description"])).strip(),
-            caption=str(sheet.cell_value(row, index["Caption"])).strip(),
-            dgno=str(sheet.cell_value(row, index["DGNo"])).strip(),
-            jpg=jpg.strip(),
-        )
-        by_jpg[jpg.lower()] = item
+    for item in iter_sign_rows(path):
+        by_jpg[item.jpg.lower()] = item
     return by_jpg
 
 
@@ -89,29 +69,85 @@ def build_stem_index(by_jpg: Dict[str, SignMeta]) -> Dict[str, SignMeta]:
     return by_stem
 
 
-def pick_meta(image_filename: str, by_jpg: Dict[str, SignMeta], by_stem: Dict[str, SignMeta]) -> Optional[SignMeta]:
-    lower = image_filename.lower()
-    if lower in by_jpg:
-        return by_jpg[lower]
-
-    stem = Path(lower).stem
-    if stem in by_stem:
-        return by_stem[stem]
+NUMERIC_PREFIX_RE = re.compile(r"^([0-9]+(?:\.[0-9]+)?)")
+VARIANT_SUFFIX_RE = re.compile(r"^[0-9.]+([a-z]+)$")
+DOTTED_VARIANT_RE = re.compile(r"^([0-9]+)\.([a-z]+)$")
 
-    # Variant fallback: 507.1LRR -> 507.1, 530A -> 530
-    numeric_prefix_match = re.match(r"^([0-9]+(?:\.[0-9]+)?)", stem)
-    if numeric_prefix_match:
-        prefix = numeric_prefix_match.group(1).lower()
-        if prefix in by_stem:
-            return by_stem[prefix]
 
-    compact = normalize_stem(stem)
-    for jpg, meta in by_jpg.items():
-        if normalize_stem(jpg) == compact:
-            return meta
+def longest_key_prefix(sorted_keys: Sequence[str], query: str) -> Optional[str]:
+    """Return the longest key in ``sorted_keys`` that is a prefix of ``query``."""
+    while query:
+        pos = bisect_right(sorted_keys, query) - 1
+        if pos < 0:
+            return None
+        key = sorted_keys[pos]
+        if query.startswith(key):
+            return key
+        query = os.path.commonprefix([key, query])
     return None
 
 
+class SignMatcher:
+    """Resolves sign image filenames to DfT rows using precomputed indexes.
+
+    Lookups are tried in order and the first hit wins:
+      exact      - full filename, e.g. 501.jpg
+      stem       - filename without extension
+      prefix     - numeric DG prefix, e.g. 507.1LRR -> 507.1, 530A -> 530
+      normalized - punctuation-free stem, first spreadsheet row wins
+      variant    - longest normalized row whose remainder is only variant
+                   letters (L/R/LRR/A...), e.g. 506.1RLL -> 506.1RL
+      diagram    - diagram number plus variant letters after a dot, matched
+                   on the row's dgno and its filename's variant letters,
+                   e.g. 507.RLL -> 506.1RLL.jpg (dgno 507.1)
+    """
+
+    def __init__(self, by_jpg: Dict[str, SignMeta], by_stem: Optional[Dict[str, SignMeta]] = None) -> None:
+        self.by_jpg = by_jpg
+        self.by_stem = by_stem if by_stem is not None else build_stem_index(by_jpg)
+        self.by_normalized: Dict[str, SignMeta] = {}
+        for jpg, meta in by_jpg.items():
+            self.by_normalized.setdefault(normalize_stem(jpg), meta)
+        self.normalized_keys = sorted(self.by_normalized)
+        self.by_diagram_variant: Dict[Tuple[str, str], SignMeta] = {}
+        for jpg, meta in by_jpg.items():
+            variant = VARIANT_SUFFIX_RE.match(Path(jpg).stem.lower())
+            if variant and meta.dgno:
+                self.by_diagram_variant.setdefault((meta.dgno.split(".")[0], variant.group(1)), meta)
+
+    def match(self, image_filename: str) -> Tuple[Optional[SignMeta], str]:
+        lower = image_filename.lower()
+        if lower in self.by_jpg:
+            return self.by_jpg[lower], "exact"
+
+        stem = Path(lower).stem
+        if stem in self.by_stem:
+            return self.by_stem[stem], "stem"
+
+        numeric_prefix_match = NUMERIC_PREFIX_RE.match(stem)
+        if numeric_prefix_match:
+            prefix = numeric_prefix_match.group(1)
+            if prefix in self.by_stem:
+                return self.by_stem[prefix], "prefix"
+
+        compact = normalize_stem(lower)
+        if compact in self.by_normalized:
+            return self.by_normalized[compact], "normalized"
+
+        key = longest_key_prefix(self.normalized_keys, compact)
+        if key and compact[len(key):].isalpha():
+            return self.by_normalized[key], "variant"
+
+        dotted = DOTTED_VARIANT_RE.match(stem)
+        if dotted and dotted.groups() in self.by_diagram_variant:
+            return self.by_diagram_variant[dotted.groups()], "diagram"
+        return None, "unmatched"
+
+
+def pick_meta(image_filename: str, matcher: SignMatcher) -> Optional[SignMeta]:
+    return matcher.match(image_filename)[0]
+
+
 def collapse_whitespace(value: str) -> str:
     return re.sub(r"\s+", " ", value).strip()
 
@@ -141,64 +177,7 @@ def resolve_category(meta: Optional[SignMeta], fallback_category: str) -> str:
 def driver_action_from_meta(meta: Optional[SignMeta], category: str, description: str, fallback: str) -> str:
     if not meta:
         return fallback
-
-    text = description.lower()
-    cat = category.lower()
-
-    if "no entry" in text:
-        return "Do not enter. Find an alternative legal route."
-    if "stop" in text and "bus stop" not in text:
-        return "Stop fully, check all directions, then proceed only when safe."
-    if "give way" in text or "yield" in text:
-        return "Give way to other traffic and continue only when safe."
-    if "speed limit" in text:
-        return "Do not exceed the posted speed limit and adjust for conditions."
-    if "minimum speed" in text:
-        return "Maintain at least the minimum speed when safe to do so."
-    if "end of" in text and "speed" in text:
-        return "The previous speed restriction ends here; follow the new road limit."
-    if "no left turn" in text or "no right turn" in text or "no u-turn" in text:
-        return "Do not make the prohibited turn shown by this sign."
-    if "turn left" in text or "turn right" in text:
-        return "Follow the turn direction shown and position early."
-    if "ahead only" in text or "straight ahead" in text:
-        return "Continue in the direction indicated by the sign."
-    if "keep left" in text or "keep right" in text:
-        return "Pass on the side indicated and keep within your lane."
-    if "one way" in text:
-        return "Travel only in the permitted one-way direction."
-    if "ahead" in text and any(
-        token in text
-        for token in ["cyclists", "children", "school", "crossing", "event", "hazard", "bend", "junction"]
-    ):
-        return "Reduce speed, scan ahead, and prepare early for the condition shown."
-    if "bus lane" in text or "with-flow" in text or "contra-flow" in text or "route for use by" in text:
-        return "Use this lane only if your vehicle class is permitted by the sign."
-    if "cycle lane" in text or "cycle track" in text or "pedal cycles only" in text:
-        return "Keep out of this lane unless your vehicle is specifically permitted."
-    if "pedestrian" in text or "zebra" in text or "crossing" in text:
-        return "Slow down and be ready to stop for pedestrians as required."
-    if "tram" in text:
-        return "Follow tram-specific restrictions and keep clear of tram tracks."
-    if "weight limit" in text or "max gross weight" in text:
-        return "Do not proceed if your vehicle exceeds the signed weight limit."
-    if "width limit" in text or "max width" in text:
-        return "Check vehicle width and do not enter if you exceed the limit."
-    if "height limit" in text or "low bridge" in text:
-        return "Check vehicle height and avoid this route if clearance is insufficient."
-    if "parking" in text or "waiting" in text or "loading" in text or "bay" in text:
-        return "Follow the parking, waiting, and loading restrictions exactly as signed."
-
-    if "warning" in cat:
-        return "Reduce speed, scan ahead, and prepare for the hazard shown."
-    if "direction" in cat or "information" in cat:
-        return "Use the sign information early to choose the correct route and lane."
-    if "regulatory" in cat:
-        return "Comply with the mandatory or prohibitory instruction immediately."
-    if "parking" in cat:
-        return "Follow the signed parking and waiting conditions before stopping."
-
-    return fallback
+    return load_ruleset("driver_action").classify(description, category, fallback)
 
 
 def memory_hint_for_category(category: str) -> str:
@@ -217,25 +196,7 @@ def memory_hint_for_category(category: str) -> str:
 
 
 def family_for_sign(category: str, description: str) -> str:
-    cat = category.lower()
-    text = description.lower()
-    if "speed" in text or "speed" in cat:
-        return "speed"
-    if "parking" in text or "waiting" in text or "parking" in cat:
-        return "parking"
-    if "bus lane" in text or "cycle lane" in text or "bus and cycle" in cat or "tram" in text:
-        return "lane_restriction"
-    if "pedestrian" in text or "zebra" in text or "crossing" in text:
-        return "pedestrian"
-    if "no " in text or "prohibited" in text:
-        return "prohibition"
-    if "left" in text or "right" in text or "ahead" in text or "one way" in text or "keep" in text:
-        return "direction"
-    if "warning" in cat:
-        return "warning"
-    if "information" in cat or "direction" in cat:
-        return "information"
-    return "general"
+    return load_ruleset("family").classify(description, category, "general")
 
 
 def stable_index(seed: str, size: int) -> int:
@@ -244,39 +205,105 @@ def stable_index(seed: str, size: int) -> int:
     return sum(ord(ch) for ch in seed) % size
 
 
+class OrderedPool:
+    """Insertion-ordered set of strings with O(1) membership and position lookups."""
+
+    __slots__ = ("items", "positions")
+
+    def __init__(self) -> None:
+        self.items: List[str] = []
+        self.positions: Dict[str, int] = {}
+
+    def add(self, value: str) -> None:
+        if value not in self.positions:
+            self.positions[value] = len(self.items)
+            self.items.append(value)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def size_without(self, excluded: str) -> int:
+        return len(self.items) - (1 if excluded in self.positions else 0)
+
+    def item_without(self, index: int, excluded: str) -> str:
+        """Item ``index`` of the pool as if ``excluded`` had been filtered out."""
+        skip = self.positions.get(excluded)
+        if skip is not None and index >= skip:
+            index += 1
+        return self.items[index]
+
+
+class DistractorPools:
+    """Per-category and global description pools, built once per enrichment run."""
+
+    def __init__(self) -> None:
+        self.by_category: Dict[str, OrderedPool] = {}
+        self.all = OrderedPool()
+
+    def add(self, category: str, description: str) -> None:
+        pool = self.by_category.setdefault(category, OrderedPool())
+        if description:
+            pool.add(description)
+
+    def finalize(self) -> "DistractorPools":
+        # The global pool follows category insertion order, then each category's order.
+        self.all = OrderedPool()
+        for pool in self.by_category.values():
+            for value in pool.items:
+                self.all.add(value)
+        return self
+
+
+FALLBACK_DISTRACTORS = [
+    "Follow the opposite maneuver shown on the sign.",
+    "Ignore the sign if traffic is light.",
+    "Use sat-nav only and disregard this sign.",
+]
+FILLER_DISTRACTORS = [
+    "Ignore the sign unless traffic is heavy.",
+    "Follow only road markings and ignore this sign.",
+    "Continue unchanged and review later.",
+]
+
+
 def pick_distractors(
     current_sign_id: str,
     current_description: str,
     current_category: str,
-    description_pool_by_category: Dict[str, List[str]],
-    all_descriptions: List[str],
+    pools: DistractorPools,
 ) -> List[str]:
-    category_pool = [d for d in description_pool_by_category.get(current_category, []) if d != current_description]
-    pool = category_pool if len(category_pool) >= 3 else [d for d in all_descriptions if d != current_description]
-    if not pool:
-        return [
-            "Follow the opposite maneuver shown on the sign.",
-            "Ignore the sign if traffic is light.",
-            "Use sat-nav only and disregard this sign.",
-        ]
+    pool = pools.by_category.get(current_category)
+    if pool is None or pool.size_without(current_description) < 3:
+        pool = pools.all
+    size = pool.size_without(current_description)
+    if size == 0:
+        return list(FALLBACK_DISTRACTORS)
 
     out: List[str] = []
-    idx = stable_index(current_sign_id, len(pool))
-    for _ in range(min(3, len(pool))):
-        candidate = pool[idx % len(pool)]
+    idx = stable_index(current_sign_id, size)
+    for _ in range(min(3, size)):
+        candidate = pool.item_without(idx % size, current_description)
         if candidate not in out:
             out.append(candidate)
         idx += 7
     while len(out) < 3:
-        filler = [
-            "Ignore the sign unless traffic is heavy.",
-            "Follow only road markings and ignore this sign.",
-            "Continue unchanged and review later.",
-        ][len(out)]
-        out.append(filler)
+        out.append(FILLER_DISTRACTORS[len(out)])
     return out
 
 
+def semantic_distractors(engine, description: str, stable: List[str]) -> List[str]:
+    """The engine's picks, topped up from the stable picks, then the fillers, when too few safe neighbours exist.
+
+    Top-up candidates go through the engine's own masks, so a mirror variant
+    or near-paraphrase of the answer is never added back.
+    """
+    picks = engine.pick(description)
+    for candidate in stable + FILLER_DISTRACTORS:
+        if len(picks) < 3 and candidate not in picks and engine.allows(description, candidate):
+            picks.append(candidate)
+    return picks
+
+
 def build_question_text(category: str) -> str:
     label = category.strip()
     if label.lower().endswith(" signs"):
@@ -284,7 +311,16 @@ def build_question_text(category: str) -> str:
     return f"You see this {label.lower()} on the road. What does it mean?"
 
 
-def enrich_theory_and_questions(theory: dict, old_questions: List[dict], by_jpg: Dict[str, SignMeta], by_stem: Dict[str, SignMeta]) -> tuple[dict, List[dict]]:
+def enrich_theory_and_questions(
+    theory: dict,
+    old_questions: List[dict],
+    matcher: SignMatcher,
+    provenance: Optional[Dict[str, str]] = None,
+    distractor_mode: str = "stable",
+    seed: int = 0,
+    profiler: Optional[BuildProfiler] = None,
+) -> tuple[dict, List[dict]]:
+    profiler = profiler or BuildProfiler("enrich_knowyoursigns_from_dft")
     old_questions_by_sign = {q.get("sign_id"): q for q in old_questions}
 
     # Flatten signs for pool generation.
@@ -293,74 +329,81 @@ def enrich_theory_and_questions(theory: dict, old_questions: List[dict], by_jpg:
         for section in chapter.get("sections", []):
             all_signs.extend(section.get("signs", []))
 
-    enriched_signs: List[dict] = []
-    for sign in all_signs:
-        image_filename = Path(sign.get("image_path", "")).name
-        meta = pick_meta(image_filename, by_jpg, by_stem)
-        description = build_title(meta, sign.get("title", "Road sign"))
-        category = resolve_category(meta, sign.get("category", "Road signs"))
-        action = driver_action_from_meta(meta, category, description, sign.get("driver_action", "Follow the sign instruction safely."))
-        meaning = f"This sign means: {to_sentence(description)}"
-
-        sign["title"] = description
-        sign["meaning"] = meaning
-        sign["category"] = category
-        sign["driver_action"] = action
-        sign["memory_hint"] = memory_hint_for_category(category)
-        if meta and meta.dgno:
-            sign["code"] = meta.dgno
-        enriched_signs.append(sign)
-
-    descriptions_by_category: Dict[str, List[str]] = {}
-    for sign in enriched_signs:
-        category = sign.get("category", "Road signs")
-        descriptions_by_category.setdefault(category, [])
-        meaning_text = sign.get("meaning", "").replace("This sign means: ", "").strip()
-        if meaning_text.endswith("."):
-            meaning_text = meaning_text[:-1]
-        if meaning_text and meaning_text not in descriptions_by_category[category]:
-            descriptions_by_category[category].append(meaning_text)
-
-    all_descriptions: List[str] = []
-    for values in descriptions_by_category.values():
-        for v in values:
-            if v not in all_descriptions:
-                all_descriptions.append(v)
-
-    new_questions: List[dict] = []
-    for idx, sign in enumerate(enriched_signs, start=1):
-        sign_id = sign.get("sign_id")
-        category = sign.get("category", "Road signs")
-        meaning_desc = sign.get("meaning", "").replace("This sign means: ", "").strip()
-        if meaning_desc.endswith("."):
-            meaning_desc = meaning_desc[:-1]
-
-        distractors = pick_distractors(
-            current_sign_id=str(sign_id),
-            current_description=meaning_desc,
-            current_category=category,
-            description_pool_by_category=descriptions_by_category,
-            all_descriptions=all_descriptions,
-        )
-
-        options = [meaning_desc] + distractors
-        rotate = stable_index(str(sign_id) + "::opt", len(options))
-        options = options[rotate:] + options[:rotate]
-        correct_index = options.index(meaning_desc)
-
-        old = old_questions_by_sign.get(sign_id, {})
-        question = {
-            "id": int(old.get("id", idx)),
-            "topic": category,
-            "difficulty": old.get("difficulty", "Medium"),
-            "question": build_question_text(category),
-            "image_path": sign.get("image_path"),
-            "options": options,
-            "correct_answer_index": correct_index,
-            "explanation": f"This sign means: {to_sentence(meaning_desc)} Correct response: {to_sentence(sign.get('driver_action', 'Follow the sign instruction safely'))}",
-            "sign_id": sign_id,
-        }
-        new_questions.append(question)
+    with profiler.span("enrichment"):
+        enriched_signs: List[dict] = []
+        for sign in all_signs:
+            image_filename = Path(sign.get("image_path", "")).name
+            meta, how = matcher.match(image_filename)
+            if provenance is not None:
+                provenance[str(sign.get("sign_id"))] = how
+            description = build_title(meta, sign.get("title", "Road sign"))
+            category = resolve_category(meta, sign.get("category", "Road signs"))
+            action = driver_action_from_meta(meta, category, description, sign.get("driver_action", "Follow the sign instruction safely."))
+            meaning = f"This sign means: {to_sentence(description)}"
+
+            sign["title"] = description
+            sign["meaning"] = meaning
+            sign["category"] = category
+            sign["driver_action"] = action
+            sign["memory_hint"] = memory_hint_for_category(category)
+            if meta and meta.dgno:
+                sign["code"] = meta.dgno
+            enriched_signs.append(sign)
+
+    with profiler.span("distractors"):
+        pools = DistractorPools()
+        for sign in enriched_signs:
+            meaning_text = sign.get("meaning", "").replace("This sign means: ", "").strip()
+            if meaning_text.endswith("."):
+                meaning_text = meaning_text[:-1]
+            pools.add(sign.get("category", "Road signs"), meaning_text)
+        pools.finalize()
+
+        engine = None
+        if distractor_mode == "semantic":
+            from distractor_engine import DistractorEngine
+
+            category_of: Dict[str, str] = {}
+            for category, pool in pools.by_category.items():
+                for value in pool.items:
+                    category_of.setdefault(value, category)
+            engine = DistractorEngine(pools.all.items, [category_of[v] for v in pools.all.items], seed=seed)
+
+        new_questions: List[dict] = []
+        for idx, sign in enumerate(enriched_signs, start=1):
+            sign_id = sign.get("sign_id")
+            category = sign.get("category", "Road signs")
+            meaning_desc = sign.get("meaning", "").replace("This sign means: ", "").strip()
+            if meaning_desc.endswith("."):
+                meaning_desc = meaning_desc[:-1]
+
+            distractors = pick_distractors(
+                current_sign_id=str(sign_id),
+                current_description=meaning_desc,
+                current_category=category,
+                pools=pools,
+            )
+            if engine is not None:
+                distractors = semantic_distractors(engine, meaning_desc, distractors)
+
+            options = [meaning_desc] + distractors
+            rotate = stable_index(str(sign_id) + "::opt", len(options))
+            options = options[rotate:] + options[:rotate]
+            correct_index = options.index(meaning_desc)
+
+            old = old_questions_by_sign.get(sign_id, {})
+            question = {
+                "id": int(old.get("id", idx)),
+                "topic": category,
+                "difficulty": old.get("difficulty", "Medium"),
+                "question": build_question_text(category),
+                "image_path": sign.get("image_path"),
+                "options": options,
+                "correct_answer_index": correct_index,
+                "explanation": f"This sign means: {to_sentence(meaning_desc)} Correct response: {to_sentence(sign.get('driver_action', 'Follow the sign instruction safely'))}",
+                "sign_id": sign_id,
+            }
+            new_questions.append(question)
 
     return theory, new_questions
 
@@ -370,29 +413,153 @@ def load_json(path: Path):
         return json.load(handle)
 
 
-def save_json(path: Path, payload) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, ensure_ascii=False, indent=2)
-        handle.write("\n")
-
-
-def main() -> None:
-    by_jpg = load_dft_meta(DFT_XLS_PATH)
-    by_stem = build_stem_index(by_jpg)
-
-    source_theory = load_json(THEORY_PATHS[0])
-    source_questions = load_json(QUESTION_PATHS[0])
-    enriched_theory, enriched_questions = enrich_theory_and_questions(source_theory, source_questions, by_jpg, by_stem)
+def write_enriched(
+    theory: dict, questions: List[dict], minified: bool = False, gzipped: bool = False, compact: bool = False
+) -> Tuple[WriteResult, WriteResult]:
+    """Write the enriched theory and question bank (plus requested variants) to every target."""
+    theory_result = write_json_targets(THEORY_PATHS, theory, minified=minified, gzipped=gzipped)
+    question_result = write_json_targets(QUESTION_PATHS, questions, minified=minified, gzipped=gzipped)
+    if compact:
+        data = encode_json(compact_questions(questions), indent=None)
+        write_targets([variant_path(path, ".compact") for path in QUESTION_PATHS], data, question_result)
+    return theory_result, question_result
+
+
+def write_locale_banks(
+    catalogues: List[dict],
+    theory: dict,
+    questions: List[dict],
+    workers: int = 1,
+    minified: bool = False,
+    gzipped: bool = False,
+    compact: bool = False,
+) -> Tuple[List[LocaleBank], WriteResult]:
+    """Build a bank per catalogue and write it next to the English files as .<locale> variants."""
+    banks = build_locale_banks(
+        catalogues, theory, questions, workers=workers, minified=minified, gzipped=gzipped, compact=compact
+    )
+    result = WriteResult()
+    targets = {"theory": THEORY_PATHS, "questions": QUESTION_PATHS}
+    for bank in banks:
+        for kind, suffix, data in bank.files:
+            paths = [variant_path(path, f".{bank.locale}") for path in targets[kind]]
+            if suffix:
+                paths = [variant_path(path, suffix) for path in paths]
+            write_targets(paths, data, result)
+    return banks, result
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild Know Your Signs data from DfT metadata.")
+    parser.add_argument("--minified", action="store_true", help="Also write .min.json copies next to every output.")
+    parser.add_argument("--gzip", action="store_true", help="Also write minified .json.gz copies next to every output.")
+    parser.add_argument(
+        "--distractors",
+        choices=["stable", "semantic"],
+        default="stable",
+        help="stable: stable_index walk of the category pool; semantic: nearest-neighbour distractors (needs NumPy).",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Also write string-interned .compact.json copies of the question bank.",
+    )
+    parser.add_argument(
+        "--locales",
+        type=Path,
+        help="Directory of <locale>.json translation catalogues; also writes a .<locale> bank per catalogue.",
+    )
+    parser.add_argument(
+        "--locale-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes used to build locale banks (default: CPU count).",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for semantic distractor selection.")
+    parser.add_argument("--profile", type=Path, help="Write a per-stage timing/memory/IO report (JSON) to this path.")
+    parser.add_argument("--cprofile", type=Path, help="Also dump cProfile stats (pstats format) to this path.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    profiler = BuildProfiler("enrich_knowyoursigns_from_dft", enabled=args.profile is not None, cprofile_path=args.cprofile)
+    with profiler.span("spreadsheet_load"):
+        by_jpg = load_dft_meta(DFT_XLS_PATH)
+        matcher = SignMatcher(by_jpg)
+        profiler.count(filesRead=1, rows=len(by_jpg))
+
+    with profiler.span("load_inputs"):
+        source_theory = load_json(THEORY_PATHS[0])
+        source_questions = load_json(QUESTION_PATHS[0])
+        profiler.count(filesRead=2)
+    provenance: Dict[str, str] = {}
+    enriched_theory, enriched_questions = enrich_theory_and_questions(
+        source_theory,
+        source_questions,
+        matcher,
+        provenance,
+        distractor_mode=args.distractors,
+        seed=args.seed,
+        profiler=profiler,
+    )
+
+    with profiler.span("serialisation"):
+        theory_result, question_result = write_enriched(
+            enriched_theory, enriched_questions, minified=args.minified, gzipped=args.gzip, compact=args.compact
+        )
+        profiler.count(
+            filesWritten=len(theory_result.written) + len(question_result.written),
+            filesUnchanged=len(theory_result.unchanged) + len(question_result.unchanged),
+        )
 
-    for path in THEORY_PATHS:
-        save_json(path, enriched_theory)
-    for path in QUESTION_PATHS:
-        save_json(path, enriched_questions)
+    locale_banks = []
+    locale_result = WriteResult()
+    if args.locales:
+        with profiler.span("locales"):
+            locale_banks, locale_result = write_locale_banks(
+                load_catalogues(args.locales),
+                enriched_theory,
+                enriched_questions,
+                workers=max(1, args.locale_workers),
+                minified=args.minified,
+                gzipped=args.gzip,
+                compact=args.compact,
+            )
+            profiler.count(
+                locales=len(locale_banks),
+                filesWritten=len(locale_result.written),
+                filesUnchanged=len(locale_result.unchanged),
+            )
 
     print(f"[Drivest] DfT sign rows: {len(by_jpg)}")
     print(f"[Drivest] Theory signs updated: {sum(len(s.get('signs', [])) for c in enriched_theory.get('chapters', []) for s in c.get('sections', []))}")
     print(f"[Drivest] Questions updated: {len(enriched_questions)}")
+    match_counts = Counter(provenance.values())
+    print("[Drivest] Sign matches: " + ", ".join(f"{how}={count}" for how, count in sorted(match_counts.items())))
+    unmatched = sorted(sign_id for sign_id, how in provenance.items() if how == "unmatched")
+    if unmatched:
+        print(f"[Drivest] Unmatched signs: {', '.join(unmatched)}")
+    written = len(theory_result.written) + len(question_result.written)
+    unchanged = len(theory_result.unchanged) + len(question_result.unchanged)
+    print(f"[Drivest] Files written: {written}, unchanged: {unchanged}")
+    if args.locales:
+        print(f"[Drivest] Locale files written: {len(locale_result.written)}, unchanged: {len(locale_result.unchanged)}")
+    for bank in locale_banks:
+        coverage = ", ".join(
+            f"{table} {bank.total[table] - bank.missing[table]}/{bank.total[table]}" for table in bank.total
+        )
+        print(f"[Drivest] Locale {bank.locale}: {coverage}")
+        if bank.duplicate_options:
+            print(f"[Drivest]   {bank.duplicate_options} questions have repeated options after translation")
+    if profiler.enabled:
+        profiler.finish(args.profile)
+        for line in profiler.summary_lines():
+            print(f"[Drivest]   {line}")
+        if args.profile:
+            print(f"[Drivest] Profile report: {args.profile}")
+        if args.cprofile:
+            print(f"[Drivest] cProfile stats: {args.cprofile}")
     print("[Drivest] Know Your Signs enrichment complete.")
 
 
@@ -0,0 +1,241 @@
+"""
+Localised Know Your Signs banks from translation catalogues.
+
+The English enrichment pass runs once. Each locale bank is then a
+translation of its output, so sign matching, distractor choice and the
+stable_index option rotation are shared. Options are translated one by one
+in place, which keeps option order and correct_answer_index identical across
+locales.
+
+A catalogue is one JSON file per locale, e.g. trafficsigns/locales/de.json:
+
+  {
+    "locale": "de",
+    "templates": {
+      "question": "Du siehst dieses Schild ({category}). Was bedeutet es?",
+      "meaning": "Dieses Schild bedeutet: {meaning}",
+      "explanation": "Dieses Schild bedeutet: {meaning} Richtige Reaktion: {action}"
+    },
+    "categories": {"Warning signs": "Warnzeichen", ...},
+    "meanings": {"Road narrows on both sides": "...", ...},
+    "actions": {"Slow down and prepare for the hazard ahead.": "...", ...},
+    "hints": {"Warning signs usually prepare you for hazards ahead: ease speed early.": "...", ...}
+  }
+
+Tables are keyed by the English text. Missing entries fall back to English
+and are counted in the coverage summary. {meaning} and {action} are filled
+in as full sentences. The "template" command writes a catalogue holding
+every string of the current English bank with empty translations.
+
+Usage:
+  python trafficsigns/locale_banks.py template <theory.json> <questions.json> <locale> <out.json>
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools"))
+
+from pack_writer import encode_json, gzip_bytes  # noqa: E402
+from question_bank_compact import compact_questions  # noqa: E402
+
+CATALOGUE_TABLES = ("categories", "meanings", "actions", "hints")
+TEMPLATE_KEYS = ("question", "meaning", "explanation")
+
+
+@dataclass
+class LocaleBank:
+    locale: str
+    # (bank kind "theory" | "questions", variant suffix, bytes); "" is the pretty-printed file.
+    files: List[Tuple[str, str, bytes]] = field(default_factory=list)
+    missing: Dict[str, int] = field(default_factory=dict)
+    total: Dict[str, int] = field(default_factory=dict)
+    duplicate_options: int = 0
+
+
+def load_catalogue(path: Path) -> dict:
+    with path.open("r", encoding="utf-8") as handle:
+        catalogue = json.load(handle)
+    catalogue.setdefault("locale", path.stem)
+    templates = catalogue.get("templates", {})
+    missing = [key for key in TEMPLATE_KEYS if not templates.get(key)]
+    if missing:
+        raise ValueError(f"{path}: catalogue has no template for {', '.join(missing)}")
+    for table in CATALOGUE_TABLES:
+        catalogue.setdefault(table, {})
+    return catalogue
+
+
+def load_catalogues(directory: Path) -> List[dict]:
+    return [load_catalogue(path) for path in sorted(directory.glob("*.json"))]
+
+
+def sentence(value: str) -> str:
+    text = re.sub(r"\s+", " ", value).strip()
+    return text if not text or text.endswith(".") else f"{text}."
+
+
+def strip_meaning_prefix(meaning: str) -> str:
+    text = meaning.replace("This sign means: ", "").strip()
+    return text[:-1] if text.endswith(".") else text
+
+
+class Translator:
+    def __init__(self, catalogue: dict) -> None:
+        self.catalogue = catalogue
+        self.templates = catalogue["templates"]
+        self.missing: Dict[str, set] = {table: set() for table in CATALOGUE_TABLES}
+        self.seen: Dict[str, set] = {table: set() for table in CATALOGUE_TABLES}
+
+    def lookup(self, table: str, text: str) -> str:
+        self.seen[table].add(text)
+        entries = self.catalogue[table]
+        translated = entries.get(text)
+        if not translated and text.endswith("."):
+            translated = entries.get(text[:-1])
+        if not translated:
+            self.missing[table].add(text)
+            return text
+        return translated
+
+    def meaning(self, description: str) -> str:
+        return self.lookup("meanings", description)
+
+
+def localize_theory(theory: dict, translator: Translator) -> dict:
+    chapters = []
+    for chapter in theory.get("chapters", []):
+        sections = []
+        for section in chapter.get("sections", []):
+            signs = []
+            for sign in section.get("signs", []):
+                local = dict(sign)
+                description = strip_meaning_prefix(sign.get("meaning", ""))
+                local["title"] = translator.meaning(sign.get("title", ""))
+                local["meaning"] = translator.templates["meaning"].format(meaning=sentence(translator.meaning(description)))
+                local["category"] = translator.lookup("categories", sign.get("category", ""))
+                local["driver_action"] = translator.lookup("actions", sign.get("driver_action", ""))
+                local["memory_hint"] = translator.lookup("hints", sign.get("memory_hint", ""))
+                signs.append(local)
+            sections.append({**section, "signs": signs})
+        chapters.append({**chapter, "sections": sections})
+    return {**theory, "chapters": chapters}
+
+
+def localize_questions(questions: List[dict], actions: Dict[str, str], translator: Translator) -> Tuple[List[dict], int]:
+    """Return (localised questions, how many ended up with repeated options)."""
+    out: List[dict] = []
+    duplicates = 0
+    for question in questions:
+        options = [translator.meaning(option) for option in question["options"]]
+        if len(set(options)) != len(options):
+            duplicates += 1
+        correct = options[question["correct_answer_index"]]
+        action = translator.lookup("actions", actions.get(question.get("sign_id"), ""))
+        local = dict(question)
+        local["topic"] = translator.lookup("categories", question.get("topic", ""))
+        local["question"] = translator.templates["question"].format(category=local["topic"])
+        local["options"] = options
+        local["explanation"] = translator.templates["explanation"].format(meaning=sentence(correct), action=sentence(action))
+        out.append(local)
+    return out, duplicates
+
+
+def encode_variants(kind: str, payload, minified: bool, gzipped: bool, compact: bool) -> List[Tuple[str, str, bytes]]:
+    files = [(kind, "", encode_json(payload))]
+    if minified or gzipped:
+        small = encode_json(payload, indent=None)
+        if minified:
+            files.append((kind, ".min", small))
+        if gzipped:
+            files.append((kind, ".gz", gzip_bytes(small)))
+    if compact and kind == "questions":
+        files.append((kind, ".compact", encode_json(compact_questions(payload), indent=None)))
+    return files
+
+
+def build_locale_bank(job: Tuple[dict, dict, List[dict], bool, bool, bool]) -> LocaleBank:
+    catalogue, theory, questions, minified, gzipped, compact = job
+    translator = Translator(catalogue)
+    actions = {
+        sign.get("sign_id"): sign.get("driver_action", "")
+        for chapter in theory.get("chapters", [])
+        for section in chapter.get("sections", [])
+        for sign in section.get("signs", [])
+    }
+    local_theory = localize_theory(theory, translator)
+    local_questions, duplicates = localize_questions(questions, actions, translator)
+    bank = LocaleBank(catalogue["locale"], duplicate_options=duplicates)
+    bank.files += encode_variants("theory", local_theory, minified, gzipped, compact)
+    bank.files += encode_variants("questions", local_questions, minified, gzipped, compact)
+    bank.missing = {table: len(translator.missing[table]) for table in CATALOGUE_TABLES}
+    bank.total = {table: len(translator.seen[table]) for table in CATALOGUE_TABLES}
+    return bank
+
+
+def build_locale_banks(
+    catalogues: List[dict],
+    theory: dict,
+    questions: List[dict],
+    workers: int = 1,
+    minified: bool = False,
+    gzipped: bool = False,
+    compact: bool = False,
+) -> List[LocaleBank]:
+    """Translate the enriched English bank into every catalogue's locale, in catalogue order."""
+    jobs = [(catalogue, theory, questions, minified, gzipped, compact) for catalogue in catalogues]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            return list(pool.map(build_locale_bank, jobs))
+    return [build_locale_bank(job) for job in jobs]
+
+
+def catalogue_template(theory: dict, questions: List[dict], locale: str) -> dict:
+    tables: Dict[str, Dict[str, str]] = {table: {} for table in CATALOGUE_TABLES}
+    for chapter in theory.get("chapters", []):
+        for section in chapter.get("sections", []):
+            for sign in section.get("signs", []):
+                tables["meanings"].setdefault(sign.get("title", ""), "")
+                tables["meanings"].setdefault(strip_meaning_prefix(sign.get("meaning", "")), "")
+                tables["categories"].setdefault(sign.get("category", ""), "")
+                tables["actions"].setdefault(sign.get("driver_action", ""), "")
+                tables["hints"].setdefault(sign.get("memory_hint", ""), "")
+    for question in questions:
+        for option in question.get("options", []):
+            tables["meanings"].setdefault(option, "")
+    return {
+        "locale": locale,
+        "templates": {key: "" for key in TEMPLATE_KEYS},
+        **{table: {text: "" for text in sorted(entries) if text} for table, entries in tables.items()},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Write translation catalogue templates for Know Your Signs banks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    template = sub.add_parser("template")
+    template.add_argument("theory", type=Path)
+    template.add_argument("questions", type=Path)
+    template.add_argument("locale")
+    template.add_argument("output", type=Path)
+    args = parser.parse_args(argv)
+
+    theory = json.loads(args.theory.read_text(encoding="utf-8"))
+    questions = json.loads(args.questions.read_text(encoding="utf-8"))
+    payload = catalogue_template(theory, questions, args.locale)
+    args.output.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    counts = ", ".join(f"{table}={len(payload[table])}" for table in CATALOGUE_TABLES)
+    print(f"[Drivest] Catalogue template for {args.locale}: {counts} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+String-interned compact format for generated question banks.
+
+Question banks repeat the same strings many times: every question's prompt,
+its topic, and descriptions that reappear as distractors in other questions.
+The compact form stores each distinct string once and replaces string values
+with indexes into that table:
+
+  {
+    "format": "drivest-compact-questions",
+    "version": 1,
+    "strings": ["Road signs", "What does this sign mean?", ...],
+    "fields": [["id", "int"], ["topic", "str"], ["options", "str[]"], ...],
+    "questions": [[1, 0, [4, 17, 9, 2]], ...]
+  }
+
+Each question is a row aligned with "fields". "str" cells hold a string
+index, "str[]" cells a list of indexes, and "int" cells the value itself;
+null stays null. Strings are ordered by use count, so the most common ones
+get the shortest indexes. expand_questions() rebuilds the original list with
+the same keys, key order and values.
+
+Usage:
+  python trafficsigns/question_bank_compact.py encode <questions.json> <out.compact.json>
+  python trafficsigns/question_bank_compact.py verify <questions.json> <questions.compact.json>
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+COMPACT_FORMAT = "drivest-compact-questions"
+COMPACT_VERSION = 1
+FIELD_KINDS = ("int", "str", "str[]")
+
+
+def field_kind(value) -> Optional[str]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return "str[]"
+    return None
+
+
+def infer_fields(questions: Sequence[dict]) -> List[List[str]]:
+    """Field names and kinds, in first-question key order; every question must share them."""
+    if not questions:
+        return []
+    names = list(questions[0])
+    kinds: Dict[str, Optional[str]] = {name: None for name in names}
+    for position, question in enumerate(questions):
+        if list(question) != names:
+            raise ValueError(f"Question {position} has keys {list(question)}, expected {names}")
+        for name in names:
+            value = question[name]
+            if value is None:
+                continue
+            kind = field_kind(value)
+            if kind is None or kinds[name] not in (None, kind):
+                raise ValueError(f"Question {position}: field {name!r} cannot be stored compactly")
+            kinds[name] = kind
+    return [[name, kinds[name] or "str"] for name in names]
+
+
+def compact_questions(questions: Sequence[dict]) -> dict:
+    fields = infer_fields(questions)
+    counts: Counter = Counter()
+    first_seen: Dict[str, int] = {}
+    for question in questions:
+        for name, kind in fields:
+            value = question[name]
+            if value is None or kind == "int":
+                continue
+            for text in [value] if kind == "str" else value:
+                counts[text] += 1
+                first_seen.setdefault(text, len(first_seen))
+
+    strings = sorted(counts, key=lambda text: (-counts[text], first_seen[text]))
+    index = {text: i for i, text in enumerate(strings)}
+    rows = []
+    for question in questions:
+        row = []
+        for name, kind in fields:
+            value = question[name]
+            if value is None or kind == "int":
+                row.append(value)
+            elif kind == "str":
+                row.append(index[value])
+            else:
+                row.append([index[text] for text in value])
+        rows.append(row)
+    return {
+        "format": COMPACT_FORMAT,
+        "version": COMPACT_VERSION,
+        "strings": strings,
+        "fields": fields,
+        "questions": rows,
+    }
+
+
+def expand_questions(payload: dict) -> List[dict]:
+    if payload.get("format") != COMPACT_FORMAT:
+        raise ValueError(f"Not a compact question bank: {payload.get('format')!r}")
+    if payload.get("version") != COMPACT_VERSION:
+        raise ValueError(f"Unsupported compact question bank version: {payload.get('version')}")
+    strings = payload["strings"]
+    fields = payload["fields"]
+    for _, kind in fields:
+        if kind not in FIELD_KINDS:
+            raise ValueError(f"Unknown field kind: {kind!r}")
+
+    questions = []
+    for row in payload["questions"]:
+        question = {}
+        for (name, kind), cell in zip(fields, row):
+            if cell is None or kind == "int":
+                question[name] = cell
+            elif kind == "str":
+                question[name] = strings[cell]
+            else:
+                question[name] = [strings[i] for i in cell]
+        questions.append(question)
+    return questions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Encode or verify compact question banks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("encode", "verify"):
+        command = sub.add_parser(name)
+        command.add_argument("questions", type=Path)
+        command.add_argument("compact", type=Path)
+    args = parser.parse_args(argv)
+
+    questions = json.loads(args.questions.read_text(encoding="utf-8"))
+    if args.command == "encode":
+        payload = compact_questions(questions)
+        args.compact.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n", encoding="utf-8")
+        print(f"[Drivest] {len(questions)} questions, {len(payload['strings'])} strings -> {args.compact}")
+        return
+    expanded = expand_questions(json.loads(args.compact.read_text(encoding="utf-8")))
+    if expanded != questions or [list(q) for q in expanded] != [list(q) for q in questions]:
+        raise SystemExit("[Drivest] Compact bank does not expand to the source questions")
+    print(f"[Drivest] Compact bank OK: {len(expanded)} questions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Declarative sign classification rules (sign_rules.json) compiled for fast matching.
+
+Each rule set is compiled once into a single generated function that tests
+the rules in priority order and returns the index of the first match. Every
+condition is a short-circuiting ``term in field`` check, which runs in C and
+stops at the first decisive hit; for a few dozen short terms this measured
+faster than either a pure-Python Aho-Corasick automaton or one combined
+regex, since Python's ``re`` tries alternations one by one at every offset.
+Matches carry the rule id and the terms that fired so every assignment can
+be explained.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+
+RULES_PATH = Path(__file__).resolve().parent / "sign_rules.json"
+FIELDS = ("text", "category")
+# Rule ids are written into the generated source (as a comment), so keep them to plain identifiers.
+RULE_ID_RE = re.compile(r"[a-z0-9_]+")
+
+# A clause is a tuple of (field, terms) pairs; it matches when any term occurs in its field.
+Clause = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+@dataclass(frozen=True)
+class Rule:
+    rule_id: str
+    priority: int
+    result: str
+    all_clauses: Tuple[Clause, ...]
+    none_clauses: Tuple[Clause, ...]
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    rule_id: Optional[str]
+    result: str
+    terms: Tuple[str, ...]
+
+
+def parse_clause(spec: dict, rule_id: str) -> Clause:
+    unknown = set(spec) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown rule field(s) in {rule_id}: {', '.join(sorted(unknown))}")
+    return tuple((field, tuple(term.lower() for term in spec[field])) for field in FIELDS if field in spec)
+
+
+def clause_source(clause: Clause) -> str:
+    tests = [f"{term!r} in {field}" for field, terms in clause for term in terms]
+    return "(" + " or ".join(tests) + ")" if tests else "False"
+
+
+def compile_rules(rules: Sequence[Rule], name: str) -> Callable[[str, str], int]:
+    lines = ["def first_rule(text, category):"]
+    for index, rule in enumerate(rules):
+        conditions = [clause_source(clause) for clause in rule.all_clauses]
+        conditions += [f"not {clause_source(clause)}" for clause in rule.none_clauses]
+        lines.append(f"    if {' and '.join(conditions) or 'True'}:  # {rule.rule_id}")
+        lines.append(f"        return {index}")
+    lines.append("    return -1")
+    namespace: Dict[str, object] = {}
+    exec(compile("\n".join(lines), f"<sign_rules:{name}>", "exec"), namespace)
+    return namespace["first_rule"]  # type: ignore[return-value]
+
+
+def check_rule_id(rule_id: object) -> str:
+    if not isinstance(rule_id, str) or not RULE_ID_RE.fullmatch(rule_id):
+        raise ValueError(f"Invalid rule id {rule_id!r}: use lower-case letters, digits and underscores")
+    return rule_id
+
+
+class RuleSet:
+    def __init__(self, rules: Sequence[dict], name: str = "rules") -> None:
+        parsed = [
+            Rule(
+                rule_id=check_rule_id(spec["id"]),
+                priority=int(spec.get("priority", 0)),
+                result=spec["result"],
+                all_clauses=tuple(parse_clause(c, spec["id"]) for c in spec.get("all", [])),
+                none_clauses=tuple(parse_clause(c, spec["id"]) for c in spec.get("none", [])),
+            )
+            for spec in rules
+        ]
+        # sorted() is stable, so equal priorities keep file order.
+        self.rules = sorted(parsed, key=lambda rule: rule.priority)
+        self._first_rule = compile_rules(self.rules, name)
+
+    def classify(self, text: str, category: str, default: str) -> str:
+        index = self._first_rule(text.lower(), category.lower())
+        return self.rules[index].result if index >= 0 else default
+
+    def match(self, text: str, category: str, default: str) -> RuleMatch:
+        fields = {"text": text.lower(), "category": category.lower()}
+        index = self._first_rule(fields["text"], fields["category"])
+        if index < 0:
+            return RuleMatch(None, default, ())
+        rule = self.rules[index]
+        fired = []
+        for clause in rule.all_clauses:
+            for field, terms in clause:
+                fired.extend(term for term in terms if term in fields[field] and term not in fired)
+        return RuleMatch(rule.rule_id, rule.result, tuple(fired))
+
+
+_LOADED: Dict[Tuple[Path, str], RuleSet] = {}
+
+
+def load_ruleset(name: str, path: Path = RULES_PATH) -> RuleSet:
+    key = (path, name)
+    if key not in _LOADED:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        try:
+            rules = payload["rulesets"][name]
+        except KeyError:
+            raise ValueError(f"Rule set {name!r} not found in {path}") from None
+        _LOADED[key] = RuleSet(rules, name)
+    return _LOADED[key]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Explain which sign rule classifies a description.")
+    parser.add_argument("description")
+    parser.add_argument("category", nargs="?", default="")
+    parser.add_argument("--ruleset", action="append", help="Rule set(s) to run (default: all).")
+    args = parser.parse_args(argv)
+
+    names = args.ruleset or list(json.loads(RULES_PATH.read_text(encoding="utf-8"))["rulesets"])
+    for name in names:
+        match = load_ruleset(name).match(args.description, args.category, "<default>")
+        terms = ", ".join(repr(term) for term in match.terms) or "-"
+        print(f"{name}: {match.rule_id or '<no rule>'} (terms: {terms}) -> {match.result}")
+
+
+if __name__ == "__main__":
+    main()